@@ -1,19 +1,75 @@
-from .client import EfaClient
-from .data_classes import (
-    Departure,
-    Stop,
-    StopFilter,
-    StopType,
-    SystemInfo,
-    TransportType,
-)
+"""Python API for EFA (Elektronische Fahrplanauskunft) async requests.
+
+Public names are imported lazily on first access (PEP 562), so importing
+the package does not load aiohttp, voluptuous or any request module.
+"""
+
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .client import EfaClient
+    from .data_classes import (
+        Departure,
+        Info,
+        Journey,
+        Line,
+        Stop,
+        StopFilter,
+        StopSequence,
+        StopTime,
+        StopType,
+        SystemInfo,
+        TransportType,
+    )
+    from .scheduler import Priority, priority
+
+_LAZY_IMPORTS = {
+    "EfaClient": ".client",
+    "Departure": ".data_classes",
+    "Info": ".data_classes",
+    "Journey": ".data_classes",
+    "Line": ".data_classes",
+    "Stop": ".data_classes",
+    "StopFilter": ".data_classes",
+    "StopSequence": ".data_classes",
+    "StopTime": ".data_classes",
+    "StopType": ".data_classes",
+    "SystemInfo": ".data_classes",
+    "TransportType": ".data_classes",
+    "Priority": ".scheduler",
+    "priority": ".scheduler",
+}
 
 __all__ = [
     "StopFilter",
     "Stop",
+    "StopSequence",
+    "StopTime",
     "StopType",
     "Departure",
+    "Info",
+    "Journey",
+    "Line",
     "SystemInfo",
     "TransportType",
     "EfaClient",
+    "Priority",
+    "priority",
 ]
+
+
+def __getattr__(name: str):
+    module = _LAZY_IMPORTS.get(name)
+
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
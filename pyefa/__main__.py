@@ -0,0 +1,77 @@
+"""Command line interface.
+
+python -m pyefa serve https://efa.vgn.de/vgnExt_oeffi/ --port 8080
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+
+
+def parse_ttl(value: str) -> tuple[str, float]:
+    name, _, seconds = value.partition("=")
+
+    if not name or not seconds:
+        raise argparse.ArgumentTypeError(f"Expected NAME=SECONDS, got {value}")
+
+    return name, float(seconds)
+
+
+def create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m pyefa")
+    parser.add_argument("-v", "--verbose", action="store_true", help="debug logging")
+
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="run caching proxy for an EFA endpoint")
+    serve.add_argument("upstream", help="url of the upstream EFA endpoint")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8080)
+    serve.add_argument(
+        "--rate", type=float, default=10, help="max. upstream requests per second"
+    )
+    serve.add_argument("--burst", type=int, default=20, help="max. upstream burst")
+    serve.add_argument(
+        "--ttl",
+        type=parse_ttl,
+        action="append",
+        default=[],
+        metavar="NAME=SECONDS",
+        help="cache time of a request, e.g. XML_DM_REQUEST=30 (repeatable)",
+    )
+
+    return parser
+
+
+async def serve(args: argparse.Namespace) -> None:
+    from pyefa.server import DEFAULT_TTLS, ProxyServer
+
+    server = ProxyServer(
+        args.upstream, {**DEFAULT_TTLS, **dict(args.ttl)}, args.rate, args.burst
+    )
+
+    await server.start(args.host, args.port)
+
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = create_parser().parse_args(argv)
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO)
+
+    command = {"serve": serve}[args.command]
+
+    try:
+        asyncio.run(command(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from collections.abc import Awaitable, Hashable, Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from pyefa.data_classes import Departure, StopFilter, TransportType
+from pyefa.exceptions import EfaParameterError
+from pyefa.geocoding import normalize_name
+from pyefa.merge import DepartureMerger
+from pyefa.registry import EndpointRegistry
+from pyefa.transport import request_errors
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class StopIdMapping:
+    """Ids of the same station at several endpoints.
+
+    A station is identified by a key (e.g. its global id), each endpoint may
+    know the station by a different stop id.
+    """
+
+    def __init__(self) -> None:
+        self._stations: dict[str, dict[str, str]] = {}
+        self._by_id: dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._stations)
+
+    def add(self, station: str, ids: dict[str, str]) -> None:
+        """Add stop ids of `station`.
+
+        Args:
+            station (str): station key, e.g. "de:09564:704"
+            ids (dict[str, str]): endpoint name to stop id at this endpoint
+        """
+        self._stations.setdefault(station, {}).update(ids)
+        self._by_id[station] = station
+
+        for stop_id in ids.values():
+            self._by_id[stop_id] = station
+
+    def station(self, stop_id: str) -> str | None:
+        """Return key of the station known by `stop_id` at any endpoint."""
+        return self._by_id.get(stop_id)
+
+    def ids(self, stop_id: str) -> dict[str, str]:
+        """Return stop ids per endpoint of the station known by `stop_id`."""
+        station = self._by_id.get(stop_id)
+
+        return dict(self._stations[station]) if station is not None else {}
+
+    def save(self, path: str | Path) -> None:
+        Path(path).write_text(json.dumps(self._stations), encoding="utf-8")
+
+    def load(self, path: str | Path) -> None:
+        for station, ids in json.loads(Path(path).read_text(encoding="utf-8")).items():
+            self.add(station, ids)
+
+
+@dataclass
+class EndpointResult:
+    endpoint: str
+    stop_id: str
+    departures: int = 0
+    duration: float = 0
+    error: str | None = None
+    timed_out: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and not self.timed_out
+
+
+@dataclass
+class AggregatedBoard:
+    """Merged departures of several endpoints and the result of every endpoint.
+
+    A board is partial if an endpoint failed or missed the deadline.
+    """
+
+    departures: list[Departure]
+    results: list[EndpointResult] = field(default_factory=list)
+
+    @property
+    def partial(self) -> bool:
+        return not all(x.ok for x in self.results)
+
+    @property
+    def missing(self) -> list[str]:
+        """Names of endpoints without result."""
+        return [x.endpoint for x in self.results if not x.ok]
+
+
+class AggregatingClient:
+    """Departures of stations served by several EFA endpoints (e.g. border
+    stations of neighbouring networks) as one board.
+
+    All endpoints knowing the station are queried concurrently with their own
+    stop id, departures are merged into one time sorted board without duplicates.
+    Endpoints not answering within the deadline are cancelled and the board is
+    returned with the departures received so far.
+
+    A trip is identified by line, planned time and destination. Destination ids
+    differ between endpoints, so destinations are compared by station key of
+    `mapping` or by normalized name. Departures of the endpoint responsible for
+    the stop (see `EndpointRegistry.endpoint_for()`) win over duplicates of
+    other endpoints, then endpoints are preferred in order of registration.
+
+    Example:
+        registry = EndpointRegistry()
+        registry.register("vgn", "https://efa.vgn.de/vgnExt_oeffi/", ["de:09564:"])
+        registry.register("beg", "https://bahnland-bayern.de/efa/", ["de:09"])
+
+        async with registry:
+            aggregator = AggregatingClient(registry, deadline=1.5)
+            board = await aggregator.departures("de:09564:704")
+
+    Args:
+        registry (EndpointRegistry): registry of the endpoints, opened by the caller
+        mapping (StopIdMapping | None, optional): stop ids per endpoint. Stations
+        without mapping are queried at all endpoints by the same id (e.g. global
+        ids). Defaults to an empty mapping.
+        deadline (float, optional): max. seconds to wait for endpoints. Defaults to 2.
+    """
+
+    def __init__(
+        self,
+        registry: EndpointRegistry,
+        mapping: StopIdMapping | None = None,
+        deadline: float = 2,
+    ) -> None:
+        self._registry: EndpointRegistry = registry
+        self.mapping: StopIdMapping = StopIdMapping() if mapping is None else mapping
+        self._deadline: float = deadline
+
+    async def departures(
+        self,
+        stop_id: str,
+        limit: int = 40,
+        date: str | None = None,
+        deadline: float | None = None,
+        transports: Iterable[TransportType] | None = None,
+        lines: Iterable[str] | None = None,
+    ) -> AggregatedBoard:
+        """Get merged departures of `stop_id` from all endpoints serving it.
+
+        Args:
+            stop_id (str): stop id at any endpoint or station key of `mapping`
+            limit (int, optional): max. number of departures. Defaults to 40.
+            date (str | None, optional): date(time) of first departure. Defaults to now.
+            deadline (float | None, optional): max. seconds to wait for endpoints.
+            Defaults to the deadline of the client.
+            transports (Iterable[TransportType] | None, optional): return only
+            departures of these transport types. Defaults to None (all).
+            lines (Iterable[str] | None, optional): return only departures of these
+            line names. Defaults to None (all).
+
+        Raises:
+            EfaParameterError: No endpoint registered
+
+        Returns:
+            AggregatedBoard: merged departures and results per endpoint
+        """
+        endpoints = self._endpoints(stop_id)
+        merger = DepartureMerger(key=self._trip_key)
+        transports = None if transports is None else list(transports)
+        lines = None if lines is None else list(lines)
+
+        results, boards = await self._gather(
+            {
+                name: self._registry.endpoints[name].client.departures(
+                    endpoint_stop_id, limit, date, merger.interner, transports, lines
+                )
+                for name, endpoint_stop_id in endpoints.items()
+            },
+            endpoints,
+            deadline,
+        )
+
+        for result, board in zip(results, boards):
+            if board is not None:
+                result.departures = len(board)
+                merger.add(board)
+
+        departures = merger.board()[:limit]
+
+        _LOGGER.info(
+            f"{len(departures)} departure(s) of {stop_id} from "
+            f"{sum(x.ok for x in results)} of {len(results)} endpoint(s)"
+        )
+
+        return AggregatedBoard(departures, results)
+
+    async def map_stop(
+        self, stop_id: str, name: str | None = None, deadline: float | None = None
+    ) -> dict[str, str]:
+        """Find the stop id of a station at all endpoints not in `mapping` yet
+        with a stop finder request and add the found ids to `mapping`.
+
+        Args:
+            stop_id (str): station key, e.g. the global id
+            name (str | None, optional): name used for the search. Defaults to `stop_id`.
+            deadline (float | None, optional): max. seconds to wait for endpoints.
+            Defaults to the deadline of the client.
+
+        Returns:
+            dict[str, str]: stop ids per endpoint
+        """
+        known = self.mapping.ids(stop_id)
+        station = self.mapping.station(stop_id) or stop_id
+        queries = {
+            x: name or stop_id for x in self._registry.endpoints if x not in known
+        }
+
+        _, results = await self._gather(
+            {
+                x: self._registry.endpoints[x].client.stops(
+                    query, filters=[StopFilter.STOPS], top_k=1
+                )
+                for x, query in queries.items()
+            },
+            queries,
+            deadline,
+        )
+
+        found = {x: stops[0].id for x, stops in zip(queries, results) if stops}
+
+        self.mapping.add(station, found)
+
+        return self.mapping.ids(station)
+
+    def _endpoints(self, stop_id: str) -> dict[str, str]:
+        """Return stop id per name of endpoints serving `stop_id`."""
+        registered = self._registry.endpoints
+
+        if not registered:
+            raise EfaParameterError("No endpoint registered")
+
+        ids = self.mapping.ids(stop_id)
+        endpoints = {x: ids.get(x, stop_id) for x in registered if not ids or x in ids}
+
+        try:
+            primary = self._registry.endpoint_for(stop_id).name
+        except EfaParameterError:
+            return endpoints
+
+        # responsible endpoint first, its departures win over duplicates
+        if primary in endpoints:
+            endpoints = {primary: endpoints.pop(primary), **endpoints}
+
+        return endpoints
+
+    async def _gather(
+        self,
+        coroutines: dict[str, Awaitable],
+        stop_ids: dict[str, str],
+        deadline: float | None,
+    ) -> tuple[list[EndpointResult], list]:
+        """Await `coroutines` (per endpoint name) concurrently until `deadline`.
+
+        Raises:
+            Exception: an endpoint failed with an error not in `request_errors()`
+
+        Returns:
+            tuple[list[EndpointResult], list]: result per endpoint and return
+            values, None if an endpoint failed or missed the deadline
+        """
+        start = time.perf_counter()
+        results = {x: EndpointResult(x, stop_ids[x]) for x in coroutines}
+
+        async def timed(name: str, coroutine: Awaitable):
+            try:
+                return await coroutine
+            finally:
+                results[name].duration = time.perf_counter() - start
+
+        tasks = {x: asyncio.create_task(timed(x, y)) for x, y in coroutines.items()}
+
+        try:
+            if tasks:
+                await asyncio.wait(
+                    tasks.values(),
+                    timeout=self._deadline if deadline is None else deadline,
+                )
+        finally:
+            # also if the caller is cancelled, no request outlives the call
+            pending = [x for x in tasks.values() if not x.done()]
+
+            for task in pending:
+                task.cancel()
+
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        values = []
+
+        for name, task in tasks.items():
+            result = results[name]
+
+            if task.cancelled():
+                _LOGGER.warning(f"Endpoint {name} missed the deadline")
+                result.timed_out = True
+                values.append(None)
+            elif task.exception() is not None:
+                if not isinstance(task.exception(), request_errors()):
+                    # not a failed endpoint, e.g. a programming error
+                    raise task.exception()
+
+                _LOGGER.warning(f"Endpoint {name} failed: {task.exception()!r}")
+                result.error = repr(task.exception())
+                values.append(None)
+            else:
+                values.append(task.result())
+
+        return list(results.values()), values
+
+    def _trip_key(self, departure: Departure) -> Hashable:
+        destination = departure.destination
+        station = self.mapping.station(destination.id)
+
+        return (
+            departure.line_name,
+            departure.planned_time,
+            station or normalize_name(destination.name),
+        )
@@ -1,24 +1,50 @@
+from __future__ import annotations
+
+import asyncio
 import json
 import logging
+from collections.abc import Iterable
+from datetime import datetime, timedelta
 from enum import StrEnum
 from pprint import pprint
-
-import aiohttp
-
-from pyefa.data_classes import Stop, StopFilter, SystemInfo
+from typing import TYPE_CHECKING
+
+from pyefa import requests
+from pyefa.conditional import ConditionalStore
+from pyefa.data_classes import (
+    Journey,
+    Line,
+    Stop,
+    StopFilter,
+    StopSequence,
+    SystemInfo,
+    TransportType,
+)
 from pyefa.exceptions import EfaConnectionError
-from pyefa.requests import (
-    DeparturesRequest,
-    Request,
-    StopFinderRequest,
-    SystemInfoRequest,
+from pyefa.geometry import GeometryCache
+from pyefa.helpers import TZ_INFO
+from pyefa.infos import InfoChanges, InfoIndex
+from pyefa.merge import StopInterner
+from pyefa.metrics import TransferStats
+from pyefa.paging import DepartureWindows, WindowCache
+from pyefa.scheduler import RequestScheduler
+from pyefa.stop_cache import StopCache, cache_key
+from pyefa.transport import (
+    AiohttpTransport,
+    HttpxTransport,
+    Transport,
+    request_errors,
 )
 
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+    from pyefa.requests import Request
+
 _LOGGER = logging.getLogger(__name__)
 
 
 class Requests(StrEnum):
-
     SERVING_LINES = "XML_SERVINGLINES_REQUEST?commonMacro=servingLines"
     LINE_STOP = "XML_LINESTOP_REQUEST?commonMacro=linestop"
     COORD = "XML_COORD_REQUEST?commonMacro=coord"
@@ -30,19 +56,79 @@ class Requests(StrEnum):
     LINE_LIST = "XML_LINELIST_REQUEST?commonMacro=linelist"
 
 
+def decode_and_validate(
+    request_type: type[Request], text: str, debug: bool = False
+) -> dict:
+    """Decode JSON response `text` and validate it against the response schema
+    of `request_type`.
+
+    Module level function, so it can be sent to a process pool executor.
+
+    Args:
+        request_type (type[Request]): class of the request the response belongs to
+        text (str): response body
+        debug (bool, optional): print decoded response. Defaults to False.
+
+    Raises:
+        EfaResponseInvalid: Validation of the response failed
+
+    Returns:
+        dict: decoded response
+    """
+    response_json = json.loads(text)
+
+    if debug:
+        pprint(response_json)
+
+    request_type.validate(response_json)
+
+    return response_json
+
+
 class EfaClient:
     async def __aenter__(self):
-        self._client_session = aiohttp.ClientSession()
+        await self._transport.open()
         return self
 
     async def __aexit__(self, *args, **kwargs):
-        await self._client_session.__aexit__(*args, **kwargs)
+        await self._transport.close()
 
-    def __init__(self, url: str, debug: bool = False):
+    def __init__(
+        self,
+        url: str,
+        debug: bool = False,
+        transport: Transport | None = None,
+        conditional_requests: bool = True,
+        executor: Executor | None = None,
+        offload_threshold: int = 256 * 1024,
+        scheduler: RequestScheduler | None = None,
+        http2: bool = False,
+        stop_cache: StopCache | None = None,
+    ):
         """Create a new instance of client.
 
         Args:
             url (str): url string to EFA endpoint
+            transport (Transport | None, optional): transport used to send requests.
+            Defaults to `HttpxTransport` if `http2` is set, else `AiohttpTransport`.
+            conditional_requests (bool, optional): store responses with ETag/Last-Modified
+            and revalidate them with conditional requests. Defaults to True.
+            executor (Executor | None, optional): thread or process pool used to decode
+            and validate large responses off the event loop. Responses are parsed on
+            the event loop, so parsed objects share the pools of the client.
+            Defaults to None.
+            offload_threshold (int, optional): min. response size in characters
+            validated in `executor`. Defaults to 256 KiB.
+            scheduler (RequestScheduler | None, optional): scheduler limiting concurrent
+            requests by priority, see `pyefa.scheduler.priority()`. Defaults to a
+            `RequestScheduler` with default quotas, which allows 16 concurrent
+            requests. Requests sent outside of a `priority()` context have
+            `Priority.NORMAL`.
+            http2 (bool, optional): multiplex requests over HTTP/2 if no `transport`
+            is provided, requires httpx[http2]. Defaults to False.
+            stop_cache (StopCache | None, optional): cache of stop finder results,
+            validated against the system info of the endpoint, served unvalidated
+            while the system info request fails. Defaults to None.
 
         Raises:
             ValueError: No url provided
@@ -52,6 +138,28 @@ class EfaClient:
 
         self._debug: bool = debug
         self._base_url: str = url if url.endswith("/") else f"{url}/"
+        self._transport: Transport = transport or (
+            HttpxTransport() if http2 else AiohttpTransport()
+        )
+        self._conditional_store: ConditionalStore | None = (
+            ConditionalStore() if conditional_requests else None
+        )
+        self._executor: Executor | None = executor
+        self._offload_threshold: int = offload_threshold
+        self.transfer_stats: TransferStats = TransferStats()
+        self._window_cache: WindowCache = WindowCache()
+        self._geometry_cache: GeometryCache = GeometryCache()
+        self.info_index: InfoIndex = InfoIndex()
+        self.stop_cache: StopCache | None = stop_cache
+        self._stop_cache_validation: asyncio.Task | None = None
+        self.scheduler: RequestScheduler = (
+            RequestScheduler() if scheduler is None else scheduler
+        )
+
+    @property
+    def url(self) -> str:
+        """Url of the EFA endpoint."""
+        return self._base_url
 
     async def info(self) -> SystemInfo:
         """Get system info used by EFA endpoint.
@@ -61,13 +169,20 @@ class EfaClient:
         """
         _LOGGER.info("Request system info")
 
-        request = SystemInfoRequest()
-        response = await self._run_query(self._build_url(request))
+        request = requests.SystemInfoRequest()
+        info = await self._run_request(request)
+
+        if self.stop_cache is not None:
+            self.stop_cache.validate(info)
 
-        return request.parse(response)
+        return info
 
     async def stops(
-        self, name: str, type="any", filters: list[StopFilter] = []
+        self,
+        name: str,
+        type="any",
+        filters: list[StopFilter] = [],
+        top_k: int | None = None,
     ) -> list[Stop]:
         """Find stop(s) by provided `name` (coordinates or stop name).
 
@@ -76,6 +191,8 @@ class EfaClient:
             e.g. "Plärrer", "Nordostbanhof" or "de:09564:704"
             type (str, optional): ['any', 'coord']. Defaults to "any".
             filters (list[StopFilter]): List of filters to apply for search. Defaults to empty.
+            top_k (int | None, optional): return only the `top_k` best matches, e.g. for
+            autocomplete. Defaults to None (all matches).
 
         Returns:
             list[Stop]: List of station(s) provided by endpoint. List is sorted by match quality.
@@ -84,60 +201,391 @@ class EfaClient:
         _LOGGER.debug(f"type: {type}")
         _LOGGER.debug(f"filters: {filters}")
 
-        request = StopFinderRequest(type, name)
+        key = cache_key(name, type, sum(filters), top_k)
+
+        if self.stop_cache is not None:
+            if not self.stop_cache.validated:
+                await self._validate_stop_cache()
+
+            stops = self.stop_cache.get(key)
+
+            if stops is not None:
+                return stops
+
+        request = requests.StopFinderRequest(type, name, top_k)
 
         if filters:
             request.add_param("anyObjFilter_sf", sum(filters))
 
         # ToDo: add possibility for search by coordinates
 
-        response = await self._run_query(self._build_url(request))
+        stops = await self._run_request(request)
+
+        if self.stop_cache is not None:
+            self.stop_cache.put(key, stops)
+
+        return stops
+
+    async def _validate_stop_cache(self) -> None:
+        """Validate the stop cache against the system info, drops cached stops
+        of a previous data build.
+
+        Concurrent callers share one system info request. If it fails, cached
+        stops are served unvalidated and validation is retried by the next call.
+        """
+        if self._stop_cache_validation is None:
+            self._stop_cache_validation = asyncio.create_task(self.info())
 
-        return request.parse(response)
+        task = self._stop_cache_validation
 
-    async def trip(self):
-        raise NotImplementedError
+        try:
+            # a cancelled caller does not cancel the request of the others
+            await asyncio.shield(task)
+        except request_errors() as exc:
+            _LOGGER.warning(f"Validation of stop cache failed: {exc!r}")
+        finally:
+            if task.done() and self._stop_cache_validation is task:
+                self._stop_cache_validation = None
+
+    async def trip(
+        self,
+        origin: Stop | str,
+        destination: Stop | str,
+        date: str | None = None,
+        arrival: bool = False,
+        count: int | None = None,
+    ) -> list[Journey]:
+        """Find journeys from `origin` to `destination`.
+
+        Args:
+            origin (Stop | str): origin stop or stop id
+            destination (Stop | str): destination stop or stop id
+            date (str | None, optional): date(time) of departure. Defaults to now.
+            arrival (bool, optional): `date` is the arrival time. Defaults to False.
+            count (int | None, optional): number of journeys. Defaults to the
+            endpoint's default.
+
+        Returns:
+            list[Journey]: journeys
+        """
+        _LOGGER.info(f"Request trip from {origin} to {destination}")
+        _LOGGER.debug(f"date: {date}")
+
+        if isinstance(origin, Stop):
+            origin = origin.id
+
+        if isinstance(destination, Stop):
+            destination = destination.id
+
+        request = requests.TripRequest(origin, destination)
+
+        request.add_param_datetime(date)
+        request.add_param("itdTripDateTimeDepArr", "arr" if arrival else "dep")
+        request.add_param("calcNumberOfTrips", count)
+
+        return await self._run_request(request)
 
     async def departures(
         self,
         stop: Stop | str,
         limit=40,
         date: str | None = None,
+        interner: StopInterner | None = None,
+        transports: Iterable[TransportType] | None = None,
+        lines: Iterable[str] | None = None,
     ):
+        """Get departures of `stop`.
+
+        Args:
+            stop (Stop | str): stop or stop id
+            limit (int, optional): max. number of departures. Defaults to 40.
+            date (str | None, optional): date(time) of first departure. Defaults to now.
+            interner (StopInterner | None, optional): pool of stops shared between
+            responses. Defaults to None.
+            transports (Iterable[TransportType] | None, optional): return only
+            departures of these transport types, excluded on server side as well.
+            Defaults to None (all).
+            lines (Iterable[str] | None, optional): return only departures of these
+            line names. Filtered on client side, so less than `limit` departures may
+            be returned. Defaults to None (all).
+
+        Returns:
+            list[Departure]: departures
+        """
         _LOGGER.info(f"Request departures for stop {stop}")
         _LOGGER.debug(f"limit: {limit}")
         _LOGGER.debug(f"date: {date}")
+        _LOGGER.debug(f"transports: {transports}")
+        _LOGGER.debug(f"lines: {lines}")
 
         if isinstance(stop, Stop):
             stop = stop.id
 
-        request = DeparturesRequest(stop)
+        request = requests.DeparturesRequest(
+            stop, interner, self.info_index, transports, lines
+        )
 
         # add parameters
         request.add_param("limit", limit)
         request.add_param_datetime(date)
 
-        response = await self._run_query(self._build_url(request))
+        return await self._run_request(request)
+
+    async def sync_infos(self) -> InfoChanges:
+        """Sync current additional information messages (disruptions, construction
+        work) into `info_index`.
+
+        Unchanged responses are revalidated with conditional requests and messages
+        with a known id and version are not parsed again.
+
+        Returns:
+            InfoChanges: added, changed and removed messages
+        """
+        _LOGGER.info("Request additional infos")
+
+        request = requests.AddInfoRequest(self.info_index)
+        infos = await self._run_request(request)
+
+        return self.info_index.update(infos)
+
+    async def serving_lines(self, stop: Stop | str) -> list[Line]:
+        """Get lines serving `stop`.
+
+        Args:
+            stop (Stop | str): stop or stop id
+
+        Returns:
+            list[Line]: lines serving the stop
+        """
+        _LOGGER.info(f"Request serving lines for stop {stop}")
+
+        if isinstance(stop, Stop):
+            stop = stop.id
+
+        request = requests.ServingLinesRequest(stop)
+        return await self._run_request(request)
+
+    async def line_list(
+        self, net_branch_code: str | None = None, subnetwork: str | None = None
+    ) -> list[Line]:
+        """Get all lines of the network.
+
+        Args:
+            net_branch_code (str | None, optional): restrict to net branch code. Defaults to None.
+            subnetwork (str | None, optional): restrict to subnetwork. Defaults to None.
+
+        Returns:
+            list[Line]: lines
+        """
+        _LOGGER.info("Request line list")
+
+        request = requests.LineListRequest()
+
+        request.add_param("lineListNetBranchCode", net_branch_code)
+        request.add_param("lineListSubnetwork", subnetwork)
+
+        return await self._run_request(request)
 
-        return request.parse(response)
+    async def line_stops(self, line: Line | str) -> list[Stop]:
+        """Get stops of `line` in order of travel.
 
-    async def _run_query(self, query: str) -> dict:
+        Args:
+            line (Line | str): line or line id
+
+        Returns:
+            list[Stop]: stops of the line
+        """
+        _LOGGER.info(f"Request stops of line {line}")
+
+        if isinstance(line, Line):
+            line = line.id
+
+        request = requests.LineStopRequest(line)
+        return await self._run_request(request)
+
+    async def stop_sequence(
+        self,
+        line: Line | str,
+        stop: Stop | str | None = None,
+        trip_code: int | None = None,
+        date: str | None = None,
+    ) -> StopSequence:
+        """Get stop sequence and path coordinates of `line`.
+
+        Paths are shared between all trips of the same route, requesting many
+        trips of one line does not multiply memory used by geometries.
+
+        Args:
+            line (Line | str): line or line id
+            stop (Stop | str | None, optional): stop the trip serves. Defaults to None.
+            trip_code (int | None, optional): trip code. Defaults to None.
+            date (str | None, optional): date and/or time. Defaults to None.
+
+        Returns:
+            StopSequence: stops of the trip and its path
+        """
+        _LOGGER.info(f"Request stop sequence for line {line}")
+
+        if isinstance(line, Line):
+            line = line.id
+        if isinstance(stop, Stop):
+            stop = stop.id
+
+        request = requests.StopSeqCoordRequest(line, self._geometry_cache)
+
+        request.add_param("stop", stop)
+        request.add_param("tripCode", trip_code)
+        request.add_param_datetime(date)
+
+        return await self._run_request(request)
+
+    async def trip_stop_times(
+        self,
+        line: Line | str,
+        stop: Stop | str,
+        trip_code: int,
+        date: str | None = None,
+    ) -> StopSequence:
+        """Get planned and estimated times of a trip at all its stops.
+
+        Args:
+            line (Line | str): line or line id
+            stop (Stop | str): stop the trip serves
+            trip_code (int): trip code
+            date (str | None, optional): date and/or time. Defaults to None.
+
+        Returns:
+            StopSequence: stops of the trip with times, without path
+        """
+        _LOGGER.info(f"Request stop times for trip {trip_code} of line {line}")
+
+        if isinstance(line, Line):
+            line = line.id
+        if isinstance(stop, Stop):
+            stop = stop.id
+
+        request = requests.TripStopTimesRequest(line, stop, trip_code)
+        request.add_param_datetime(date)
+
+        return await self._run_request(request)
+
+    def departures_iter(
+        self,
+        stop: Stop | str,
+        start: datetime | None = None,
+        window: timedelta = timedelta(minutes=10),
+        horizon: timedelta = timedelta(hours=3),
+        limit: int = 20,
+    ) -> DepartureWindows:
+        """Iterate over departures of `stop` fetched lazily in time windows.
+
+        Example:
+            async for departure in client.departures_iter("de:09564:704"):
+                ...
+
+        Args:
+            stop (Stop | str): stop or stop id
+            start (datetime | None, optional): start of first window. Defaults to now.
+            window (timedelta, optional): length of one window. Defaults to 10 minutes.
+            horizon (timedelta, optional): time span to cover. Defaults to 3 hours.
+            limit (int, optional): max. departures per request. Defaults to 20.
+
+        Returns:
+            DepartureWindows: async iterator over departures sorted by planned time
+        """
+        if isinstance(stop, Stop):
+            stop = stop.id
+
+        if start is None:
+            start = datetime.now(TZ_INFO)
+
+        return DepartureWindows(
+            self.departures,
+            stop,
+            start,
+            window,
+            horizon,
+            limit,
+            self._window_cache,
+        )
+
+    async def fetch_raw(self, name: str, query: str = "") -> str:
+        """Get the response of request `name` with url `query` as sent by the
+        endpoint, e.g. for proxies. The response is neither validated nor parsed.
+
+        Args:
+            name (str): request name, e.g. "XML_DM_REQUEST"
+            query (str, optional): url query string. Defaults to empty.
+
+        Raises:
+            EfaConnectionError: Request failed
+
+        Returns:
+            str: response text
+        """
+        _LOGGER.info(f"Request raw {name}")
+
+        return await self._run_query(f"{self._base_url}{name}?{query}")
+
+    async def _run_request(self, request: Request):
+        """Send `request` and parse the response.
+
+        Responses larger than the offload threshold are decoded and validated
+        in the executor to keep the event loop responsive. Only the request
+        class is sent to the executor, interning pools stay on the event loop.
+        """
+        text = await self._run_query(self._build_url(request))
+
+        if self._executor is not None and len(text) >= self._offload_threshold:
+            _LOGGER.debug(f"Offloading validation of {len(text)} characters")
+
+            loop = asyncio.get_running_loop()
+
+            data = await loop.run_in_executor(
+                self._executor, decode_and_validate, type(request), text, self._debug
+            )
+        else:
+            data = decode_and_validate(type(request), text, self._debug)
+
+        return request.parse_validated(data)
+
+    async def _run_query(self, query: str) -> str:
         _LOGGER.info(f"Run query {query}")
 
-        async with self._client_session.get(query) as response:
-            _LOGGER.debug(f"Response status: {response.status}")
+        stored = None
+        headers = {}
+
+        if self._conditional_store is not None:
+            stored = self._conditional_store.get(query)
+
+            if stored is not None:
+                headers = stored.validators()
+
+        async with self.scheduler.slot():
+            response = await self._transport.get(query, headers)
 
-            if response.status == 200:
-                response_json = json.loads(await response.text())
+        _LOGGER.debug(f"Response status: {response.status}")
 
-                if self._debug:
-                    pprint(response_json)
+        if response.status == 304 and stored is not None:
+            _LOGGER.debug("Response not modified, serving stored response")
 
-                return response_json
-            else:
-                raise EfaConnectionError(
-                    f"Failed to fetch data from endpoint. Returned {response.status}"
+            self.transfer_stats.add_not_modified(response.transferred, stored.wire_size)
+
+            return stored.text
+
+        if response.status == 200:
+            self.transfer_stats.add_response(response.transferred, response.size)
+
+            if self._conditional_store is not None:
+                self._conditional_store.put(
+                    query, response.text, response.transferred, response.headers
                 )
 
+            return response.text
+        else:
+            raise EfaConnectionError(
+                f"Failed to fetch data from endpoint. Returned {response.status}"
+            )
+
     def _build_url(self, request: Request):
         return self._base_url + str(request)
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class StoredResponse:
+    text: str
+    wire_size: int
+    etag: str | None = None
+    last_modified: str | None = None
+
+    def validators(self) -> dict[str, str]:
+        """Return headers turning a request for this response into a conditional one.
+
+        Returns:
+            dict[str, str]: `If-None-Match` and/or `If-Modified-Since` headers
+        """
+        headers = {}
+
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+
+        return headers
+
+
+class ConditionalStore:
+    """Local store of responses carrying `ETag` or `Last-Modified` validators.
+
+    Stored responses are used to send conditional requests and served again
+    if the endpoint answers with `304 Not Modified`. The least recently used
+    entries are dropped if more than `max_entries` responses are stored.
+    """
+
+    def __init__(self, max_entries: int = 128) -> None:
+        if max_entries < 1:
+            raise ValueError("Store must keep at least one entry")
+
+        self._max_entries: int = max_entries
+        self._entries: OrderedDict[str, StoredResponse] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, url: str) -> StoredResponse | None:
+        entry = self._entries.get(url)
+
+        if entry is not None:
+            self._entries.move_to_end(url)
+
+        return entry
+
+    def put(self, url: str, text: str, wire_size: int, headers: dict[str, str]) -> bool:
+        """Store response for `url` if it carries validators.
+
+        Args:
+            url (str): query url
+            text (str): decoded response body
+            wire_size (int): transferred response size
+            headers (dict[str, str]): response headers
+
+        Returns:
+            bool: True if response was stored
+        """
+        headers = {k.lower(): v for k, v in headers.items()}
+
+        etag = headers.get("etag")
+        last_modified = headers.get("last-modified")
+
+        if not etag and not last_modified:
+            self._entries.pop(url, None)
+            return False
+
+        self._entries[url] = StoredResponse(text, wire_size, etag, last_modified)
+        self._entries.move_to_end(url)
+
+        while len(self._entries) > self._max_entries:
+            dropped, _ = self._entries.popitem(last=False)
+            _LOGGER.debug(f"Dropped stored response for {dropped}")
+
+        return True
+
+    def clear(self) -> None:
+        self._entries.clear()
@@ -1,7 +1,11 @@
+from __future__ import annotations
+
 from dataclasses import dataclass, field
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
 from enum import IntEnum, StrEnum
 
+from pyefa.geometry import Polyline
+
 
 class StopType(StrEnum):
     STOP = "stop"
@@ -44,6 +48,7 @@ class SystemInfo:
     data_format: str
     valid_from: date
     valid_to: date
+    data_build: str = ""
 
 
 @dataclass
@@ -56,6 +61,38 @@ class Stop:
     transports: list[TransportType] = field(default_factory=list)
 
 
+@dataclass
+class Line:
+    id: str
+    name: str
+    number: str
+    description: str
+    product: TransportType
+    origin: Stop | None = None
+    destination: Stop | None = None
+
+
+@dataclass
+class Info:
+    """Additional information message, e.g. a disruption or construction work.
+
+    `lines` and `stops` are ids of affected lines and stops.
+    """
+
+    id: str
+    version: int
+    type: str
+    priority: str = "normal"
+    title: str = ""
+    subtitle: str = ""
+    content: str = ""
+    url: str = ""
+    valid_from: datetime | None = None
+    valid_to: datetime | None = None
+    lines: list[str] = field(default_factory=list)
+    stops: list[str] = field(default_factory=list)
+
+
 @dataclass
 class Departure:
     line_name: str
@@ -65,4 +102,48 @@ class Departure:
     transport: TransportType
     planned_time: datetime
     estimated_time: datetime | None
-    infos: list[dict]
+    infos: list[Info]
+    cancelled: bool = False
+
+
+@dataclass
+class Journey:
+    """Summary of a trip request journey, `lines` are the line numbers of all
+    public transport legs."""
+
+    origin: Stop
+    destination: Stop
+    departure_planned: datetime
+    arrival_planned: datetime
+    departure_estimated: datetime | None = None
+    arrival_estimated: datetime | None = None
+    interchanges: int = 0
+    lines: list[str] = field(default_factory=list)
+
+    @property
+    def departure(self) -> datetime:
+        return self.departure_estimated or self.departure_planned
+
+    @property
+    def arrival(self) -> datetime:
+        return self.arrival_estimated or self.arrival_planned
+
+    @property
+    def duration(self) -> timedelta:
+        return self.arrival - self.departure
+
+
+@dataclass
+class StopTime:
+    stop: Stop
+    arrival_planned: datetime | None = None
+    arrival_estimated: datetime | None = None
+    departure_planned: datetime | None = None
+    departure_estimated: datetime | None = None
+
+
+@dataclass
+class StopSequence:
+    line: Line
+    stops: list[StopTime]
+    path: Polyline | None = None
@@ -0,0 +1,402 @@
+from __future__ import annotations
+
+import logging
+import math
+from datetime import datetime, timedelta
+
+from pyefa.data_classes import Departure
+from pyefa.helpers import TZ_INFO
+from pyefa.merge import TripKey, trip_key
+
+_LOGGER = logging.getLogger(__name__)
+
+# delays below 2 * SUB_BUCKETS seconds are stored exactly, larger ones in
+# log-linear buckets with a relative error of at most 1 / SUB_BUCKETS
+SUB_BUCKET_BITS = 5
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+
+BucketKey = tuple[str, str, datetime]
+
+
+def _bucket(value: int) -> int:
+    magnitude = abs(value)
+    shift = max(0, magnitude.bit_length() - SUB_BUCKET_BITS - 1)
+    index = shift * SUB_BUCKETS + (magnitude >> shift)
+
+    return index if value >= 0 else -index
+
+
+def _bucket_value(bucket: int) -> float:
+    index = abs(bucket)
+    shift = max(0, index // SUB_BUCKETS - 1)
+    lower = (index - shift * SUB_BUCKETS) << shift
+    value = lower + ((1 << shift) - 1) / 2
+
+    return value if bucket >= 0 else -value
+
+
+class DelayHistogram:
+    """Mergeable delay histogram with bounded memory (HDR histogram like).
+
+    Delays are counted in sparse log-linear buckets of whole seconds, so the
+    number of buckets grows with the logarithm of the largest delay only.
+    Departures without realtime data and cancelled departures are counted
+    separately.
+    """
+
+    def __init__(self) -> None:
+        self._buckets: dict[int, int] = {}
+        self.count: int = 0
+        self.sum: float = 0
+        self.min: float | None = None
+        self.max: float | None = None
+        self.cancelled: int = 0
+        self.unknown: int = 0
+
+    def __len__(self) -> int:
+        return self.total
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, DelayHistogram):
+            return NotImplemented
+
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        return (
+            f"DelayHistogram(count={self.count}, mean={self.mean:.1f}, "
+            f"cancelled={self.cancelled}, unknown={self.unknown})"
+        )
+
+    @property
+    def total(self) -> int:
+        """Number of all observed departures."""
+        return self.count + self.cancelled + self.unknown
+
+    @property
+    def mean(self) -> float:
+        """Mean delay in seconds."""
+        return self.sum / self.count if self.count else 0
+
+    @property
+    def cancellation_rate(self) -> float:
+        return self.cancelled / self.total if self.total else 0
+
+    def add(self, delay: float | None, cancelled: bool = False) -> None:
+        """Add one departure.
+
+        Args:
+            delay (float | None): delay in seconds, negative if early, None if no
+            realtime data is available
+            cancelled (bool, optional): departure is cancelled. Defaults to False.
+        """
+        if cancelled:
+            self.cancelled += 1
+            return
+
+        if delay is None:
+            self.unknown += 1
+            return
+
+        bucket = _bucket(round(delay))
+        self._buckets[bucket] = self._buckets.get(bucket, 0) + 1
+
+        self.count += 1
+        self.sum += delay
+        self.min = delay if self.min is None else min(self.min, delay)
+        self.max = delay if self.max is None else max(self.max, delay)
+
+    def add_departure(self, departure: Departure) -> None:
+        delay = None
+
+        if departure.estimated_time and departure.planned_time:
+            delay = (departure.estimated_time - departure.planned_time).total_seconds()
+
+        self.add(delay, departure.cancelled)
+
+    def percentile(self, q: float) -> float:
+        """Return `q`-th percentile of delays in seconds.
+
+        Args:
+            q (float): percentile between 0 and 100
+
+        Returns:
+            float: delay in seconds, precise to the bucket width
+        """
+        if not self.count:
+            return 0
+
+        rank = min(self.count, max(1, math.ceil(q / 100 * self.count)))
+        seen = 0
+
+        for bucket in sorted(self._buckets):
+            seen += self._buckets[bucket]
+
+            if seen >= rank:
+                return min(max(_bucket_value(bucket), self.min), self.max)
+
+        return self.max
+
+    def merge(self, other: DelayHistogram) -> DelayHistogram:
+        """Add counts of `other` to this histogram.
+
+        Args:
+            other (DelayHistogram): histogram, e.g. of another worker
+
+        Returns:
+            DelayHistogram: self
+        """
+        for bucket, count in other._buckets.items():
+            self._buckets[bucket] = self._buckets.get(bucket, 0) + count
+
+        self.count += other.count
+        self.sum += other.sum
+        self.cancelled += other.cancelled
+        self.unknown += other.unknown
+
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+        if other.max is not None:
+            self.max = other.max if self.max is None else max(self.max, other.max)
+
+        return self
+
+    def to_dict(self) -> dict:
+        return {
+            "buckets": {str(k): v for k, v in sorted(self._buckets.items())},
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min,
+            "max": self.max,
+            "cancelled": self.cancelled,
+            "unknown": self.unknown,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> DelayHistogram:
+        histogram = cls()
+        histogram._buckets = {int(k): v for k, v in data["buckets"].items()}
+        histogram.count = data["count"]
+        histogram.sum = data["sum"]
+        histogram.min = data["min"]
+        histogram.max = data["max"]
+        histogram.cancelled = data["cancelled"]
+        histogram.unknown = data["unknown"]
+
+        return histogram
+
+
+class DelayAggregator:
+    """Incremental punctuality statistics per line, stop and hour.
+
+    Departure boards of continuous polling are fed with `add()`. The same trip
+    is seen in many polls, so departures are held back until their planned
+    departure time plus `grace` has passed and only the latest estimate is
+    counted. Only finalized statistics are kept afterwards, memory is bounded
+    by the number of upcoming departures and the `max_hours` retention.
+
+    Aggregates of several workers are combined with `merge()`, `to_dict()` and
+    `from_dict()` serialize them to JSON compatible data.
+
+    Args:
+        grace (timedelta, optional): time after planned departure the delay of a
+        departure is considered final. Defaults to 5 minutes.
+        max_hours (int, optional): number of hours statistics are kept, older
+        hour buckets are dropped. Defaults to 7 days.
+    """
+
+    def __init__(
+        self, grace: timedelta = timedelta(minutes=5), max_hours: int = 7 * 24
+    ) -> None:
+        self._grace: timedelta = grace
+        self._max_hours: int = max_hours
+        self._pending: dict[tuple[str, TripKey], Departure] = {}
+        self._buckets: dict[BucketKey, DelayHistogram] = {}
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    @property
+    def pending(self) -> int:
+        """Number of departures waiting for their final delay."""
+        return len(self._pending)
+
+    def add(
+        self, stop: str, departures: list[Departure], now: datetime | None = None
+    ) -> int:
+        """Add departures of one departure board poll.
+
+        Args:
+            stop (str): id of the stop the departures are for
+            departures (list[Departure]): departures
+            now (datetime | None, optional): time of the poll. Defaults to now.
+
+        Returns:
+            int: number of departures finalized into statistics
+        """
+        for departure in departures:
+            if departure.planned_time is None:
+                continue
+
+            self._pending[(stop, trip_key(departure))] = departure
+
+        return self.flush(datetime.now(TZ_INFO) if now is None else now)
+
+    def flush(self, now: datetime | None = None) -> int:
+        """Finalize pending departures whose planned time plus grace has passed.
+
+        Args:
+            now (datetime | None, optional): current time, None finalizes all
+            pending departures. Defaults to None.
+
+        Returns:
+            int: number of finalized departures
+        """
+        due = [
+            key
+            for key, departure in self._pending.items()
+            if now is None or self._departed(departure) + self._grace <= now
+        ]
+
+        for key in due:
+            departure = self._pending.pop(key)
+            self._histogram(
+                departure.line_name, key[0], departure.planned_time
+            ).add_departure(departure)
+
+        if due:
+            self._evict()
+
+        return len(due)
+
+    def get(self, line: str, stop: str, hour: datetime) -> DelayHistogram:
+        """Return statistics of `line` at `stop` in the hour starting at `hour`."""
+        return self._buckets.get((line, stop, self._hour(hour)), DelayHistogram())
+
+    def line(self, line: str, since: datetime | None = None) -> DelayHistogram:
+        """Return statistics of `line` over all stops.
+
+        Args:
+            line (str): line name, e.g. "U1"
+            since (datetime | None, optional): ignore older hours. Defaults to None.
+
+        Returns:
+            DelayHistogram: combined statistics
+        """
+        return self._combine(lambda key: key[0] == line, since)
+
+    def stop(self, stop: str, since: datetime | None = None) -> DelayHistogram:
+        """Return statistics of all lines at `stop`.
+
+        Args:
+            stop (str): stop id
+            since (datetime | None, optional): ignore older hours. Defaults to None.
+
+        Returns:
+            DelayHistogram: combined statistics
+        """
+        return self._combine(lambda key: key[1] == stop, since)
+
+    def total(self, since: datetime | None = None) -> DelayHistogram:
+        return self._combine(lambda key: True, since)
+
+    def hours(self, line: str | None = None, stop: str | None = None) -> list[datetime]:
+        """Return sorted hours with statistics, optionally of `line` and/or `stop`."""
+        return sorted(
+            {
+                key[2]
+                for key in self._buckets
+                if (line is None or key[0] == line) and (stop is None or key[1] == stop)
+            }
+        )
+
+    def merge(self, other: DelayAggregator) -> DelayAggregator:
+        """Add finalized statistics of `other`, e.g. of another worker.
+
+        Args:
+            other (DelayAggregator): aggregator
+
+        Returns:
+            DelayAggregator: self
+        """
+        for (line, stop, hour), histogram in other._buckets.items():
+            self._histogram(line, stop, hour).merge(histogram)
+
+        self._evict()
+
+        return self
+
+    def to_dict(self) -> dict:
+        return {
+            "buckets": [
+                {
+                    "line": line,
+                    "stop": stop,
+                    "hour": hour.isoformat(),
+                    "histogram": histogram.to_dict(),
+                }
+                for (line, stop, hour), histogram in self._buckets.items()
+            ]
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict, **kwargs) -> DelayAggregator:
+        aggregator = cls(**kwargs)
+
+        for entry in data["buckets"]:
+            aggregator._histogram(
+                entry["line"], entry["stop"], datetime.fromisoformat(entry["hour"])
+            ).merge(DelayHistogram.from_dict(entry["histogram"]))
+
+        aggregator._evict()
+
+        return aggregator
+
+    @staticmethod
+    def _hour(time: datetime) -> datetime:
+        if time.tzinfo is not None:
+            time = time.astimezone(TZ_INFO)
+
+        return time.replace(minute=0, second=0, microsecond=0)
+
+    @staticmethod
+    def _departed(departure: Departure) -> datetime:
+        if (
+            departure.estimated_time
+            and departure.estimated_time > departure.planned_time
+        ):
+            return departure.estimated_time
+
+        return departure.planned_time
+
+    def _histogram(self, line: str, stop: str, time: datetime) -> DelayHistogram:
+        key = (line, stop, self._hour(time))
+        histogram = self._buckets.get(key)
+
+        if histogram is None:
+            histogram = self._buckets[key] = DelayHistogram()
+
+        return histogram
+
+    def _combine(self, match, since: datetime | None) -> DelayHistogram:
+        since = None if since is None else self._hour(since)
+        histogram = DelayHistogram()
+
+        for key, value in self._buckets.items():
+            if match(key) and (since is None or key[2] >= since):
+                histogram.merge(value)
+
+        return histogram
+
+    def _evict(self) -> None:
+        if not self._buckets:
+            return
+
+        oldest = max(x[2] for x in self._buckets) - timedelta(hours=self._max_hours - 1)
+        expired = [x for x in self._buckets if x[2] < oldest]
+
+        for key in expired:
+            del self._buckets[key]
+
+        if expired:
+            _LOGGER.debug(f"{len(expired)} expired delay statistics bucket(s) dropped")
@@ -0,0 +1,482 @@
+"""Batched export of polled departures to NDJSON or Parquet files.
+
+Sinks buffer departure boards and hand full batches to a background writer,
+which converts and writes them in a worker thread. Files are rotated by size
+or age (also while no departures are put) and are written with a `.part`
+suffix until they are complete. If the
+writer falls behind, `put()` waits until a batch is written (backpressure), so
+memory is bounded by `batch_size * (max_pending + 2)` departures.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+import uuid
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO
+
+from pyefa.data_classes import Departure
+from pyefa.helpers import TZ_INFO
+
+if TYPE_CHECKING:
+    import pyarrow
+    import pyarrow.parquet
+
+_LOGGER = logging.getLogger(__name__)
+
+FIELDS = (
+    "stop",
+    "polled",
+    "line",
+    "route",
+    "transport",
+    "origin_id",
+    "origin_name",
+    "destination_id",
+    "destination_name",
+    "planned",
+    "estimated",
+    "delay",
+    "cancelled",
+    "infos",
+)
+
+Board = tuple[str, datetime, list[Departure]]
+
+
+@dataclass
+class ExportStats:
+    """Export statistics, `backpressure_waits` counts `put()` calls waiting for
+    the writer and `backpressure_time` their total wait time in seconds."""
+
+    records: int = 0
+    batches: int = 0
+    files: int = 0
+    bytes_written: int = 0
+    backpressure_waits: int = 0
+    backpressure_time: float = 0
+
+
+def rows(boards: Iterable[Board]) -> Iterator[tuple]:
+    """Return one flat row (ordered as `FIELDS`) per departure of `boards`.
+
+    Delays are in seconds, infos are referenced by id.
+    """
+    for stop_id, polled, departures in boards:
+        for x in departures:
+            estimated = x.estimated_time
+
+            yield (
+                stop_id,
+                polled,
+                x.line_name,
+                x.route,
+                int(x.transport),
+                x.origin.id,
+                x.origin.name,
+                x.destination.id,
+                x.destination.name,
+                x.planned_time,
+                estimated,
+                int((estimated - x.planned_time).total_seconds())
+                if estimated
+                else None,
+                x.cancelled,
+                [info.id for info in x.infos],
+            )
+
+
+class DepartureSink:
+    """Base class of departure export sinks.
+
+    Subclasses implement `_open_file()`, `_write()` and `_close_file()`, which
+    are called in a worker thread, one batch at a time.
+
+    Args:
+        directory (str | Path): output directory, created if missing
+        prefix (str, optional): file name prefix. Defaults to "departures".
+        batch_size (int, optional): min. departures per batch. Defaults to 1000.
+        max_pending (int, optional): max. batches waiting for the writer before
+        `put()` waits. Defaults to 4.
+        max_bytes (int | None, optional): rotate files after this size.
+        Defaults to 64 MiB.
+        max_file_age (float | None, optional): rotate files after this many
+        seconds. Defaults to 3600.
+        flush_interval (float, optional): max. seconds a partial batch is buffered
+        while departures are put. Defaults to 10.
+    """
+
+    suffix: str = ""
+
+    def __init__(
+        self,
+        directory: str | Path,
+        prefix: str = "departures",
+        batch_size: int = 1000,
+        max_pending: int = 4,
+        max_bytes: int | None = 64 * 1024 * 1024,
+        max_file_age: float | None = 3600,
+        flush_interval: float = 10,
+    ) -> None:
+        if batch_size < 1 or max_pending < 1:
+            raise ValueError("batch_size and max_pending must be at least 1")
+
+        self._directory: Path = Path(directory)
+        self._prefix: str = prefix
+        self._batch_size: int = batch_size
+        self._max_pending: int = max_pending
+        self._max_bytes: int | None = max_bytes
+        self._max_file_age: float | None = max_file_age
+        self._flush_interval: float = flush_interval
+
+        self._boards: list[Board] = []
+        self._buffered: int = 0
+        self._buffered_since: float = 0
+        self._queue: asyncio.Queue[list[Board] | None] | None = None
+        self._writer: asyncio.Task | None = None
+        self._error: Exception | None = None
+        self._id: str = uuid.uuid4().hex[:8]
+
+        # state of the current file, only used by the worker thread
+        self._path: Path | None = None
+        self._file_bytes: int = 0
+        self._file_opened: float = 0
+
+        self.stats: ExportStats = ExportStats()
+        self.files: list[Path] = []
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, *args, **kwargs):
+        await self.close()
+
+    async def open(self) -> None:
+        if self._writer is None:
+            self._directory.mkdir(parents=True, exist_ok=True)
+            self._queue = asyncio.Queue(self._max_pending)
+            self._writer = asyncio.create_task(self._run_writer())
+
+    async def close(self) -> None:
+        """Write buffered departures, complete the current file and stop the
+        writer.
+
+        Raises:
+            OSError: writing failed
+        """
+        if self._writer is None:
+            return
+
+        if self._boards:
+            await self._submit()
+
+        await self._queue.put(None)
+        await self._writer
+        self._writer = None
+
+        if self._path is not None:
+            await asyncio.to_thread(self._finish_file)
+
+        self._raise_error()
+
+    async def put(
+        self,
+        stop_id: str,
+        departures: list[Departure],
+        polled: datetime | None = None,
+    ) -> None:
+        """Add departures of `stop_id` polled at `polled`.
+
+        Departures are referenced until they are written and must not be
+        modified. Waits if the writer falls behind.
+
+        Args:
+            stop_id (str): id of the polled stop
+            departures (list[Departure]): departures, e.g. of `EfaClient.departures()`
+            polled (datetime | None, optional): time of the request. Defaults to now.
+
+        Raises:
+            OSError: writing a previous batch failed
+        """
+        if self._writer is None:
+            raise RuntimeError("Sink is not opened")
+
+        self._raise_error()
+
+        if not departures:
+            return
+
+        if not self._boards:
+            self._buffered_since = time.monotonic()
+
+        self._boards.append((stop_id, polled or datetime.now(TZ_INFO), departures))
+        self._buffered += len(departures)
+
+        if (
+            self._buffered >= self._batch_size
+            or time.monotonic() - self._buffered_since >= self._flush_interval
+        ):
+            await self._submit()
+
+    async def flush(self) -> None:
+        """Write all buffered departures and wait until they are written.
+
+        Raises:
+            OSError: writing failed
+        """
+        if self._writer is None:
+            return
+
+        if self._boards:
+            await self._submit()
+
+        await self._queue.join()
+
+        self._raise_error()
+
+    async def _submit(self) -> None:
+        boards, self._boards, self._buffered = self._boards, [], 0
+
+        if not self._queue.full():
+            self._queue.put_nowait(boards)
+            return
+
+        # writer is behind, the poller waits until a batch is written
+        self.stats.backpressure_waits += 1
+        start = time.perf_counter()
+
+        await self._queue.put(boards)
+
+        self.stats.backpressure_time += time.perf_counter() - start
+
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            raise self._error
+
+    async def _run_writer(self) -> None:
+        while True:
+            try:
+                boards = await asyncio.wait_for(self._queue.get(), self._idle_timeout())
+            except asyncio.TimeoutError:
+                # no departures put for max_file_age, complete the idle file
+                await self._run_in_writer(self._finish_file)
+                continue
+
+            try:
+                if boards is None:
+                    return
+
+                await self._run_in_writer(self._write_batch, boards)
+            finally:
+                self._queue.task_done()
+
+    async def _run_in_writer(self, function, *args) -> None:
+        # after an error batches are dropped, so put() does not block
+        if self._error is not None:
+            return
+
+        try:
+            await asyncio.to_thread(function, *args)
+        except Exception as exc:  # noqa: BLE001
+            # any error has to be kept for put(), a dead writer would block it
+            _LOGGER.error(f"Export to {self._directory} failed: {exc!r}")
+            self._error = exc
+
+    def _idle_timeout(self) -> float | None:
+        """Return seconds until the current file has to be rotated by age, None
+        without current file or max. file age."""
+        if self._path is None or self._max_file_age is None:
+            return None
+
+        return max(0, self._file_opened + self._max_file_age - time.monotonic())
+
+    def _write_batch(self, boards: list[Board]) -> None:
+        if self._path is not None and (
+            (self._max_bytes is not None and self._file_bytes >= self._max_bytes)
+            or (
+                self._max_file_age is not None
+                and time.monotonic() - self._file_opened >= self._max_file_age
+            )
+        ):
+            self._finish_file()
+
+        if self._path is None:
+            # unique per sink, several sinks (or processes) may share a directory
+            name = f"{self._prefix}-{datetime.now(TZ_INFO):%Y%m%dT%H%M%S}-{self._id}"
+            self._path = self._directory / f"{name}-{self.stats.files:05d}{self.suffix}"
+            self._file_bytes = 0
+            self._file_opened = time.monotonic()
+
+            self._open_file(self._path.with_name(self._path.name + ".part"))
+
+        written = self._write(boards)
+
+        self._file_bytes += written
+        self.stats.bytes_written += written
+        self.stats.records += sum(len(x[2]) for x in boards)
+        self.stats.batches += 1
+
+    def _finish_file(self) -> None:
+        if self._path is None:
+            return
+
+        written = self._close_file()
+
+        self._file_bytes += written
+        self.stats.bytes_written += written
+        self._path.with_name(self._path.name + ".part").replace(self._path)
+
+        _LOGGER.debug(f"Export file {self._path} completed")
+
+        self.files.append(self._path)
+        self.stats.files += 1
+        self._path = None
+
+    def _open_file(self, path: Path) -> None:
+        raise NotImplementedError("Abstract method not implemented")
+
+    def _write(self, boards: list[Board]) -> int:
+        """Write `boards` and return the number of written bytes."""
+        raise NotImplementedError("Abstract method not implemented")
+
+    def _close_file(self) -> int:
+        """Close the current file and return the number of bytes written on
+        closing, e.g. a file footer."""
+        raise NotImplementedError("Abstract method not implemented")
+
+
+class NdjsonSink(DepartureSink):
+    """Export departures as newline delimited JSON, one object per departure
+    with the keys of `FIELDS`. See `DepartureSink` for arguments."""
+
+    suffix = ".ndjson"
+
+    _encoder = json.JSONEncoder(
+        ensure_ascii=False, separators=(",", ":"), default=datetime.isoformat
+    )
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+
+        self._file: BinaryIO | None = None
+
+    def _open_file(self, path: Path) -> None:
+        # open across batches until the file is rotated, closed by _close_file()
+        self._file = open(path, "wb")  # noqa: SIM115
+
+    def _write(self, boards: list[Board]) -> int:
+        encode = self._encoder.encode
+        lines = [encode(dict(zip(FIELDS, row))) for row in rows(boards)]
+
+        data = ("\n".join(lines) + "\n").encode("utf-8") if lines else b""
+        self._file.write(data)
+
+        return len(data)
+
+    def _close_file(self) -> int:
+        self._file.close()
+        self._file = None
+
+        return 0
+
+
+class ParquetSink(DepartureSink):
+    """Export departures as Parquet files with the columns of `FIELDS`, one row
+    group per batch. Requires the optional `pyarrow` dependency
+    (`pip install pyefa[parquet]`).
+
+    Args:
+        compression (str, optional): column compression. Defaults to "zstd".
+
+    See `DepartureSink` for the other arguments.
+    """
+
+    suffix = ".parquet"
+
+    def __init__(self, *args, compression: str = "zstd", **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+
+        self._compression: str = compression
+        self._schema: pyarrow.Schema | None = None
+        self._stream: pyarrow.NativeFile | None = None
+        self._file: pyarrow.parquet.ParquetWriter | None = None
+        self._reported: int = 0
+
+    async def open(self) -> None:
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as exc:
+            raise ImportError(
+                "Parquet export requires pyarrow, install pyefa[parquet]"
+            ) from exc
+
+        await super().open()
+
+    def _open_file(self, path: Path) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        timestamp = pa.timestamp("s", tz="UTC")
+
+        self._schema = pa.schema(
+            [
+                ("stop", pa.string()),
+                ("polled", timestamp),
+                ("line", pa.string()),
+                ("route", pa.string()),
+                ("transport", pa.int8()),
+                ("origin_id", pa.string()),
+                ("origin_name", pa.string()),
+                ("destination_id", pa.string()),
+                ("destination_name", pa.string()),
+                ("planned", timestamp),
+                ("estimated", timestamp),
+                ("delay", pa.int32()),
+                ("cancelled", pa.bool_()),
+                ("infos", pa.list_(pa.string())),
+            ]
+        )
+        # sizes are taken from the stream position, the writer may buffer
+        self._stream = pa.OSFile(str(path), "wb")
+        self._reported = 0
+        self._file = pq.ParquetWriter(
+            self._stream, self._schema, compression=self._compression
+        )
+
+    def _write(self, boards: list[Board]) -> int:
+        import pyarrow as pa
+
+        columns = list(zip(*rows(boards))) or [()] * len(FIELDS)
+        table = pa.Table.from_arrays(
+            [pa.array(x, type=f.type) for x, f in zip(columns, self._schema)],
+            schema=self._schema,
+        )
+
+        self._file.write_table(table)
+
+        return self._written()
+
+    def _close_file(self) -> int:
+        # writes the footer, the stream is closed separately
+        self._file.close()
+        written = self._written()
+        self._stream.close()
+
+        self._file = self._stream = None
+
+        return written
+
+    def _written(self) -> int:
+        """Return bytes written to the stream since the last call, incl. the
+        header written on opening."""
+        position = self._stream.tell()
+        written, self._reported = position - self._reported, position
+
+        return written
@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from pyefa.data_classes import StopFilter
+from pyefa.scheduler import Priority, priority
+from pyefa.transport import request_errors
+
+if TYPE_CHECKING:
+    from pyefa.client import EfaClient
+
+_LOGGER = logging.getLogger(__name__)
+
+_TRANSLITERATION = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss"})
+_SEPARATORS = re.compile(r"[\s,.;:/()\-]+")
+_ABBREVIATIONS = {
+    "hauptbahnhof": "hbf",
+    "bahnhof": "bf",
+    "strasse": "str",
+    "platz": "pl",
+}
+
+
+def normalize_name(name: str) -> str:
+    """Normalize free-text stop name for deduplication.
+
+    Case, umlaut spelling ("ü"/"ue"), accents, punctuation, whitespace and
+    common abbreviations ("Hauptbahnhof"/"Hbf") are unified, e.g.
+    "Nürnberg Hbf" and "nuernberg  hauptbahnhof " both become "nuernberg hbf".
+
+    Args:
+        name (str): stop name
+
+    Returns:
+        str: normalized name
+    """
+    # composed umlauts first, so decomposed input ("u" + U+0308) is transliterated
+    name = unicodedata.normalize("NFC", name).casefold().translate(_TRANSLITERATION)
+    name = unicodedata.normalize("NFKD", name)
+    name = "".join(x for x in name if not unicodedata.combining(x))
+
+    tokens = []
+
+    for token in _SEPARATORS.split(name):
+        if not token:
+            continue
+
+        for word, abbreviation in _ABBREVIATIONS.items():
+            if token.endswith(word):
+                token = token[: -len(word)] + abbreviation
+                break
+
+        tokens.append(token)
+
+    return " ".join(tokens)
+
+
+@dataclass
+class Resolution:
+    stop_id: str | None
+    stop_name: str | None = None
+
+
+class ResolutionStore:
+    """Persistent store of name to stop resolutions (SQLite).
+
+    Unresolvable names are stored as well, so they are not queried again.
+    The store may be used from worker threads (e.g. `asyncio.to_thread()`),
+    access to the database is serialized.
+
+    Args:
+        path (str | Path, optional): database file. Defaults to ":memory:".
+    """
+
+    def __init__(self, path: str | Path = ":memory:") -> None:
+        self._lock: threading.Lock = threading.Lock()
+        self._db: sqlite3.Connection = sqlite3.connect(
+            str(path), check_same_thread=False
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS resolutions ("
+            "name TEXT PRIMARY KEY, stop_id TEXT, stop_name TEXT, updated REAL)"
+        )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM resolutions").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def get_many(self, names: list[str]) -> dict[str, Resolution]:
+        """Return stored resolutions of normalized `names`.
+
+        Args:
+            names (list[str]): normalized names
+
+        Returns:
+            dict[str, Resolution]: resolutions of known names
+        """
+        result = {}
+
+        with self._lock:
+            # stay below SQLite's limit of host parameters
+            for i in range(0, len(names), 500):
+                chunk = names[i : i + 500]
+                rows = self._db.execute(
+                    "SELECT name, stop_id, stop_name FROM resolutions WHERE name IN "
+                    f"({', '.join('?' * len(chunk))})",
+                    chunk,
+                )
+
+                result.update({x[0]: Resolution(x[1], x[2]) for x in rows})
+
+        return result
+
+    def put_many(self, resolutions: dict[str, Resolution]) -> None:
+        now = time.time()
+
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO resolutions VALUES (?, ?, ?, ?)",
+                [(k, v.stop_id, v.stop_name, now) for k, v in resolutions.items()],
+            )
+
+
+@dataclass
+class ResolverStats:
+    names: int = 0
+    distinct: int = 0
+    store_hits: int = 0
+    lookups: int = 0
+    unresolved: int = 0
+    errors: int = 0
+    duration: float = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of distinct names answered by the store."""
+        return self.store_hits / self.distinct if self.distinct else 0
+
+    @property
+    def throughput(self) -> float:
+        """Resolved input names per second."""
+        return self.names / self.duration if self.duration else 0
+
+
+class BulkResolver:
+    """Resolve many free-text stop names to stop ids.
+
+    Names are normalized and deduplicated before querying, distinct names not
+    in the store are looked up with bounded concurrency and bulk priority, and
+    all results are persisted, so re-imports are answered from the store.
+
+    Example:
+        resolver = BulkResolver(client, ResolutionStore("stops.sqlite"))
+        ids = await resolver.resolve(["Nürnberg Hbf", "nuernberg hbf "])
+
+    Args:
+        client (EfaClient): client used for stop finder requests
+        store (ResolutionStore | None, optional): store of resolutions. Defaults
+        to an in-memory store.
+        concurrency (int, optional): max. parallel lookups. Defaults to 8.
+        filters (list[StopFilter] | None, optional): stop finder filters.
+        Defaults to stops only.
+    """
+
+    def __init__(
+        self,
+        client: EfaClient,
+        store: ResolutionStore | None = None,
+        concurrency: int = 8,
+        filters: list[StopFilter] | None = None,
+    ) -> None:
+        self._client: EfaClient = client
+        self.store: ResolutionStore = ResolutionStore() if store is None else store
+        self._concurrency: int = concurrency
+        self._filters: list[StopFilter] = (
+            [StopFilter.STOPS] if filters is None else filters
+        )
+        self.stats: ResolverStats = ResolverStats()
+
+    async def resolve(self, names: Iterable[str]) -> dict[str, str | None]:
+        """Resolve `names` to stop ids.
+
+        Args:
+            names (Iterable[str]): free-text stop names
+
+        Returns:
+            dict[str, str | None]: stop id of the best match per input name, None
+            if nothing was found or the lookup failed
+        """
+        start = time.perf_counter()
+        names = list(names)
+
+        # first spelling of a normalized name is used for the query
+        queries: dict[str, str] = {}
+
+        for name in names:
+            queries.setdefault(normalize_name(name), name.strip())
+
+        queries.pop("", None)
+
+        # SQLite blocks, keep the event loop responsive for large imports
+        resolutions = await asyncio.to_thread(self.store.get_many, list(queries))
+        missing = [x for x in queries if x not in resolutions]
+
+        self.stats.names += len(names)
+        self.stats.distinct += len(queries)
+        self.stats.store_hits += len(resolutions)
+
+        found = await self._lookup({x: queries[x] for x in missing})
+
+        await asyncio.to_thread(self.store.put_many, found)
+        resolutions.update(found)
+
+        self.stats.unresolved += sum(1 for x in found.values() if x.stop_id is None)
+        self.stats.duration += time.perf_counter() - start
+
+        _LOGGER.info(
+            f"{len(names)} name(s) resolved: {len(queries)} distinct, "
+            f"{len(queries) - len(missing)} from store, {len(missing)} looked up"
+        )
+
+        result = {}
+
+        for name in names:
+            resolution = resolutions.get(normalize_name(name))
+            result[name] = resolution.stop_id if resolution else None
+
+        return result
+
+    async def _lookup(self, queries: dict[str, str]) -> dict[str, Resolution]:
+        semaphore = asyncio.Semaphore(self._concurrency)
+        found: dict[str, Resolution] = {}
+
+        async def lookup(normalized: str, query: str) -> None:
+            async with semaphore:
+                self.stats.lookups += 1
+
+                try:
+                    with priority(Priority.BULK):
+                        stops = await self._client.stops(
+                            query, filters=self._filters, top_k=1
+                        )
+                except request_errors() as exc:
+                    # failed lookups are not stored and retried next time
+                    _LOGGER.warning(f"Lookup of {query} failed: {exc!r}")
+                    self.stats.errors += 1
+                    return
+
+            if stops:
+                found[normalized] = Resolution(stops[0].id, stops[0].name)
+            else:
+                found[normalized] = Resolution(None)
+
+        await asyncio.gather(*[lookup(k, v) for k, v in queries.items()])
+
+        return found
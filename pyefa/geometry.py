@@ -0,0 +1,128 @@
+import logging
+from array import array
+from collections import OrderedDict
+from collections.abc import Hashable, Iterator, Sequence
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class Polyline:
+    """Compact, immutable polyline.
+
+    Coordinates are quantized to integers (`value * scale`) and stored delta
+    encoded in one `array("i")`, i.e. [x0, y0, x1 - x0, y1 - y0, ...]. The
+    default scale of 1 fits the projected integer coordinates EFA returns by
+    default, use e.g. 1e6 for WGS84 coordinates.
+    """
+
+    __slots__ = ("_deltas", "_hash", "_scale")
+
+    def __init__(self, coords: Sequence[Sequence[float]], scale: float = 1) -> None:
+        deltas = array("i")
+        prev_x = prev_y = 0
+
+        for coord in coords:
+            x = round(coord[0] * scale)
+            y = round(coord[1] * scale)
+
+            deltas.append(x - prev_x)
+            deltas.append(y - prev_y)
+
+            prev_x, prev_y = x, y
+
+        self._deltas: array = deltas
+        self._scale: float = scale
+        self._hash: int = hash((deltas.tobytes(), scale))
+
+    def __len__(self) -> int:
+        return len(self._deltas) // 2
+
+    def __iter__(self) -> Iterator[tuple[float, float]]:
+        x = y = 0
+        deltas = self._deltas
+        scale = self._scale
+
+        for i in range(0, len(deltas), 2):
+            x += deltas[i]
+            y += deltas[i + 1]
+
+            yield (x / scale, y / scale)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Polyline):
+            return NotImplemented
+
+        return self._scale == other._scale and self._deltas == other._deltas
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __repr__(self) -> str:
+        return f"Polyline({len(self)} points)"
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by encoded coordinates in bytes."""
+        return self._deltas.itemsize * len(self._deltas)
+
+    def coords(self) -> list[tuple[float, float]]:
+        return list(self)
+
+
+class GeometryCache:
+    """Cache of polylines shared across trips.
+
+    Polylines are cached by route, so the geometry of a route is decoded only
+    once, and interned by content, so equal polylines of different routes are
+    stored once as well.
+
+    Args:
+        max_routes (int, optional): max. number of cached routes. Defaults to 1024.
+    """
+
+    def __init__(self, max_routes: int = 1024) -> None:
+        self._max_routes: int = max_routes
+        self._routes: OrderedDict[Hashable, Polyline] = OrderedDict()
+        self._polylines: dict[Polyline, Polyline] = {}
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def __len__(self) -> int:
+        return len(self._routes)
+
+    def get(
+        self, route: Hashable, coords: Sequence[Sequence[float]], scale: float = 1
+    ) -> Polyline:
+        """Return shared polyline of `route`, encode `coords` if route is not cached.
+
+        Args:
+            route (Hashable): route key, e.g. line id and ids of served stops
+            coords (Sequence[Sequence[float]]): coordinates of the route
+            scale (float, optional): quantization scale. Defaults to 1.
+
+        Returns:
+            Polyline: shared polyline
+        """
+        polyline = self._routes.get(route)
+
+        if polyline is not None:
+            self.hits += 1
+            self._routes.move_to_end(route)
+            return polyline
+
+        self.misses += 1
+
+        polyline = Polyline(coords, scale)
+        polyline = self._polylines.setdefault(polyline, polyline)
+
+        self._routes[route] = polyline
+
+        while len(self._routes) > self._max_routes:
+            self._routes.popitem(last=False)
+
+        if len(self._polylines) > 2 * self._max_routes:
+            # drop polylines not referenced by any cached route anymore
+            used = set(self._routes.values())
+            self._polylines = {x: x for x in used}
+
+        return polyline
@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from pyefa.data_classes import Info
+from pyefa.exceptions import EfaResponseInvalid
+from pyefa.requests.parsers import parse_info
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class InfoChanges:
+    """Result of an incremental sync of additional information messages."""
+
+    added: list[Info] = field(default_factory=list)
+    changed: list[Info] = field(default_factory=list)
+    removed: list[Info] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+
+class InfoIndex:
+    """Pool and index of additional information messages.
+
+    Messages are identified by id and version. `intern()` returns one shared
+    `Info` per message version, so a disruption referenced by many departures
+    is parsed and stored once. `update()` replaces the set of current messages
+    (e.g. of an add info request) and maintains an index from affected lines
+    and stops to messages.
+
+    Interned messages are shared between departures, they should not be modified.
+
+    Args:
+        max_infos (int, optional): max. number of pooled messages which are not
+        current. Defaults to 4096.
+    """
+
+    def __init__(self, max_infos: int = 4096) -> None:
+        self._max_infos: int = max_infos
+        self._pool: OrderedDict[str, Info] = OrderedDict()
+        self.current: dict[str, Info] = {}
+        self._line_infos: dict[str, set[str]] = {}
+        self._stop_infos: dict[str, set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.current)
+
+    def __contains__(self, info_id: str) -> bool:
+        return info_id in self.current
+
+    def intern(self, info: dict) -> Info:
+        """Return shared message for raw `info`, it is validated and parsed only
+        if its id or version is unknown. Messages without id are not pooled.
+
+        Args:
+            info (dict): info dict of a rapidJSON response
+
+        Raises:
+            EfaResponseInvalid: `info` does not match `SCHEMA_INFO`
+
+        Returns:
+            Info: shared message
+        """
+        if isinstance(info, dict):
+            pooled = self._pool.get(info.get("id"))
+
+            if pooled is not None and pooled.version == info.get("version", 0):
+                self._pool.move_to_end(pooled.id)
+                return pooled
+
+        # imported on first miss, importing pyefa does not load voluptuous
+        from voluptuous import Invalid
+
+        from pyefa.requests import schemas
+
+        try:
+            schemas.SCHEMA_INFO(info)
+        except Invalid as exc:
+            raise EfaResponseInvalid(f"Info validation failed - {exc}") from None
+
+        if not info["id"]:
+            return parse_info(info)
+
+        pooled = self._pool[info["id"]] = parse_info(info)
+        self._pool.move_to_end(pooled.id)
+
+        while len(self._pool) > self._max_infos + len(self.current):
+            self._pool.popitem(last=False)
+
+        return pooled
+
+    def parse_current(self, info: dict) -> Info:
+        """Return current message for raw `info` of an add info response, it is
+        parsed only if its id or version changed since the last `update()`.
+
+        Messages embedded in departures may lack data (e.g. affected lines), so
+        pooled messages are not used here.
+
+        Args:
+            info (dict): info dict of an add info response
+
+        Returns:
+            Info: message
+        """
+        current = self.current.get(info.get("id"))
+
+        if current is not None and current.version == info.get("version", 0):
+            return current
+
+        return parse_info(info)
+
+    def update(self, infos: list[Info]) -> InfoChanges:
+        """Replace current messages by `infos`.
+
+        Args:
+            infos (list[Info]): all currently valid messages
+
+        Returns:
+            InfoChanges: added, changed and removed messages
+        """
+        changes = InfoChanges()
+        current = {x.id: x for x in infos}
+
+        for info in current.values():
+            previous = self.current.get(info.id)
+
+            if previous is None:
+                changes.added.append(info)
+            elif previous.version != info.version:
+                changes.changed.append(info)
+            else:
+                continue
+
+            if previous is not None:
+                self._unindex(previous)
+
+            self._index(info)
+            self._pool[info.id] = info
+
+        for info_id in self.current.keys() - current.keys():
+            info = self.current[info_id]
+            changes.removed.append(info)
+            self._unindex(info)
+
+        self.current = current
+
+        _LOGGER.info(
+            f"Infos synced: {len(changes.added)} added, {len(changes.changed)} "
+            f"changed, {len(changes.removed)} removed"
+        )
+
+        return changes
+
+    def get(self, info_id: str) -> Info | None:
+        return self.current.get(info_id) or self._pool.get(info_id)
+
+    def for_line(self, line: str) -> list[Info]:
+        """Return current messages affecting `line`.
+
+        Args:
+            line (str): line id
+
+        Returns:
+            list[Info]: messages
+        """
+        return [self.current[x] for x in sorted(self._line_infos.get(line, ()))]
+
+    def for_stop(self, stop: str) -> list[Info]:
+        """Return current messages affecting `stop`.
+
+        Args:
+            stop (str): stop id
+
+        Returns:
+            list[Info]: messages
+        """
+        return [self.current[x] for x in sorted(self._stop_infos.get(stop, ()))]
+
+    def _index(self, info: Info) -> None:
+        for line in info.lines:
+            self._line_infos.setdefault(line, set()).add(info.id)
+        for stop in info.stops:
+            self._stop_infos.setdefault(stop, set()).add(info.id)
+
+    def _unindex(self, info: Info) -> None:
+        for index, keys in (
+            (self._line_infos, info.lines),
+            (self._stop_infos, info.stops),
+        ):
+            for key in keys:
+                ids = index.get(key)
+
+                if ids is not None:
+                    ids.discard(info.id)
+
+                    if not ids:
+                        del index[key]
@@ -0,0 +1,315 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from pyefa.data_classes import Line, Stop, StopType, TransportType
+from pyefa.merge import StopInterner
+from pyefa.scheduler import Priority, priority
+
+if TYPE_CHECKING:
+    from pyefa.client import EfaClient
+
+_LOGGER = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+
+
+class LineIndex:
+    """In-memory index of lines, their stops and products.
+
+    The index is filled from serving lines and line stop responses and answers
+    questions like "which lines serve this stop" or "all stops of line 4"
+    locally. It can be persisted with `save()`/`load()` and refreshed
+    incrementally with `refresh()`.
+    """
+
+    def __init__(self) -> None:
+        self._interner: StopInterner = StopInterner()
+        self.lines: dict[str, Line] = {}
+        self.stops: dict[str, Stop] = {}
+        self._line_stops: dict[str, list[str]] = {}
+        self._stop_lines: dict[str, set[str]] = {}
+        self._stop_updated: dict[str, float] = {}
+        self._line_updated: dict[str, float] = {}
+
+    def add_lines(self, lines: list[Line]) -> None:
+        """Add lines (e.g. from line list response) to the index.
+
+        Args:
+            lines (list[Line]): lines
+        """
+        for line in lines:
+            if line.origin:
+                line.origin = self._interner.intern(line.origin)
+            if line.destination:
+                line.destination = self._interner.intern(line.destination)
+
+            self.lines[line.id] = line
+
+    def add_serving_lines(
+        self, stop: str, lines: list[Line], updated: float | None = None
+    ) -> None:
+        """Set lines serving `stop`. Previously known lines of the stop are
+        replaced, except lines whose stops (see `add_line_stops()`) include
+        `stop`, so `lines_at()` and `stops_of()` stay consistent.
+
+        Args:
+            stop (str): stop id
+            lines (list[Line]): lines serving the stop
+            updated (float | None, optional): timestamp of data. Defaults to now.
+        """
+        self.add_lines(lines)
+
+        confirmed = {
+            x
+            for x in self._stop_lines.get(stop, ())
+            if stop in self._line_stops.get(x, ())
+        }
+
+        self._stop_lines[stop] = {x.id for x in lines} | confirmed
+        self._stop_updated[stop] = time.time() if updated is None else updated
+
+    def add_line_stops(
+        self, line: str, stops: list[Stop], updated: float | None = None
+    ) -> None:
+        """Set stops of `line` in order of travel.
+
+        Args:
+            line (str): line id
+            stops (list[Stop]): stops of the line
+            updated (float | None, optional): timestamp of data. Defaults to now.
+        """
+        for stop_id in self._line_stops.get(line, []):
+            self._stop_lines.get(stop_id, set()).discard(line)
+
+        for stop in stops:
+            self.stops.setdefault(stop.id, stop)
+            self._stop_lines.setdefault(stop.id, set()).add(line)
+
+        self._line_stops[line] = [x.id for x in stops]
+        self._line_updated[line] = time.time() if updated is None else updated
+
+    def lines_at(self, stop: Stop | str) -> list[Line]:
+        """Return lines serving `stop`.
+
+        Args:
+            stop (Stop | str): stop or stop id
+
+        Returns:
+            list[Line]: lines sorted by number
+        """
+        if isinstance(stop, Stop):
+            stop = stop.id
+
+        lines = [
+            self.lines[x] for x in self._stop_lines.get(stop, ()) if x in self.lines
+        ]
+
+        return sorted(lines, key=lambda x: (x.number, x.id))
+
+    def stops_of(self, line: Line | str) -> list[Stop]:
+        """Return stops of `line` in order of travel.
+
+        Args:
+            line (Line | str): line, line id or line number (e.g. "4"). For a line
+            number stops of all its line ids (directions, variants) are combined.
+
+        Returns:
+            list[Stop]: stops of the line
+        """
+        if isinstance(line, Line):
+            line = line.id
+
+        if line in self._line_stops:
+            line_ids = [line]
+        else:
+            line_ids = [x.id for x in self.lines.values() if x.number == line]
+
+        stop_ids = {}
+
+        for line_id in line_ids:
+            stop_ids.update(dict.fromkeys(self._line_stops.get(line_id, [])))
+
+        return [self.stops[x] for x in stop_ids if x in self.stops]
+
+    def lines_by_product(self, product: TransportType) -> list[Line]:
+        """Return all lines of transport `product`.
+
+        Args:
+            product (TransportType): transport type
+
+        Returns:
+            list[Line]: lines
+        """
+        return [x for x in self.lines.values() if x.product == product]
+
+    def stale_stops(self, max_age: float, now: float | None = None) -> list[str]:
+        """Return ids of stops whose serving lines are older than `max_age` seconds."""
+        now = time.time() if now is None else now
+
+        return [k for k, v in self._stop_updated.items() if now - v > max_age]
+
+    def stale_lines(self, max_age: float, now: float | None = None) -> list[str]:
+        """Return ids of lines without stops or stops older than `max_age` seconds."""
+        now = time.time() if now is None else now
+
+        return [
+            x
+            for x in self.lines
+            if now - self._line_updated.get(x, float("-inf")) > max_age
+        ]
+
+    async def refresh(
+        self,
+        client: EfaClient,
+        stops: list[str] | None = None,
+        max_age: float = 24 * 3600,
+        concurrency: int = 8,
+    ) -> int:
+        """Refresh index incrementally, only unknown or outdated entries are requested.
+
+        Requests are sent with `Priority.BULK`, so they do not delay interactive
+        requests of the same client.
+
+        Args:
+            client (EfaClient): client used for requests
+            stops (list[str] | None, optional): stop ids which have to be indexed.
+            Defaults to None (known stops only).
+            max_age (float, optional): seconds entries are up to date. Defaults to 1 day.
+            concurrency (int, optional): max. parallel requests. Defaults to 8.
+
+        Returns:
+            int: number of requests sent
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run(coro):
+            async with semaphore:
+                with priority(Priority.BULK):
+                    return await coro
+
+        stop_ids = self.stale_stops(max_age)
+        stop_ids += [
+            x for x in dict.fromkeys(stops or []) if x not in self._stop_updated
+        ]
+
+        lines = await asyncio.gather(*[run(client.serving_lines(x)) for x in stop_ids])
+
+        for stop_id, stop_lines in zip(stop_ids, lines):
+            self.add_serving_lines(stop_id, stop_lines)
+
+        line_ids = self.stale_lines(max_age)
+        line_stops = await asyncio.gather(
+            *[run(client.line_stops(x)) for x in line_ids]
+        )
+
+        for line_id, stops_of_line in zip(line_ids, line_stops):
+            self.add_line_stops(line_id, stops_of_line)
+
+        _LOGGER.info(
+            f"Line index refreshed: {len(stop_ids)} stop(s), {len(line_ids)} line(s)"
+        )
+
+        return len(stop_ids) + len(line_ids)
+
+    def save(self, path: str | Path) -> None:
+        """Persist index as JSON file.
+
+        Args:
+            path (str | Path): file path
+        """
+
+        def stop_to_dict(stop: Stop | None):
+            if stop is None:
+                return None
+
+            return {
+                "id": stop.id,
+                "name": stop.name,
+                "type": stop.type.value,
+                "disassembled_name": stop.disassembled_name,
+                "coord": stop.coord,
+                "transports": [x.value for x in stop.transports],
+            }
+
+        data = {
+            "version": INDEX_VERSION,
+            "lines": [
+                {
+                    "id": x.id,
+                    "name": x.name,
+                    "number": x.number,
+                    "description": x.description,
+                    "product": x.product.value,
+                    "origin": stop_to_dict(x.origin),
+                    "destination": stop_to_dict(x.destination),
+                }
+                for x in self.lines.values()
+            ],
+            "stops": [stop_to_dict(x) for x in self.stops.values()],
+            "line_stops": self._line_stops,
+            "stop_lines": {k: sorted(v) for k, v in self._stop_lines.items()},
+            "stop_updated": self._stop_updated,
+            "line_updated": self._line_updated,
+        }
+
+        Path(path).write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+
+    @classmethod
+    def load(cls, path: str | Path) -> LineIndex:
+        """Load index persisted with `save()`.
+
+        Args:
+            path (str | Path): file path
+
+        Raises:
+            ValueError: File was written by an incompatible version
+
+        Returns:
+            LineIndex: loaded index
+        """
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+
+        if data.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unsupported line index version {data.get('version')}")
+
+        index = cls()
+
+        def stop_from_dict(stop: dict | None) -> Stop | None:
+            if stop is None:
+                return None
+
+            return index._interner.intern(
+                Stop(
+                    stop["id"],
+                    stop["name"],
+                    StopType(stop["type"]),
+                    stop["disassembled_name"],
+                    stop["coord"],
+                    [TransportType(x) for x in stop["transports"]],
+                )
+            )
+
+        for line in data["lines"]:
+            index.lines[line["id"]] = Line(
+                line["id"],
+                line["name"],
+                line["number"],
+                line["description"],
+                TransportType(line["product"]),
+                stop_from_dict(line["origin"]),
+                stop_from_dict(line["destination"]),
+            )
+
+        index.stops = {x["id"]: stop_from_dict(x) for x in data["stops"]}
+        index._line_stops = data["line_stops"]
+        index._stop_lines = {k: set(v) for k, v in data["stop_lines"].items()}
+        index._stop_updated = data["stop_updated"]
+        index._line_updated = data["line_updated"]
+
+        return index
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import heapq
+import logging
+from collections.abc import Callable, Hashable
+from datetime import datetime
+from operator import attrgetter
+
+from pyefa.data_classes import Departure, Stop, StopType
+
+_LOGGER = logging.getLogger(__name__)
+
+TripKey = tuple[str, str, str, datetime]
+
+
+def trip_key(departure: Departure) -> TripKey:
+    """Return stable key identifying the trip a departure belongs to.
+
+    Args:
+        departure (Departure): departure
+
+    Returns:
+        TripKey: (line name, origin id, destination id, planned time)
+    """
+    return (
+        departure.line_name,
+        departure.origin.id,
+        departure.destination.id,
+        departure.planned_time,
+    )
+
+
+class StopInterner:
+    """Pool of `Stop` objects, equal stops are represented by one shared instance.
+
+    Interned stops are shared between departures, they should not be modified.
+    """
+
+    def __init__(self) -> None:
+        self._stops: dict[tuple[str, str, StopType], Stop] = {}
+
+    def __len__(self) -> int:
+        return len(self._stops)
+
+    def get(self, id: str, name: str, type: StopType) -> Stop:
+        """Return shared stop for `id`, `name` and `type`, create it if not known yet.
+
+        Args:
+            id (str): stop id
+            name (str): stop name
+            type (StopType): stop type
+
+        Returns:
+            Stop: shared stop instance
+        """
+        key = (id, name, type)
+        stop = self._stops.get(key)
+
+        if stop is None:
+            stop = self._stops[key] = Stop(id, name, type)
+
+        return stop
+
+    def intern(self, stop: Stop) -> Stop:
+        """Return shared instance equal to `stop`.
+
+        Args:
+            stop (Stop): stop to intern
+
+        Returns:
+            Stop: shared stop instance
+        """
+        return self._stops.setdefault((stop.id, stop.name, stop.type), stop)
+
+
+class DepartureMerger:
+    """Merge departures of overlapping boards (e.g. neighbouring platforms and
+    parent stops) into one time sorted board without duplicates.
+
+    Only departures of not yet known trips are kept, so memory grows with the
+    number of unique trips rather than with the number of added departures.
+
+    Args:
+        interner (StopInterner | None, optional): pool of shared stops. Defaults
+        to a new pool.
+        key (Callable[[Departure], Hashable], optional): key identifying the trip
+        of a departure. Defaults to `trip_key`.
+    """
+
+    def __init__(
+        self,
+        interner: StopInterner | None = None,
+        key: Callable[[Departure], Hashable] = trip_key,
+    ) -> None:
+        self.interner: StopInterner = StopInterner() if interner is None else interner
+        self._key: Callable[[Departure], Hashable] = key
+        self._seen: set[Hashable] = set()
+        self._boards: list[list[Departure]] = []
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+    def add(self, departures: list[Departure]) -> int:
+        """Add departures of one board.
+
+        Args:
+            departures (list[Departure]): departures to add
+
+        Returns:
+            int: number of departures of trips not known before
+        """
+        board = []
+
+        for departure in departures:
+            key = self._key(departure)
+
+            if key in self._seen:
+                continue
+
+            self._seen.add(key)
+
+            departure.origin = self.interner.intern(departure.origin)
+            departure.destination = self.interner.intern(departure.destination)
+
+            board.append(departure)
+
+        if board:
+            # boards arrive sorted in most cases, sort() is linear then
+            board.sort(key=attrgetter("planned_time"))
+            self._boards.append(board)
+
+        _LOGGER.debug(f"{len(board)} of {len(departures)} departure(s) added")
+
+        return len(board)
+
+    def board(self) -> list[Departure]:
+        """Return merged board of all added departures sorted by planned time.
+
+        Returns:
+            list[Departure]: merged departures
+        """
+        if len(self._boards) > 1:
+            # compact already merged boards, following calls merge less lists
+            self._boards = [
+                list(heapq.merge(*self._boards, key=attrgetter("planned_time")))
+            ]
+
+        return list(self._boards[0]) if self._boards else []
+
+
+def merge_departures(*boards: list[Departure]) -> list[Departure]:
+    """Merge several departure boards into one time sorted board without duplicates.
+
+    Args:
+        boards (list[Departure]): departure boards to merge
+
+    Returns:
+        list[Departure]: merged departures
+    """
+    merger = DepartureMerger()
+
+    for board in boards:
+        merger.add(board)
+
+    return merger.board()
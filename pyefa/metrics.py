@@ -0,0 +1,169 @@
+import asyncio
+import math
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Self
+
+
+@dataclass
+class TransferStats:
+    """Transfer statistics collected by `EfaClient` for all responses.
+
+    `wire_bytes` counts bytes received from the network (compressed), `decoded_bytes`
+    the size of response bodies after decompression.
+    """
+
+    requests: int = 0
+    not_modified: int = 0
+    wire_bytes: int = 0
+    decoded_bytes: int = 0
+    compression_saved_bytes: int = 0
+    conditional_saved_bytes: int = 0
+
+    @property
+    def compression_ratio(self) -> float:
+        """Ratio between decoded and transferred body size (1.0 - no compression)."""
+        if not self.wire_bytes:
+            return 1.0
+
+        return self.decoded_bytes / self.wire_bytes
+
+    @property
+    def bytes_saved(self) -> int:
+        """Bytes not transferred thanks to compression and conditional requests."""
+        return self.compression_saved_bytes + self.conditional_saved_bytes
+
+    def add_response(self, wire_size: int, decoded_size: int) -> None:
+        self.requests += 1
+        self.wire_bytes += wire_size
+        self.decoded_bytes += decoded_size
+        self.compression_saved_bytes += max(decoded_size - wire_size, 0)
+
+    def add_not_modified(self, wire_size: int, saved_size: int) -> None:
+        self.requests += 1
+        self.not_modified += 1
+        self.wire_bytes += wire_size
+        self.conditional_saved_bytes += max(saved_size - wire_size, 0)
+
+
+@dataclass
+class QueueStats:
+    """Queue statistics of one request priority class of `RequestScheduler`.
+
+    `queued` and `active` are current values, all other fields are totals.
+    """
+
+    queued: int = 0
+    active: int = 0
+    completed: int = 0
+    wait_time: float = 0
+    max_wait_time: float = 0
+
+    @property
+    def mean_wait_time(self) -> float:
+        """Mean time in seconds requests waited for a free slot."""
+        started = self.active + self.completed
+
+        return self.wait_time / started if started else 0
+
+    def add_wait(self, wait_time: float) -> None:
+        self.active += 1
+        self.wait_time += wait_time
+        self.max_wait_time = max(self.max_wait_time, wait_time)
+
+
+class LoopLagMonitor:
+    """Measure event loop lag, the delay between a scheduled and the actual wakeup
+    of a coroutine. Long blocking calls on the loop (e.g. parsing large responses)
+    show up as large lag values.
+
+    Example:
+        async with LoopLagMonitor() as monitor:
+            await client.departures("de:09564:704", limit=2000)
+
+        print(monitor.max, monitor.percentile(99))
+
+    Args:
+        interval (float, optional): probe interval in seconds. Defaults to 0.005.
+        max_samples (int, optional): number of latest samples kept for percentiles.
+        Defaults to 10000.
+    """
+
+    def __init__(self, interval: float = 0.005, max_samples: int = 10000) -> None:
+        self._interval: float = interval
+        self._samples: deque[float] = deque(maxlen=max_samples)
+        self._task: asyncio.Task | None = None
+        self._probe_start: float | None = None
+        self.count: int = 0
+        self.total: float = 0
+        self.max: float = 0
+
+    async def __aenter__(self) -> Self:
+        self.start()
+
+        # let the probe start, so blocking right after entering is measured
+        await asyncio.sleep(0)
+
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.stop()
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0
+
+    def percentile(self, q: float) -> float:
+        """Return `q`-th percentile of latest lag samples in seconds.
+
+        Args:
+            q (float): percentile between 0 and 100
+
+        Returns:
+            float: lag in seconds
+        """
+        if not self._samples:
+            return 0
+
+        samples = sorted(self._samples)
+        index = min(len(samples) - 1, math.ceil(q / 100 * len(samples)) - 1)
+
+        return samples[max(index, 0)]
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            # a probe overdue while the loop was blocked has not woken up yet
+            if self._probe_start is not None:
+                lag = time.perf_counter() - self._probe_start - self._interval
+
+                if lag > 0:
+                    self._add(lag)
+
+            self._task.cancel()
+
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+            self._task = None
+
+    def _add(self, lag: float) -> None:
+        self._samples.append(lag)
+        self.count += 1
+        self.total += lag
+        self.max = max(self.max, lag)
+
+    async def _run(self) -> None:
+        while True:
+            self._probe_start = time.perf_counter()
+
+            await asyncio.sleep(self._interval)
+
+            self._add(max(time.perf_counter() - self._probe_start - self._interval, 0))
+            self._probe_start = None
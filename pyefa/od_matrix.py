@@ -0,0 +1,264 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
+
+from pyefa.data_classes import Journey
+from pyefa.helpers import TZ_INFO
+from pyefa.paging import format_datetime
+from pyefa.scheduler import Priority, priority
+from pyefa.transport import request_errors
+
+if TYPE_CHECKING:
+    from pyefa.client import EfaClient
+
+_LOGGER = logging.getLogger(__name__)
+
+# marks pairs without connection (or failed queries) in the matrix arrays
+UNREACHABLE = -1
+
+
+def time_bucket(date: datetime, size: timedelta) -> datetime:
+    """Return start of the time bucket of `size` containing `date`.
+
+    Args:
+        date (datetime): date and time
+        size (timedelta): bucket size
+
+    Returns:
+        datetime: start of bucket
+    """
+    midnight = date.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    return midnight + (date - midnight) // size * size
+
+
+class ODMatrix:
+    """Travel times and transfer counts between origins and destinations.
+
+    Values are stored row-major in flat arrays, `UNREACHABLE` marks pairs
+    without a connection.
+
+    Args:
+        origins (list[str]): origin stop ids (rows)
+        destinations (list[str]): destination stop ids (columns)
+    """
+
+    def __init__(self, origins: list[str], destinations: list[str]) -> None:
+        self.origins: list[str] = list(origins)
+        self.destinations: list[str] = list(destinations)
+        self._origin_index: dict[str, int] = {x: i for i, x in enumerate(origins)}
+        self._destination_index: dict[str, int] = {
+            x: i for i, x in enumerate(destinations)
+        }
+
+        size = len(origins) * len(destinations)
+
+        # seconds and transfers
+        self.durations: array = array("i", [UNREACHABLE]) * size
+        self.transfers: array = array("b", [UNREACHABLE]) * size
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return len(self.origins), len(self.destinations)
+
+    def _index(self, origin: str, destination: str) -> int:
+        return (
+            self._origin_index[origin] * len(self.destinations)
+            + self._destination_index[destination]
+        )
+
+    def set(self, origin: str, destination: str, duration: int, transfers: int) -> None:
+        index = self._index(origin, destination)
+
+        self.durations[index] = duration
+        # transfers above the value range are capped
+        self.transfers[index] = min(transfers, 127)
+
+    def duration(self, origin: str, destination: str) -> timedelta | None:
+        """Return travel time or None if `destination` is unreachable."""
+        value = self.durations[self._index(origin, destination)]
+
+        return None if value == UNREACHABLE else timedelta(seconds=value)
+
+    def transfer_count(self, origin: str, destination: str) -> int | None:
+        """Return number of transfers or None if `destination` is unreachable."""
+        value = self.transfers[self._index(origin, destination)]
+
+        return None if value == UNREACHABLE else value
+
+    def rows(self) -> list[list[int]]:
+        """Return durations in seconds as list of rows."""
+        width = len(self.destinations)
+
+        return [
+            self.durations[i * width : (i + 1) * width].tolist()
+            for i in range(len(self.origins))
+        ]
+
+
+@dataclass
+class ODStats:
+    pairs: int = 0
+    deduplicated: int = 0
+    cache_hits: int = 0
+    queries: int = 0
+    errors: int = 0
+
+
+class ODMatrixPlanner:
+    """Compute origin-destination matrices with trip requests.
+
+    Pairs are deduplicated (repeated ids, origin equals destination and with
+    `symmetric` reverse pairs), the remaining trip requests run with bounded
+    concurrency and bulk priority. Results are cached by origin, destination and
+    time bucket, requests of one bucket are sent for the bucket start.
+
+    Example:
+        planner = ODMatrixPlanner(client, concurrency=8)
+        matrix = await planner.matrix(["de:09564:704"], ["de:09564:510"])
+        matrix.duration("de:09564:704", "de:09564:510")
+
+    Args:
+        client (EfaClient): client used for trip requests
+        concurrency (int, optional): max. parallel requests. Defaults to 8.
+        bucket (timedelta, optional): size of time buckets. Defaults to 15 minutes.
+        symmetric (bool, optional): reuse travel time of A -> B for B -> A.
+        Defaults to False.
+        max_entries (int, optional): max. number of cached pairs. Defaults to 100000.
+    """
+
+    def __init__(
+        self,
+        client: EfaClient,
+        concurrency: int = 8,
+        bucket: timedelta = timedelta(minutes=15),
+        symmetric: bool = False,
+        max_entries: int = 100000,
+    ) -> None:
+        self._client: EfaClient = client
+        self._concurrency: int = concurrency
+        self._bucket: timedelta = bucket
+        self._symmetric: bool = symmetric
+        self._max_entries: int = max_entries
+        self._cache: OrderedDict[tuple[str, str, datetime], tuple[int, int]] = (
+            OrderedDict()
+        )
+        self.stats: ODStats = ODStats()
+
+    async def matrix(
+        self,
+        origins: list[str],
+        destinations: list[str],
+        date: datetime | None = None,
+    ) -> ODMatrix:
+        """Compute travel times from all `origins` to all `destinations`.
+
+        Travel time is the duration of the journey arriving first.
+
+        Args:
+            origins (list[str]): origin stop ids
+            destinations (list[str]): destination stop ids
+            date (datetime | None, optional): departure time. Defaults to now.
+
+        Returns:
+            ODMatrix: matrix of travel times and transfers
+        """
+        origins = list(dict.fromkeys(origins))
+        destinations = list(dict.fromkeys(destinations))
+        # buckets start at local midnight of the endpoint
+        date = (date or datetime.now(TZ_INFO)).astimezone(TZ_INFO)
+        bucket = time_bucket(date, self._bucket)
+
+        matrix = ODMatrix(origins, destinations)
+        missing: dict[tuple[str, str], list[tuple[str, str]]] = {}
+
+        self.stats.pairs += len(origins) * len(destinations)
+
+        for origin in origins:
+            for destination in destinations:
+                if origin == destination:
+                    matrix.set(origin, destination, 0, 0)
+                    continue
+
+                key = self._key(origin, destination)
+                cached = self._cache.get((*key, bucket))
+
+                if cached is not None:
+                    self._cache.move_to_end((*key, bucket))
+                    self.stats.cache_hits += 1
+                    matrix.set(origin, destination, *cached)
+                else:
+                    missing.setdefault(key, []).append((origin, destination))
+
+        self.stats.deduplicated += sum(len(x) - 1 for x in missing.values())
+
+        results = await self._query(list(missing), bucket)
+
+        for key, pairs in missing.items():
+            result = results.get(key)
+
+            if result is None:
+                continue
+
+            for origin, destination in pairs:
+                matrix.set(origin, destination, *result)
+
+        return matrix
+
+    def _key(self, origin: str, destination: str) -> tuple[str, str]:
+        if self._symmetric and destination < origin:
+            return destination, origin
+
+        return origin, destination
+
+    async def _query(
+        self, pairs: list[tuple[str, str]], bucket: datetime
+    ) -> dict[tuple[str, str], tuple[int, int]]:
+        semaphore = asyncio.Semaphore(self._concurrency)
+        results: dict[tuple[str, str], tuple[int, int]] = {}
+        date = format_datetime(bucket)
+
+        async def query(origin: str, destination: str) -> None:
+            async with semaphore:
+                self.stats.queries += 1
+
+                try:
+                    with priority(Priority.BULK):
+                        journeys = await self._client.trip(origin, destination, date)
+                except request_errors() as exc:
+                    # failed pairs are not cached and queried again next time
+                    _LOGGER.warning(
+                        f"Trip request {origin} -> {destination} failed: {exc!r}"
+                    )
+                    self.stats.errors += 1
+                    return
+
+            result = _summarize(journeys)
+            results[(origin, destination)] = result
+            self._put((origin, destination, bucket), result)
+
+        await asyncio.gather(*[query(*x) for x in pairs])
+
+        return results
+
+    def _put(self, key: tuple[str, str, datetime], value: tuple[int, int]) -> None:
+        self._cache[key] = value
+        self._cache.move_to_end(key)
+
+        while len(self._cache) > self._max_entries:
+            self._cache.popitem(last=False)
+
+
+def _summarize(journeys: list[Journey]) -> tuple[int, int]:
+    if not journeys:
+        return UNREACHABLE, UNREACHABLE
+
+    best = min(journeys, key=lambda x: x.arrival)
+
+    return int(best.duration.total_seconds()), best.interchanges
@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Awaitable, Callable
+from datetime import datetime, timedelta
+
+from pyefa.data_classes import Departure
+from pyefa.helpers import TZ_INFO
+from pyefa.merge import TripKey, trip_key
+
+_LOGGER = logging.getLogger(__name__)
+
+FetchDepartures = Callable[[str, int, str], Awaitable[list[Departure]]]
+
+
+class WindowCache:
+    """Cache of completely fetched departure windows.
+
+    Args:
+        max_windows (int, optional): max. number of cached windows. Defaults to 64.
+        ttl (float, optional): seconds a window is served from cache, departures carry
+        realtime data and get outdated. Defaults to 60.
+    """
+
+    def __init__(self, max_windows: int = 64, ttl: float = 60) -> None:
+        self._max_windows: int = max_windows
+        self._ttl: float = ttl
+        self._windows: OrderedDict[
+            tuple[str, datetime, timedelta], tuple[float, list[Departure]]
+        ] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._windows)
+
+    def get(
+        self, stop: str, start: datetime, length: timedelta
+    ) -> list[Departure] | None:
+        key = (stop, start, length)
+        entry = self._windows.get(key)
+
+        if entry is None:
+            return None
+
+        if time.monotonic() - entry[0] > self._ttl:
+            del self._windows[key]
+            return None
+
+        self._windows.move_to_end(key)
+
+        return entry[1]
+
+    def put(
+        self,
+        stop: str,
+        start: datetime,
+        length: timedelta,
+        departures: list[Departure],
+    ) -> None:
+        key = (stop, start, length)
+
+        self._windows[key] = (time.monotonic(), departures)
+        self._windows.move_to_end(key)
+
+        while len(self._windows) > self._max_windows:
+            self._windows.popitem(last=False)
+
+    def clear(self) -> None:
+        self._windows.clear()
+
+
+def format_datetime(dt: datetime) -> str:
+    """Format `dt` as accepted by `Request.add_param_datetime`.
+
+    Args:
+        dt (datetime): date and time
+
+    Returns:
+        str: date and time in format "YYYYmmdd HH:MM"
+    """
+    return dt.astimezone(TZ_INFO).strftime("%Y%m%d %H:%M")
+
+
+class DepartureWindows:
+    """Async iterator over departures of a stop fetched lazily in time windows.
+
+    The next window is requested only when the consumer iterated over all
+    departures of the current one. If a window holds more departures than
+    `limit`, it is paged by requesting again from the last received departure.
+
+    Args:
+        fetch (FetchDepartures): coroutine function fetching departures for
+        (stop, limit, date)
+        stop (str): stop id
+        start (datetime): start of first window
+        window (timedelta): length of one window
+        horizon (timedelta): iteration stops after `start` + `horizon`
+        limit (int): max. departures fetched per request
+        cache (WindowCache | None): cache of completed windows
+    """
+
+    def __init__(
+        self,
+        fetch: FetchDepartures,
+        stop: str,
+        start: datetime,
+        window: timedelta,
+        horizon: timedelta,
+        limit: int,
+        cache: WindowCache | None = None,
+    ) -> None:
+        if window <= timedelta(0):
+            raise ValueError("Window length must be positive")
+        if limit < 1:
+            raise ValueError("Limit must be positive")
+
+        if start.tzinfo is None:
+            start = start.replace(tzinfo=TZ_INFO)
+
+        self._fetch: FetchDepartures = fetch
+        self._stop: str = stop
+        self._start: datetime = start.replace(second=0, microsecond=0)
+        self._window: timedelta = window
+        self._end: datetime = start + horizon
+        self._limit: int = limit
+        self._cache: WindowCache | None = cache
+        self.requests: int = 0
+
+    def __aiter__(self) -> AsyncIterator[Departure]:
+        return self._iterate()
+
+    async def _iterate(self) -> AsyncIterator[Departure]:
+        window_start = self._start
+
+        while window_start < self._end:
+            window_end = min(window_start + self._window, self._end)
+
+            for departure in await self._get_window(window_start, window_end):
+                yield departure
+
+            window_start = window_end
+
+    async def _get_window(self, start: datetime, end: datetime) -> list[Departure]:
+        length = end - start
+
+        if self._cache is not None:
+            departures = self._cache.get(self._stop, start, length)
+
+            if departures is not None:
+                _LOGGER.debug(f"Window {start} served from cache")
+                return departures
+
+        departures = await self._fetch_window(start, end)
+
+        if self._cache is not None:
+            self._cache.put(self._stop, start, length, departures)
+
+        return departures
+
+    async def _fetch_window(self, start: datetime, end: datetime) -> list[Departure]:
+        # departures at window boundaries and of overlapping pages are returned
+        # by several requests, keep each trip only once
+        seen: set[TripKey] = set()
+        departures = []
+        cursor = start
+        limit = self._limit
+
+        while True:
+            self.requests += 1
+
+            page = await self._fetch(self._stop, limit, format_datetime(cursor))
+
+            for departure in page:
+                key = trip_key(departure)
+
+                if key in seen or not start <= departure.planned_time < end:
+                    continue
+
+                seen.add(key)
+                departures.append(departure)
+
+            if len(page) < limit or page[-1].planned_time >= end:
+                break
+
+            next_cursor = page[-1].planned_time.replace(second=0, microsecond=0)
+
+            if next_cursor <= cursor:
+                # more than `limit` departures within one minute, a request
+                # can't start in between - request the same minute with more
+                limit *= 2
+                continue
+
+            limit = self._limit
+            cursor = next_cursor
+
+        departures.sort(key=lambda x: x.planned_time)
+
+        _LOGGER.debug(f"{len(departures)} departure(s) in window {start} - {end}")
+
+        return departures
@@ -0,0 +1,293 @@
+from __future__ import annotations
+
+import asyncio
+import datetime
+import json
+import logging
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Self
+
+from pyefa.client import EfaClient
+from pyefa.data_classes import Stop, StopFilter, SystemInfo, TransportType
+from pyefa.exceptions import EfaParameterError
+from pyefa.transport import request_errors
+
+_LOGGER = logging.getLogger(__name__)
+
+Probe = Callable[[EfaClient, list[Stop]], Awaitable]
+
+# name searched by the stop finder to get stops for the capability probes
+SAMPLE_STOP_NAME = "Bahnhof"
+
+
+def _coord_name(stop: Stop) -> str:
+    # rapidJSON coordinates are [y, x] in the default MRCV format
+    y, x = stop.coord[:2]
+
+    return f"{x:.0f}:{y:.0f}:MRCV"
+
+
+# probes of optional features, each is called with stops found by the stop finder
+DEFAULT_PROBES: dict[str, Probe] = {
+    "exclMOT": lambda client, stops: client.departures(
+        stops[0], limit=1, transports=[TransportType.BUS]
+    ),
+    "serving_lines": lambda client, stops: client.serving_lines(stops[0]),
+    "add_info": lambda client, stops: client.sync_infos(),
+    "trip": lambda client, stops: client.trip(stops[0], stops[-1], count=1),
+    "coord": lambda client, stops: client.stops(_coord_name(stops[0]), type="coord"),
+}
+
+
+@dataclass
+class Endpoint:
+    name: str
+    client: EfaClient
+    prefixes: list[str] = field(default_factory=list)
+    info: SystemInfo | None = None
+    capabilities: set[str] = field(default_factory=set)
+    unsupported: set[str] = field(default_factory=set)
+    error: str | None = None
+
+    def is_valid(self, today: datetime.date | None = None) -> bool:
+        """Check whether probed system info and capabilities are still valid.
+
+        Args:
+            today (datetime.date | None, optional): reference date. Defaults to today.
+
+        Returns:
+            bool: True if endpoint was probed and data is valid
+        """
+        today = today or datetime.date.today()
+
+        return self.info is not None and today <= self.info.valid_to
+
+
+class EndpointRegistry:
+    """Registry of several EFA endpoints (e.g. regional installations).
+
+    System info and capabilities of all endpoints are probed concurrently and
+    cached until the `valid_to` date of the endpoint's timetable. Requests are
+    routed to the endpoint responsible for a stop by its id prefix.
+
+    Probing searches stops with the stop finder first, every optional feature
+    of `probes` is then probed with the found stops and recorded in
+    `capabilities` (supported) or `unsupported` of the endpoint.
+
+    Example:
+        registry = EndpointRegistry()
+        registry.register("vgn", "https://efa.vgn.de/vgnExt_oeffi/", ["de:09564:"])
+
+        async with registry:
+            await registry.probe()
+            departures = await registry.client_for("de:09564:704").departures(
+                "de:09564:704"
+            )
+
+    Args:
+        probes (dict[str, Probe] | None, optional): capability name to coroutine
+        function probing it. Defaults to `DEFAULT_PROBES`.
+        timeout (float, optional): max. seconds of one probe request. Defaults to 10.
+    """
+
+    def __init__(
+        self, probes: dict[str, Probe] | None = None, timeout: float = 10
+    ) -> None:
+        self._probes: dict[str, Probe] = DEFAULT_PROBES if probes is None else probes
+        self._timeout: float = timeout
+        self.endpoints: dict[str, Endpoint] = {}
+
+    async def __aenter__(self) -> Self:
+        await asyncio.gather(*[x.client.__aenter__() for x in self.endpoints.values()])
+        return self
+
+    async def __aexit__(self, *args, **kwargs) -> None:
+        await asyncio.gather(
+            *[x.client.__aexit__(*args, **kwargs) for x in self.endpoints.values()]
+        )
+
+    def register(
+        self, name: str, client: EfaClient | str, prefixes: list[str] | None = None
+    ) -> Endpoint:
+        """Register an endpoint.
+
+        Args:
+            name (str): unique endpoint name
+            client (EfaClient | str): client or url of the endpoint
+            prefixes (list[str] | None, optional): stop id prefixes the endpoint
+            is responsible for, e.g. "de:09564:". Defaults to None.
+
+        Raises:
+            ValueError: Endpoint with this name already registered
+
+        Returns:
+            Endpoint: registered endpoint
+        """
+        if name in self.endpoints:
+            raise ValueError(f"Endpoint {name} already registered")
+
+        if isinstance(client, str):
+            client = EfaClient(client)
+
+        endpoint = Endpoint(name, client, list(prefixes or []))
+        self.endpoints[name] = endpoint
+
+        return endpoint
+
+    def endpoint_for(self, stop_id: str) -> Endpoint:
+        """Return endpoint responsible for `stop_id` (longest matching prefix).
+
+        Args:
+            stop_id (str): stop id, e.g. "de:09564:704"
+
+        Raises:
+            EfaParameterError: No endpoint registered for the stop
+
+        Returns:
+            Endpoint: responsible endpoint
+        """
+        best = None
+        best_length = -1
+
+        for endpoint in self.endpoints.values():
+            for prefix in endpoint.prefixes:
+                if stop_id.startswith(prefix) and len(prefix) > best_length:
+                    best, best_length = endpoint, len(prefix)
+
+        if best is None:
+            raise EfaParameterError(f"No endpoint registered for stop {stop_id}")
+
+        return best
+
+    def client_for(self, stop_id: str) -> EfaClient:
+        return self.endpoint_for(stop_id).client
+
+    def with_capability(self, capability: str) -> list[Endpoint]:
+        return [x for x in self.endpoints.values() if capability in x.capabilities]
+
+    async def probe(self, force: bool = False) -> list[Endpoint]:
+        """Probe system info and capabilities of all endpoints concurrently.
+
+        Endpoints with still valid probe results are skipped unless `force` is set.
+
+        Args:
+            force (bool, optional): probe all endpoints. Defaults to False.
+
+        Returns:
+            list[Endpoint]: probed endpoints
+        """
+        endpoints = [x for x in self.endpoints.values() if force or not x.is_valid()]
+
+        await asyncio.gather(*[self._probe_endpoint(x) for x in endpoints])
+
+        _LOGGER.info(f"{len(endpoints)} endpoint(s) probed")
+
+        return endpoints
+
+    async def _probe_endpoint(self, endpoint: Endpoint) -> None:
+        # an unsupported feature fails with any of them (e.g. HTTP 404, an error
+        # page or an invalid response)
+        errors = request_errors()
+
+        async def probe_stops() -> list[Stop]:
+            try:
+                return await asyncio.wait_for(
+                    endpoint.client.stops(
+                        SAMPLE_STOP_NAME, filters=[StopFilter.STOPS], top_k=2
+                    ),
+                    self._timeout,
+                )
+            except errors as exc:
+                _LOGGER.debug(f"Endpoint {endpoint.name} lacks stop_finder: {exc!r}")
+                return []
+
+        async def probe_capability(name: str, probe: Probe, stops: list[Stop]) -> bool:
+            try:
+                await asyncio.wait_for(probe(endpoint.client, stops), self._timeout)
+            except errors as exc:
+                _LOGGER.debug(f"Endpoint {endpoint.name} lacks {name}: {exc!r}")
+                return False
+
+            return True
+
+        try:
+            info, stops = await asyncio.gather(
+                asyncio.wait_for(endpoint.client.info(), self._timeout),
+                probe_stops(),
+            )
+        except errors as exc:
+            _LOGGER.warning(f"Probing endpoint {endpoint.name} failed: {exc!r}")
+
+            endpoint.info = None
+            endpoint.capabilities = set()
+            endpoint.unsupported = set()
+            endpoint.error = repr(exc)
+
+            return
+
+        results = {"system_info": True, "stop_finder": bool(stops)}
+
+        if stops:
+            supported = await asyncio.gather(
+                *[probe_capability(k, v, stops) for k, v in self._probes.items()]
+            )
+            results.update(zip(self._probes, supported))
+        else:
+            _LOGGER.debug(f"Endpoint {endpoint.name} found no stops, probes skipped")
+
+        endpoint.info = info
+        endpoint.capabilities = {k for k, v in results.items() if v}
+        endpoint.unsupported = {k for k, v in results.items() if not v}
+        endpoint.error = None
+
+    def save(self, path: str | Path) -> None:
+        """Persist probe results, so a restarted process skips still valid probes.
+
+        Args:
+            path (str | Path): file path
+        """
+        data = {
+            name: {
+                "info": {
+                    "version": x.info.version,
+                    "data_format": x.info.data_format,
+                    "valid_from": x.info.valid_from.isoformat(),
+                    "valid_to": x.info.valid_to.isoformat(),
+                    "data_build": x.info.data_build,
+                },
+                "capabilities": sorted(x.capabilities),
+                "unsupported": sorted(x.unsupported),
+            }
+            for name, x in self.endpoints.items()
+            if x.info is not None
+        }
+
+        Path(path).write_text(json.dumps(data), encoding="utf-8")
+
+    def load(self, path: str | Path) -> None:
+        """Load probe results persisted with `save()` for registered endpoints.
+
+        Args:
+            path (str | Path): file path
+        """
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+
+        for name, entry in data.items():
+            endpoint = self.endpoints.get(name)
+
+            if endpoint is None:
+                continue
+
+            info = entry["info"]
+
+            endpoint.info = SystemInfo(
+                info["version"],
+                info["data_format"],
+                datetime.date.fromisoformat(info["valid_from"]),
+                datetime.date.fromisoformat(info["valid_to"]),
+                info.get("data_build", ""),
+            )
+            endpoint.capabilities = set(entry["capabilities"])
+            endpoint.unsupported = set(entry.get("unsupported", []))
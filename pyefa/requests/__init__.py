@@ -1,13 +1,60 @@
-from .req import Request
-from .req_departures import DeparturesRequest
-from .req_stop_finder import StopFinderRequest
-from .req_system_info import SystemInfoRequest
-from .req_trips import TripRequest
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .req import Request
+    from .req_add_info import AddInfoRequest
+    from .req_departures import DeparturesRequest
+    from .req_line_list import LineListRequest
+    from .req_line_stop import LineStopRequest
+    from .req_serving_lines import ServingLinesRequest
+    from .req_stop_finder import StopFinderRequest
+    from .req_stop_seq_coord import StopSeqCoordRequest
+    from .req_system_info import SystemInfoRequest
+    from .req_trip_stop_times import TripStopTimesRequest
+    from .req_trips import TripRequest
+
+# request modules (and voluptuous) are imported on first use
+_LAZY_IMPORTS = {
+    "Request": ".req",
+    "AddInfoRequest": ".req_add_info",
+    "DeparturesRequest": ".req_departures",
+    "LineListRequest": ".req_line_list",
+    "LineStopRequest": ".req_line_stop",
+    "ServingLinesRequest": ".req_serving_lines",
+    "StopFinderRequest": ".req_stop_finder",
+    "StopSeqCoordRequest": ".req_stop_seq_coord",
+    "SystemInfoRequest": ".req_system_info",
+    "TripRequest": ".req_trips",
+    "TripStopTimesRequest": ".req_trip_stop_times",
+}
 
 __all__ = [
     "Request",
+    "AddInfoRequest",
     "DeparturesRequest",
+    "LineListRequest",
+    "LineStopRequest",
+    "ServingLinesRequest",
     "StopFinderRequest",
+    "StopSeqCoordRequest",
     "SystemInfoRequest",
     "TripRequest",
+    "TripStopTimesRequest",
 ]
+
+
+def __getattr__(name: str):
+    module = _LAZY_IMPORTS.get(name)
+
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,250 @@
+"""Compile voluptuous schemas into specialized validation functions.
+
+A compiled schema is a generated Python function per (nested) dict schema with
+straight-line key lookups, `isinstance` checks and frozenset membership tests
+instead of the generic interpretation of the schema tree by voluptuous. The
+generated functions only decide whether data is valid, invalid data is passed
+to the original schema, so errors (and their messages) are raised by
+voluptuous exactly as before.
+
+Constructs without specialization (e.g. `Any`, defaults, `Self`) are validated
+by calling voluptuous for that part of the schema.
+"""
+
+import inspect
+import logging
+from collections.abc import Callable, Mapping
+
+from voluptuous import PREVENT_EXTRA, In, Marker, Optional, Required, Schema
+from voluptuous.schema_builder import UNDEFINED
+
+_LOGGER = logging.getLogger(__name__)
+
+_MISSING = object()
+_LITERALS = (str, bytes, int, float, complex, bool, type(None))
+
+
+class _Compiler:
+    def __init__(self) -> None:
+        self.namespace: dict = {"_MISSING": _MISSING}
+        self.lines: list[str] = []
+        self._functions: dict[tuple[int, int, bool], str] = {}
+        self._counter: int = 0
+
+    def _name(self, prefix: str) -> str:
+        self._counter += 1
+
+        return f"{prefix}{self._counter}"
+
+    def _constant(self, value) -> str:
+        name = self._name("_c")
+        self.namespace[name] = value
+
+        return name
+
+    def function(self, schema, extra: int, required: bool) -> str:
+        """Return name of generated function returning True if data is valid."""
+        if isinstance(schema, Schema):
+            extra, required = schema.extra, schema.required
+
+        key = (id(schema), extra, required)
+        name = self._functions.get(key)
+
+        if name is not None:
+            return name
+
+        name = self._functions[key] = self._name("_v")
+        body: list[str] = []
+        value = schema.schema if isinstance(schema, Schema) else schema
+
+        self._check(value, "data", body, "    ", extra, required)
+
+        self.lines += [f"def {name}(data):", *body, "    return True", ""]
+
+        return name
+
+    def _fallback(self, schema, var: str, out: list[str], indent: str, extra: int):
+        # validated by voluptuous, e.g. for constructs without specialization
+        validator = self._constant(Schema(schema, extra=extra))
+
+        out += [
+            f"{indent}try:",
+            f"{indent}    {validator}({var})",
+            f"{indent}except Exception:",
+            f"{indent}    return False",
+        ]
+
+    def _check(
+        self,
+        schema,
+        var: str,
+        out: list[str],
+        indent: str,
+        extra: int,
+        required: bool,
+    ) -> None:
+        """Append statements returning False if `var` does not match `schema`."""
+        # same order of checks as voluptuous' Schema._compile()
+        if isinstance(schema, Schema):
+            name = self.function(schema, extra, required)
+            out.append(f"{indent}if not {name}({var}):")
+            out.append(f"{indent}    return False")
+        elif hasattr(schema, "__voluptuous_compile__"):
+            self._fallback(schema, var, out, indent, extra)
+        elif isinstance(schema, Mapping):
+            self._check_dict(schema, var, out, indent, extra, required)
+        elif isinstance(schema, list):
+            self._check_list(schema, var, out, indent, extra, required)
+        elif inspect.isclass(schema):
+            out.append(f"{indent}if not isinstance({var}, {self._constant(schema)}):")
+            out.append(f"{indent}    return False")
+        elif isinstance(schema, In):
+            self._check_in(schema, var, out, indent, extra)
+        elif callable(schema):
+            out += [
+                f"{indent}try:",
+                f"{indent}    {self._constant(schema)}({var})",
+                f"{indent}except Exception:",
+                f"{indent}    return False",
+            ]
+        elif isinstance(schema, _LITERALS):
+            out.append(f"{indent}if {var} != {self._constant(schema)}:")
+            out.append(f"{indent}    return False")
+        else:
+            self._fallback(schema, var, out, indent, extra)
+
+    def _check_in(self, schema: In, var: str, out: list[str], indent: str, extra):
+        try:
+            container = frozenset(schema.container)
+        except TypeError:
+            self._fallback(schema, var, out, indent, extra)
+            return
+
+        out += [
+            f"{indent}try:",
+            f"{indent}    if {var} not in {self._constant(container)}:",
+            f"{indent}        return False",
+            f"{indent}except TypeError:",
+            f"{indent}    return False",
+        ]
+
+    def _check_list(
+        self,
+        schema: list,
+        var: str,
+        out: list[str],
+        indent: str,
+        extra: int,
+        required: bool,
+    ) -> None:
+        out.append(f"{indent}if not isinstance({var}, list):")
+        out.append(f"{indent}    return False")
+
+        if not schema:
+            out.append(f"{indent}if {var}:")
+            out.append(f"{indent}    return False")
+            return
+
+        item = self._name("i")
+        out.append(f"{indent}for {item} in {var}:")
+
+        if len(schema) == 1:
+            self._check(schema[0], item, out, indent + "    ", extra, required)
+        else:
+            # item has to match any of the alternatives
+            names = [self.function(x, extra, required) for x in schema]
+            alternatives = " or ".join(f"{x}({item})" for x in names)
+
+            out.append(f"{indent}    if not ({alternatives}):")
+            out.append(f"{indent}        return False")
+
+    def _check_dict(
+        self,
+        schema: Mapping,
+        var: str,
+        out: list[str],
+        indent: str,
+        extra: int,
+        required: bool,
+    ) -> None:
+        keys = []
+
+        for key, value in schema.items():
+            marker = key if isinstance(key, Marker) else None
+            name = key.schema if marker else key
+
+            # markers with defaults or other semantics (Exclusive, Remove, ...)
+            # and non-literal keys are left to voluptuous
+            if not isinstance(name, str) or (
+                marker is not None
+                and (
+                    type(marker) not in (Required, Optional)
+                    or marker.default is not UNDEFINED
+                )
+            ):
+                self._fallback(schema, var, out, indent, extra)
+                return
+
+            is_required = isinstance(marker, Required) or (marker is None and required)
+            keys.append((name, value, is_required))
+
+        out.append(f"{indent}if not isinstance({var}, dict):")
+        out.append(f"{indent}    return False")
+
+        required_keys = frozenset(x[0] for x in keys if x[2])
+
+        if required_keys:
+            out.append(
+                f"{indent}if not {var}.keys() >= {self._constant(required_keys)}:"
+            )
+            out.append(f"{indent}    return False")
+
+        if extra == PREVENT_EXTRA:
+            allowed = self._constant(frozenset(x[0] for x in keys))
+            out.append(f"{indent}if not {var}.keys() <= {allowed}:")
+            out.append(f"{indent}    return False")
+
+        for name, value, is_required in keys:
+            value_var = self._name("v")
+
+            if is_required:
+                out.append(f"{indent}{value_var} = {var}[{name!r}]")
+                self._check(value, value_var, out, indent, extra, required)
+            else:
+                out.append(f"{indent}{value_var} = {var}.get({name!r}, _MISSING)")
+                out.append(f"{indent}if {value_var} is not _MISSING:")
+                self._check(value, value_var, out, indent + "    ", extra, required)
+
+
+def compile_schema(schema: Schema) -> Callable[[object], None]:
+    """Compile `schema` into a validation function.
+
+    The function raises the same `MultipleInvalid` errors as `schema(data)` but
+    does not return validated data, i.e. defaults are not inserted.
+
+    Args:
+        schema (Schema): voluptuous schema
+
+    Returns:
+        Callable[[object], None]: validation function
+    """
+    compiler = _Compiler()
+    check = compiler.function(schema, schema.extra, schema.required)
+    source = "\n".join(compiler.lines)
+    code = compile(source, f"<compiled schema {check}>", "exec")
+
+    # code is generated from the schema only, response data never ends up in it
+    exec(code, compiler.namespace)  # noqa: S102
+
+    _LOGGER.debug(f"Schema compiled to {len(compiler.lines)} line(s)")
+
+    is_valid = compiler.namespace[check]
+
+    def validate(data) -> None:
+        if not is_valid(data):
+            # voluptuous reports the error
+            schema(data)
+
+    validate.source = source
+
+    return validate
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+from pyefa.data_classes import (
+    Info,
+    Line,
+    Stop,
+    StopSequence,
+    StopTime,
+    StopType,
+    TransportType,
+)
+from pyefa.geometry import GeometryCache, Polyline
+from pyefa.helpers import parse_datetime
+from pyefa.merge import StopInterner
+
+
+def parse_location(location: dict) -> Stop:
+    """Create stop from location dict of a rapidJSON response.
+
+    Args:
+        location (dict): location validated against `SCHEMA_LOCATION`
+
+    Returns:
+        Stop: stop
+    """
+    id = location.get("id", "")
+
+    if not location.get("isGlobalId", False) and location.get("properties"):
+        id = location.get("properties").get("stopId")
+
+    return Stop(
+        id,
+        location.get("name", ""),
+        StopType(location.get("type", "")),
+        location.get("disassembledName", ""),
+        location.get("coord", []),
+        [TransportType(x) for x in location.get("productClasses", [])],
+    )
+
+
+def parse_line(line: dict, interner: StopInterner | None = None) -> Line:
+    """Create line from line/transportation dict of a rapidJSON response.
+
+    Args:
+        line (dict): line validated against `SCHEMA_LINE`
+        interner (StopInterner | None, optional): pool of shared stops. Defaults to None.
+
+    Returns:
+        Line: line
+    """
+    if interner is None:
+        interner = StopInterner()
+
+    origin = line.get("origin")
+    destination = line.get("destination")
+
+    if origin:
+        origin = interner.get(
+            origin.get("id"), origin.get("name"), StopType(origin.get("type"))
+        )
+
+    if destination:
+        destination = interner.get(
+            destination.get("id"),
+            destination.get("name"),
+            StopType(destination.get("type")),
+        )
+
+    return Line(
+        line.get("id"),
+        line.get("name"),
+        line.get("number"),
+        line.get("description", ""),
+        TransportType(line.get("product").get("class")),
+        origin or None,
+        destination or None,
+    )
+
+
+def parse_stop_sequence(
+    leg: dict,
+    interner: StopInterner | None = None,
+    geometry_cache: GeometryCache | None = None,
+    scale: float = 1,
+) -> StopSequence:
+    """Create stop sequence from leg dict of a rapidJSON response.
+
+    Args:
+        leg (dict): leg validated against `SCHEMA_LEG`
+        interner (StopInterner | None, optional): pool of shared stops. Defaults to None.
+        geometry_cache (GeometryCache | None, optional): cache of route polylines.
+        Defaults to None.
+        scale (float, optional): quantization scale of coordinates. Defaults to 1.
+
+    Returns:
+        StopSequence: stop sequence
+    """
+    if interner is None:
+        interner = StopInterner()
+
+    line = parse_line(leg.get("transportation"), interner)
+
+    stop_times = []
+
+    for location in leg.get("stopSequence", []):
+        times = [
+            location.get(x)
+            for x in (
+                "arrivalTimePlanned",
+                "arrivalTimeEstimated",
+                "departureTimePlanned",
+                "departureTimeEstimated",
+            )
+        ]
+
+        stop_times.append(
+            StopTime(
+                interner.intern(parse_location(location)),
+                *[parse_datetime(x) if x else None for x in times],
+            )
+        )
+
+    path = None
+    coords = leg.get("coords")
+
+    if coords:
+        if geometry_cache is None:
+            path = Polyline(coords, scale)
+        else:
+            route = (line.id, tuple(x.stop.id for x in stop_times))
+            path = geometry_cache.get(route, coords, scale)
+
+    return StopSequence(line, stop_times, path)
+
+
+def parse_info(info: dict) -> Info:
+    """Create additional information message from info dict of a rapidJSON response.
+
+    Args:
+        info (dict): info validated against `SCHEMA_INFO`
+
+    Returns:
+        Info: message
+    """
+    link = (info.get("infoLinks") or [{}])[0]
+    availability = info.get("timestamps", {}).get("availability", {})
+    affected = info.get("affected", {})
+
+    valid_from = availability.get("from")
+    valid_to = availability.get("to")
+
+    return Info(
+        info.get("id"),
+        info.get("version", 0),
+        info.get("type", ""),
+        info.get("priority", "normal"),
+        link.get("title") or link.get("urlText", ""),
+        link.get("subtitle", ""),
+        link.get("content", ""),
+        link.get("url", ""),
+        parse_datetime(valid_from) if valid_from else None,
+        parse_datetime(valid_to) if valid_to else None,
+        [x.get("id") for x in affected.get("lines", []) if x.get("id")],
+        [x.get("id") for x in affected.get("stops", []) if x.get("id")],
+    )
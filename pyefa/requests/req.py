@@ -1,28 +1,46 @@
 import logging
 from abc import abstractmethod
+from collections.abc import Callable
 
 from voluptuous import MultipleInvalid, Schema
 
 from pyefa.exceptions import EfaParameterError, EfaResponseInvalid
 from pyefa.helpers import is_date, is_datetime, is_time
+from pyefa.requests.compiler import compile_schema
 
 _LOGGER = logging.getLogger(__name__)
 
+_RESPONSE_VALIDATORS: dict[type, Callable[[dict], None]] = {}
+# params schemas do not depend on the request instance, building them for every
+# request (and parameter) dominated the cost of creating requests
+_PARAMS_SCHEMAS: dict[type, Schema] = {}
+
 
 class Request:
     def __init__(self, name: str, macro: str, output_format: str = "rapidJSON") -> None:
         self._name: str = name
         self._macro: str = macro
         self._parameters: dict[str, str] = {}
-        self._schema: Schema = self._get_params_schema()
+        # response validated by `validate()`, e.g. in an executor
+        self._validated: dict | None = None
 
         self.add_param("outputFormat", output_format)
 
+    @property
+    def _schema(self) -> Schema:
+        # shared by all requests of a class and not part of the (picklable) state
+        schema = _PARAMS_SCHEMAS.get(type(self))
+
+        if schema is None:
+            schema = _PARAMS_SCHEMAS[type(self)] = self._get_params_schema()
+
+        return schema
+
     def add_param(self, param: str, value: str):
         if not param or not value:
             return
 
-        if param not in self._get_params_schema().schema.keys():
+        if param not in self._schema.schema:
             raise EfaParameterError(
                 f"Parameter {param} is now allowed for this request"
             )
@@ -76,11 +94,44 @@ class Request:
             _LOGGER.error("Parameters validation failed", exc_info=exc)
             raise EfaParameterError(str(exc)) from exc
 
+    @classmethod
+    def validate(cls, response: dict) -> None:
+        """Validate `response` against the response schema of the request class.
+
+        Only the class is needed, so responses can be validated in a process pool
+        without sending the request (and the pools it references) to the worker.
+
+        Raises:
+            EfaResponseInvalid: Validation of the response failed
+        """
+        # response schemas do not depend on the request instance
+        cls.__new__(cls)._validate_response(response)
+
+    def parse_validated(self, data: dict):
+        """Parse `data` already validated with `validate()`."""
+        self._validated = data
+
+        try:
+            return self.parse(data)
+        finally:
+            self._validated = None
+
     def _validate_response(self, response: dict) -> None:
-        val_schema = self._get_response_schema()
+        validated = getattr(self, "_validated", None)
+
+        if validated is not None and response is validated:
+            return
+
+        # response schemas are compiled once per request class
+        validate = _RESPONSE_VALIDATORS.get(type(self))
+
+        if validate is None:
+            validate = _RESPONSE_VALIDATORS[type(self)] = compile_schema(
+                self._get_response_schema()
+            )
 
         try:
-            val_schema(response)
+            validate(response)
         except MultipleInvalid as exc:
             raise EfaResponseInvalid(
                 f"Server response validataion failed - {str(exc)}"
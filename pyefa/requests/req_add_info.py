@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import logging
+
+from voluptuous import ALLOW_EXTRA, Any, Date, Optional, Required, Schema
+
+from pyefa.data_classes import Info
+from pyefa.infos import InfoIndex
+from pyefa.requests import schemas
+from pyefa.requests.req import Request
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class AddInfoRequest(Request):
+    def __init__(self, index: InfoIndex | None = None) -> None:
+        """Create additional information (disruptions, construction work) request.
+
+        Args:
+            index (InfoIndex | None, optional): index of known messages, messages
+            with known id and version are not parsed again. Defaults to None.
+        """
+        super().__init__("XML_ADDINFO_REQUEST", "addinfo")
+
+        self._index: InfoIndex = InfoIndex() if index is None else index
+
+    def parse(self, data: dict) -> list[Info]:
+        self._validate_response(data)
+
+        infos = data.get("infos", {}).get("current", [])
+
+        _LOGGER.info(f"{len(infos)} info(s) found")
+
+        return [self._index.parse_current(x) for x in infos]
+
+    def _get_params_schema(self) -> Schema:
+        return Schema(
+            {
+                Required("outputFormat", default="rapidJSON"): Any("rapidJSON"),
+                Required("filterPublicationStatus", default="current"): Any(
+                    "current", "historic"
+                ),
+                Optional("filterDateValid"): Date("%d.%m.%Y"),
+                Optional("filterInfoType"): str,
+                Optional("filterOMC"): str,
+                Optional("filterLineNumberIntervalStart"): str,
+                Optional("filterLineNumberIntervalEnd"): str,
+                Optional("filterPNLineDir"): str,
+                Optional("filterPNLineSub"): str,
+                Optional("itdLPxx_selLine"): str,
+                Optional("itdLPxx_selStop"): str,
+            }
+        )
+
+    def _get_response_schema(self) -> Schema:
+        return Schema(
+            {
+                Required("version"): str,
+                Optional("systemMessages"): list,
+                Required("infos"): Schema(
+                    {
+                        Optional("current"): [schemas.SCHEMA_INFO],
+                        Optional("historic"): list,
+                    },
+                    extra=ALLOW_EXTRA,
+                ),
+            }
+        )
@@ -1,26 +1,88 @@
+from __future__ import annotations
+
 import logging
+from collections.abc import Iterable
 
-from voluptuous import Any, Date, Datetime, Optional, Required, Schema
+from voluptuous import Any, Boolean, Date, Datetime, Optional, Required, Schema
 
-from pyefa.data_classes import Departure, Stop, StopType, TransportType
+from pyefa.data_classes import Departure, StopType, TransportType
+from pyefa.exceptions import EfaResponseInvalid
 from pyefa.helpers import parse_datetime
+from pyefa.infos import InfoIndex
+from pyefa.merge import StopInterner
+from pyefa.requests import schemas
 from pyefa.requests.req import Request
-from pyefa.requests.schemas import SCHEMA_LOCATION, SCHEMA_TRANSPORTATION
 
 _LOGGER = logging.getLogger(__name__)
 
 
 class DeparturesRequest(Request):
-    def __init__(self, stop: str) -> None:
+    def __init__(
+        self,
+        stop: str,
+        interner: StopInterner | None = None,
+        infos: InfoIndex | None = None,
+        transports: Iterable[TransportType] | None = None,
+        lines: Iterable[str] | None = None,
+    ) -> None:
+        """Create departures request for `stop`.
+
+        Filters are applied to the validated stop events before parsing.
+        Transport types are excluded on server side as well.
+
+        Args:
+            stop (str): stop id
+            interner (StopInterner | None, optional): pool of stops shared between
+            parsed departures. Defaults to a new pool per request.
+            infos (InfoIndex | None, optional): pool of messages shared between
+            parsed departures. Defaults to a new pool per request.
+            transports (Iterable[TransportType] | None, optional): return only
+            departures of these transport types. Defaults to None (all).
+            lines (Iterable[str] | None, optional): return only departures of these
+            line names, e.g. "U1". Defaults to None (all).
+        """
         super().__init__("XML_DM_REQUEST", "dm")
 
+        self._interner: StopInterner = StopInterner() if interner is None else interner
+        self._infos: InfoIndex = InfoIndex() if infos is None else infos
+        self._transports: frozenset[int] | None = None
+        self._lines: frozenset[str] | None = None
+
+        if transports is not None:
+            self._transports = frozenset(int(x) for x in transports)
+
+            self.add_param("excludedMeans", "checkbox")
+
+            for transport in TransportType:
+                if transport not in self._transports:
+                    self.add_param(f"exclMOT_{transport.value}", "1")
+
+        if lines is not None:
+            self._lines = frozenset(lines)
+
         self.add_param("name_dm", stop)
 
+    def _is_selected(self, stop_event: dict) -> bool:
+        """Check validated stop event against transport and line filters."""
+        transportation = stop_event["transportation"]
+
+        if self._lines is not None and transportation["number"] not in self._lines:
+            return False
+
+        # endpoints may ignore the exclusion parameters, filter here as well
+        return (
+            self._transports is None
+            or transportation["product"]["class"] in self._transports
+        )
+
     def parse(self, data: dict):
         self._validate_response(data)
 
         stops = data.get("stopEvents", [])
 
+        if self._transports is not None or self._lines is not None:
+            stops = [x for x in stops if self._is_selected(x)]
+
         _LOGGER.debug(f"{len(stops)} departure(s) found")
 
         departures = []
@@ -35,34 +97,44 @@ class DeparturesRequest(Request):
             if estimated_time:
                 estimated_time = parse_datetime(estimated_time)
 
-            infos = stop.get("infos", [])
+            infos = []
+
+            for info in stop.get("infos", []):
+                try:
+                    infos.append(self._infos.intern(info))
+                except EfaResponseInvalid as exc:
+                    _LOGGER.debug(f"Invalid info skipped: {exc}")
+
+            cancelled = stop.get("isCancelled", False) or "TRIP_CANCELLED" in stop.get(
+                "realtimeStatus", []
+            )
             transportation = stop.get("transportation", {})
 
             if transportation:
                 line_name = transportation.get("number")
                 route = transportation.get("description")
 
-                origin_dict = {
-                    "id": transportation.get("origin").get("id"),
-                    "name": transportation.get("origin").get("name"),
-                    "type": StopType(transportation.get("origin").get("type")),
-                }
-                destination_dict = {
-                    "id": transportation.get("destination").get("id"),
-                    "name": transportation.get("destination").get("name"),
-                    "type": StopType(transportation.get("destination").get("type")),
-                }
-
-                origin = Stop(
-                    origin_dict["id"], origin_dict["name"], origin_dict["type"]
+                # origin and destination are optional in the response schema
+                if not (
+                    transportation.get("origin") and transportation.get("destination")
+                ):
+                    _LOGGER.debug(
+                        f"Departure of line {line_name} without origin or destination skipped"
+                    )
+                    continue
+
+                origin = self._interner.get(
+                    transportation["origin"].get("id"),
+                    transportation["origin"].get("name"),
+                    StopType(transportation["origin"].get("type")),
                 )
-                destination = Stop(
-                    destination_dict["id"],
-                    destination_dict["name"],
-                    destination_dict["type"],
+                destination = self._interner.get(
+                    transportation["destination"].get("id"),
+                    transportation["destination"].get("name"),
+                    StopType(transportation["destination"].get("type")),
                 )
 
-                product = TransportType(transportation.get("product").get("class"))
+                product = TransportType(transportation["product"]["class"])
 
                 departures.append(
                     Departure(
@@ -74,6 +146,7 @@ class DeparturesRequest(Request):
                         planned_time,
                         estimated_time,
                         infos,
+                        cancelled,
                     )
                 )
         return departures
@@ -94,6 +167,10 @@ class DeparturesRequest(Request):
                 Optional("deleteAssigendStops_dm"): Any("0", "1", 0, 1),
                 Optional("doNotSearchForStops_dm"): Any("0", "1", 0, 1),
                 Optional("limit"): int,
+                Optional("excludedMeans"): Any("checkbox"),
+                **{
+                    Optional(f"exclMOT_{x.value}"): Any("0", "1") for x in TransportType
+                },
             }
         )
 
@@ -102,18 +179,21 @@ class DeparturesRequest(Request):
             {
                 Required("version"): str,
                 Optional("systemMessages"): list,
-                Required("locations"): [SCHEMA_LOCATION],
+                Required("locations"): [schemas.SCHEMA_LOCATION],
                 Required("stopEvents"): [
                     Schema(
                         {
-                            Required("location"): SCHEMA_LOCATION,
+                            Required("location"): schemas.SCHEMA_LOCATION,
                             Required("departureTimePlanned"): Datetime(
                                 "%Y-%m-%dT%H:%M:%S%z"
                             ),
                             Optional("departureTimeEstimated"): Datetime(
                                 "%Y-%m-%dT%H:%M:%S%z"
                             ),
-                            Required("transportation"): SCHEMA_TRANSPORTATION,
+                            Required("transportation"): schemas.SCHEMA_TRANSPORTATION,
+                            Optional("isCancelled"): Boolean,
+                            Optional("realtimeStatus"): [str],
+                            Optional("infos"): list,
                         }
                     )
                 ],
@@ -0,0 +1,51 @@
+import logging
+
+from voluptuous import Any, Optional, Required, Schema
+
+from pyefa.data_classes import Line
+from pyefa.merge import StopInterner
+from pyefa.requests import schemas
+from pyefa.requests.parsers import parse_line
+from pyefa.requests.req import Request
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class LineListRequest(Request):
+    def __init__(self) -> None:
+        super().__init__("XML_LINELIST_REQUEST", "linelist")
+
+    def parse(self, data: dict) -> list[Line]:
+        self._validate_response(data)
+
+        lines = data.get("lines", [])
+
+        _LOGGER.info(f"{len(lines)} line(s) found")
+
+        interner = StopInterner()
+
+        return [parse_line(x, interner) for x in lines]
+
+    def _get_params_schema(self) -> Schema:
+        return Schema(
+            {
+                Required("outputFormat", default="rapidJSON"): Any("rapidJSON"),
+                Optional("lineListBranchCode"): str,
+                Optional("lineListNetBranchCode"): str,
+                Optional("lineListSubnetwork"): str,
+                Optional("lineListOMC"): str,
+                Optional("lineListMixedLines"): Any("0", "1", 0, 1),
+                Optional("lineReqType"): int,
+                Optional("mergeDir"): Any("0", "1", 0, 1),
+                Optional("withoutTrains"): Any("0", "1", 0, 1),
+            }
+        )
+
+    def _get_response_schema(self) -> Schema:
+        return Schema(
+            {
+                Required("version"): str,
+                Optional("systemMessages"): list,
+                Required("lines"): [schemas.SCHEMA_LINE],
+            }
+        )
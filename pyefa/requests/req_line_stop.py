@@ -0,0 +1,45 @@
+import logging
+
+from voluptuous import Any, Optional, Required, Schema
+
+from pyefa.data_classes import Stop
+from pyefa.requests import schemas
+from pyefa.requests.parsers import parse_location
+from pyefa.requests.req import Request
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class LineStopRequest(Request):
+    def __init__(self, line: str) -> None:
+        super().__init__("XML_LINESTOP_REQUEST", "linestop")
+
+        self.add_param("line", line)
+
+    def parse(self, data: dict) -> list[Stop]:
+        self._validate_response(data)
+
+        locations = data.get("locationSequence", [])
+
+        _LOGGER.info(f"{len(locations)} stop(s) of line found")
+
+        return [parse_location(x) for x in locations]
+
+    def _get_params_schema(self) -> Schema:
+        return Schema(
+            {
+                Required("outputFormat", default="rapidJSON"): Any("rapidJSON"),
+                Required("line"): str,
+                Optional("allStopInfo"): Any("0", "1", 0, 1),
+            }
+        )
+
+    def _get_response_schema(self) -> Schema:
+        return Schema(
+            {
+                Required("version"): str,
+                Optional("systemMessages"): list,
+                Optional("transportation"): dict,
+                Required("locationSequence"): [schemas.SCHEMA_LOCATION],
+            }
+        )
@@ -0,0 +1,54 @@
+import logging
+
+from voluptuous import Any, Optional, Required, Schema
+
+from pyefa.data_classes import Line
+from pyefa.merge import StopInterner
+from pyefa.requests import schemas
+from pyefa.requests.parsers import parse_line
+from pyefa.requests.req import Request
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ServingLinesRequest(Request):
+    def __init__(self, stop: str) -> None:
+        super().__init__("XML_SERVINGLINES_REQUEST", "servingLines")
+
+        self.add_param("name_sl", stop)
+
+    def parse(self, data: dict) -> list[Line]:
+        self._validate_response(data)
+
+        lines = data.get("lines", [])
+
+        _LOGGER.info(f"{len(lines)} line(s) found")
+
+        interner = StopInterner()
+
+        return [parse_line(x, interner) for x in lines]
+
+    def _get_params_schema(self) -> Schema:
+        return Schema(
+            {
+                Required("outputFormat", default="rapidJSON"): Any("rapidJSON"),
+                Required("mode", default="odv"): Any("odv", "line"),
+                Required("type_sl", default="stopID"): Any("stopID", "any"),
+                Required("name_sl"): str,
+                Optional("lineName"): str,
+                Optional("lineReqType"): int,
+                Optional("withoutTrains"): Any("0", "1", 0, 1),
+                Optional("mergeDir"): Any("0", "1", 0, 1),
+                Optional("lsShowTrainsExplicit"): Any("0", "1", 0, 1),
+            }
+        )
+
+    def _get_response_schema(self) -> Schema:
+        return Schema(
+            {
+                Required("version"): str,
+                Optional("systemMessages"): list,
+                Optional("locations"): list,
+                Required("lines"): [schemas.SCHEMA_LINE],
+            }
+        )
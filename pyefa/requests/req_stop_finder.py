@@ -1,18 +1,36 @@
+from __future__ import annotations
+
+import heapq
 import logging
 
 from voluptuous import Any, Optional, Range, Required, Schema
 
-from pyefa.data_classes import Stop, StopFilter, StopType, TransportType
+from pyefa.data_classes import Stop, StopFilter
+from pyefa.requests import schemas
+from pyefa.requests.parsers import parse_location
 from pyefa.requests.req import Request
-from pyefa.requests.schemas import SCHEMA_LOCATION
 
 _LOGGER = logging.getLogger(__name__)
 
 
+def _match_quality(location: dict) -> int:
+    return location.get("matchQuality", 0)
+
+
 class StopFinderRequest(Request):
-    def __init__(self, req_type: str, name: str) -> None:
+    def __init__(self, req_type: str, name: str, top_k: int | None = None) -> None:
+        """Create stop finder request.
+
+        Args:
+            req_type (str): search type, "any" or "coord"
+            name (str): name, id or coordinates to search for
+            top_k (int | None, optional): parse only the `top_k` best matches.
+            Defaults to None (all matches).
+        """
         super().__init__("XML_STOPFINDER_REQUEST", "stopfinder")
 
+        self._top_k: int | None = top_k
+
         self.add_param("type_sf", req_type)
         self.add_param("name_sf", name)
 
@@ -23,42 +41,14 @@ class StopFinderRequest(Request):
 
         _LOGGER.info(f"{len(locations)} stop(s) found")
 
-        stops = []
-
-        for location in locations:
-            id = location.get("id", "")
-
-            if not location.get("isGlobalId", False):
-                if location.get("properties"):
-                    id = location.get("properties").get("stopId")
-
-            stop = {
-                "id": id,
-                "name": location.get("name", ""),
-                "disassembled_name": location.get("disassembledName", ""),
-                "coord": location.get("coord", []),
-                "stop_type": StopType(location.get("type", "")),
-                "transports": [
-                    TransportType(x) for x in location.get("productClasses", [])
-                ],
-                "match_quality": location.get("matchQuality", 0),
-            }
-
-            stops.append(stop)
-
-        stops = sorted(stops, key=lambda x: x["match_quality"], reverse=True)
+        # select best matches in one pass (bounded heap for top k), only the
+        # selected locations are turned into stops; ties keep response order
+        if self._top_k is None:
+            locations = sorted(locations, key=_match_quality, reverse=True)
+        else:
+            locations = heapq.nlargest(self._top_k, locations, key=_match_quality)
 
-        return [
-            Stop(
-                x["id"],
-                x["name"],
-                x["disassembled_name"],
-                x["coord"],
-                x["stop_type"],
-                x["transports"],
-            )
-            for x in stops
-        ]
+        return [parse_location(x) for x in locations]
 
     def _get_params_schema(self) -> Schema:
         return Schema(
@@ -82,6 +72,6 @@ class StopFinderRequest(Request):
             {
                 Required("version"): str,
                 Optional("systemMessages"): list,
-                Required("locations"): [SCHEMA_LOCATION],
+                Required("locations"): [schemas.SCHEMA_LOCATION],
             }
         )
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import logging
+
+from voluptuous import Any, Date, Datetime, Optional, Required, Schema
+
+from pyefa.data_classes import StopSequence
+from pyefa.geometry import GeometryCache
+from pyefa.requests import schemas
+from pyefa.requests.parsers import parse_stop_sequence
+from pyefa.requests.req import Request
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class StopSeqCoordRequest(Request):
+    def __init__(self, line: str, geometry_cache: GeometryCache | None = None) -> None:
+        """Create request for stop sequence and path coordinates of `line`.
+
+        Args:
+            line (str): line id
+            geometry_cache (GeometryCache | None, optional): cache of route polylines
+            shared between requests. Defaults to None.
+        """
+        super().__init__("XML_STOPSEQCOORD_REQUEST", "stopseqcoord")
+
+        self._geometry_cache: GeometryCache | None = geometry_cache
+
+        self.add_param("line", line)
+
+    def parse(self, data: dict) -> StopSequence:
+        self._validate_response(data)
+
+        _LOGGER.info("Parsing stop sequence response")
+
+        return parse_stop_sequence(data.get("leg"), geometry_cache=self._geometry_cache)
+
+    def _get_params_schema(self) -> Schema:
+        return Schema(
+            {
+                Required("outputFormat", default="rapidJSON"): Any("rapidJSON"),
+                Required("line"): str,
+                Optional("stop"): str,
+                Optional("tripCode"): int,
+                Optional("itdDate"): Date("%Y%m%d"),
+                Optional("itdTime"): Datetime("%M%S"),
+                Required("coordListOutputFormat", default="list"): Any("list"),
+                Optional("coordOutputFormat"): str,
+                Optional("useRealtime"): Any("0", "1", 0, 1),
+            }
+        )
+
+    def _get_response_schema(self) -> Schema:
+        return Schema(
+            {
+                Required("version"): str,
+                Optional("systemMessages"): list,
+                Required("leg"): schemas.SCHEMA_LEG,
+            }
+        )
@@ -20,13 +20,14 @@ class SystemInfoRequest(Request):
 
         version = data.get("version", None)
         data_format = data.get("ptKernel").get("dataFormat")
+        data_build = data.get("ptKernel").get("dataBuild")
         valid_from = data.get("validity").get("from")
         valid_to = data.get("validity").get("to")
 
         valid_from = parse_date(valid_from)
         valid_to = parse_date(valid_to)
 
-        return SystemInfo(version, data_format, valid_from, valid_to)
+        return SystemInfo(version, data_format, valid_from, valid_to, data_build)
 
     def _get_params_schema(self) -> Schema:
         return Schema(
@@ -0,0 +1,49 @@
+import logging
+
+from voluptuous import Any, Date, Datetime, Optional, Required, Schema
+
+from pyefa.data_classes import StopSequence
+from pyefa.requests import schemas
+from pyefa.requests.parsers import parse_stop_sequence
+from pyefa.requests.req import Request
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class TripStopTimesRequest(Request):
+    def __init__(self, line: str, stop: str, trip_code: int) -> None:
+        super().__init__("XML_TRIPSTOPTIMES_REQUEST", "tripstoptimes")
+
+        self.add_param("line", line)
+        self.add_param("stopID", stop)
+        self.add_param("tripCode", trip_code)
+
+    def parse(self, data: dict) -> StopSequence:
+        self._validate_response(data)
+
+        _LOGGER.info("Parsing trip stop times response")
+
+        return parse_stop_sequence(data.get("leg"))
+
+    def _get_params_schema(self) -> Schema:
+        return Schema(
+            {
+                Required("outputFormat", default="rapidJSON"): Any("rapidJSON"),
+                Required("line"): str,
+                Required("stopID"): str,
+                Required("tripCode"): int,
+                Optional("itdDate"): Date("%Y%m%d"),
+                Optional("itdTime"): Datetime("%M%S"),
+                Optional("tStOTType", default="all"): Any("all", "next", "previous"),
+                Optional("useRealtime"): Any("0", "1", 0, 1),
+            }
+        )
+
+    def _get_response_schema(self) -> Schema:
+        return Schema(
+            {
+                Required("version"): str,
+                Optional("systemMessages"): list,
+                Required("leg"): schemas.SCHEMA_LEG,
+            }
+        )
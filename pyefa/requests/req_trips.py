@@ -1,18 +1,78 @@
 import logging
 
-from voluptuous import Any, Optional, Required, Schema
+from voluptuous import ALLOW_EXTRA, Any, Date, Datetime, Optional, Required, Schema
 
+from pyefa.data_classes import Journey
+from pyefa.helpers import parse_datetime
+from pyefa.requests import schemas
+from pyefa.requests.parsers import parse_location
 from pyefa.requests.req import Request
 
 _LOGGER = logging.getLogger(__name__)
 
+# product classes >= 97 are no public transport (footpaths, interchange, taxi)
+_INDIVIDUAL_TRANSPORT = 97
+
 
 class TripRequest(Request):
-    def __init__(self) -> None:
+    def __init__(self, origin: str, destination: str) -> None:
+        """Create trip request from `origin` to `destination`.
+
+        Args:
+            origin (str): stop id of origin
+            destination (str): stop id of destination
+        """
         super().__init__("XML_TRIP_REQUEST2", "trip")
 
-    def parse(self, data: dict):
-        raise NotImplementedError
+        self.add_param("name_origin", origin)
+        self.add_param("name_destination", destination)
+
+    def parse(self, data: dict) -> list[Journey]:
+        self._validate_response(data)
+
+        journeys = data.get("journeys", [])
+
+        _LOGGER.debug(f"{len(journeys)} journey(s) found")
+
+        result = []
+
+        for journey in journeys:
+            legs = journey.get("legs")
+
+            if not legs:
+                _LOGGER.debug("Journey without legs skipped")
+                continue
+
+            origin = legs[0].get("origin")
+            destination = legs[-1].get("destination")
+
+            lines = []
+
+            for leg in legs:
+                transportation = leg.get("transportation") or {}
+                product = transportation.get("product") or {}
+
+                if product.get("class", _INDIVIDUAL_TRANSPORT) < _INDIVIDUAL_TRANSPORT:
+                    lines.append(transportation.get("number", ""))
+
+            times = [
+                origin.get("departureTimePlanned"),
+                destination.get("arrivalTimePlanned"),
+                origin.get("departureTimeEstimated"),
+                destination.get("arrivalTimeEstimated"),
+            ]
+
+            result.append(
+                Journey(
+                    parse_location(origin),
+                    parse_location(destination),
+                    *[parse_datetime(x) if x else None for x in times],
+                    journey.get("interchanges", max(len(lines) - 1, 0)),
+                    lines,
+                )
+            )
+
+        return result
 
     def _get_params_schema(self) -> Schema:
         return Schema(
@@ -24,10 +84,21 @@ class TripRequest(Request):
                 Required("name_destination"): str,
                 Optional("type_via", default="any"): Any("any", "coord"),
                 Optional("name_via"): str,
+                Optional("itdDate"): Date("%Y%m%d"),
+                Optional("itdTime"): Datetime("%M%S"),
+                Optional("itdTripDateTimeDepArr"): Any("dep", "arr"),
+                Optional("calcNumberOfTrips"): int,
                 Optional("useUT"): Any("0", "1", 0, 1),
                 Optional("useRealtime"): Any("0", "1", 0, 1),
             }
         )
 
     def _get_response_schema(self) -> Schema:
-        raise NotImplementedError("Abstract method not implemented")
+        return Schema(
+            {
+                Required("version"): str,
+                Optional("systemMessages"): list,
+                Optional("journeys"): [schemas.SCHEMA_JOURNEY],
+            },
+            extra=ALLOW_EXTRA,
+        )
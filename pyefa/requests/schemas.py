@@ -1,6 +1,9 @@
+from collections.abc import Callable
+
 from voluptuous import (
     ALLOW_EXTRA,
     Boolean,
+    Datetime,
     In,
     Optional,
     Range,
@@ -10,84 +13,222 @@ from voluptuous import (
 
 from pyefa.data_classes import StopType
 
+_STOP_TYPES = frozenset(x.value for x in StopType)
+
 
 def IsStopType(type: str):
-    if type not in [x.value for x in StopType]:
+    if not isinstance(type, str) or type not in _STOP_TYPES:
         raise ValueError
 
 
-SCHEMA_PROPERTIES = Schema(
-    {
-        Required("stopId"): str,
-        Optional("downloads"): list,
-        Optional("area"): str,
-        Optional("platform"): str,
-        Optional("platformName"): str,
-    }
-)
+# Schemas are built on first access (PEP 562 module __getattr__), importing
+# this module does not construct any of them.
+_BUILDERS: dict[str, Callable[[], Schema]] = {}
 
-SCHEMA_PARENT = Schema(
-    {
-        Required("id"): str,
-        Required("name"): str,
-        Required("type"): str,
-        Optional("isGlobalId"): Boolean,
-        Optional("disassembledName"): str,
-        Optional("parent"): Schema(
-            {
-                Required("name"): str,
-                Required("type"): IsStopType,
-            }
-        ),
-        Optional("properties"): SCHEMA_PROPERTIES,
-    }
-)
-SCHEMA_PRODUCT = Schema(
-    {
-        Required("id"): int,
-        Required("class"): int,
-        Required("name"): str,
-        Optional("iconId"): int,
-    }
-)
 
-SCHEMA_SRC_DEST = Schema(
-    {
-        Required("id"): str,
-        Required("name"): str,
-        Required("type"): IsStopType,
-    }
-)
+def _lazy(name: str):
+    def decorator(builder: Callable[[], Schema]) -> Callable[[], Schema]:
+        _BUILDERS[name] = builder
+        return builder
 
-SCHEMA_TRANSPORTATION = Schema(
-    {
-        Required("id"): str,
-        Required("name"): str,
-        Required("disassembledName"): str,
-        Required("number"): str,
-        Required("description"): str,
-        Required("product"): SCHEMA_PRODUCT,
-        Optional("operator"): dict,
-        Optional("destination"): SCHEMA_SRC_DEST,
-        Optional("origin"): SCHEMA_SRC_DEST,
-        Optional("properties"): dict,
-    }
-)
+    return decorator
 
-SCHEMA_LOCATION = Schema(
-    {
-        Required("id"): str,
-        Optional("isGlobalId"): Boolean,
-        Required("name"): str,
-        Optional("disassembledName"): str,
-        Optional("coord"): list,
-        Required("type"): In([x.value for x in StopType]),
-        Optional("isBest"): Boolean,
-        Optional("productClasses"): list[Range(min=0, max=10)],
-        Optional("parent"): SCHEMA_PARENT,
-        Optional("assignedStops"): list,
-        Optional("properties"): SCHEMA_PROPERTIES,
-        Optional("matchQuality"): int,
-    },
-    extra=ALLOW_EXTRA,
-)
+
+def _get(name: str) -> Schema:
+    schema = globals().get(name)
+
+    if schema is None:
+        schema = globals()[name] = _BUILDERS[name]()
+
+    return schema
+
+
+def __getattr__(name: str) -> Schema:
+    if name not in _BUILDERS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    return _get(name)
+
+
+@_lazy("SCHEMA_PROPERTIES")
+def _build_properties() -> Schema:
+    return Schema(
+        {
+            Required("stopId"): str,
+            Optional("downloads"): list,
+            Optional("area"): str,
+            Optional("platform"): str,
+            Optional("platformName"): str,
+        }
+    )
+
+
+@_lazy("SCHEMA_PARENT")
+def _build_parent() -> Schema:
+    return Schema(
+        {
+            Required("id"): str,
+            Required("name"): str,
+            Required("type"): str,
+            Optional("isGlobalId"): Boolean,
+            Optional("disassembledName"): str,
+            Optional("parent"): Schema(
+                {
+                    Required("name"): str,
+                    Required("type"): IsStopType,
+                }
+            ),
+            Optional("properties"): _get("SCHEMA_PROPERTIES"),
+        }
+    )
+
+
+@_lazy("SCHEMA_PRODUCT")
+def _build_product() -> Schema:
+    return Schema(
+        {
+            Required("id"): int,
+            Required("class"): int,
+            Required("name"): str,
+            Optional("iconId"): int,
+        }
+    )
+
+
+@_lazy("SCHEMA_SRC_DEST")
+def _build_src_dest() -> Schema:
+    return Schema(
+        {
+            Required("id"): str,
+            Required("name"): str,
+            Required("type"): IsStopType,
+        }
+    )
+
+
+@_lazy("SCHEMA_TRANSPORTATION")
+def _build_transportation() -> Schema:
+    return Schema(
+        {
+            Required("id"): str,
+            Required("name"): str,
+            Required("disassembledName"): str,
+            Required("number"): str,
+            Required("description"): str,
+            Required("product"): _get("SCHEMA_PRODUCT"),
+            Optional("operator"): dict,
+            Optional("destination"): _get("SCHEMA_SRC_DEST"),
+            Optional("origin"): _get("SCHEMA_SRC_DEST"),
+            Optional("properties"): dict,
+        }
+    )
+
+
+@_lazy("SCHEMA_LOCATION")
+def _build_location() -> Schema:
+    return Schema(
+        {
+            Required("id"): str,
+            Optional("isGlobalId"): Boolean,
+            Required("name"): str,
+            Optional("disassembledName"): str,
+            Optional("coord"): list,
+            Required("type"): In(_STOP_TYPES),
+            Optional("isBest"): Boolean,
+            Optional("productClasses"): list[Range(min=0, max=10)],
+            Optional("parent"): _get("SCHEMA_PARENT"),
+            Optional("assignedStops"): list,
+            Optional("properties"): _get("SCHEMA_PROPERTIES"),
+            Optional("matchQuality"): int,
+        },
+        extra=ALLOW_EXTRA,
+    )
+
+
+@_lazy("SCHEMA_LINE")
+def _build_line() -> Schema:
+    return Schema(
+        {
+            Required("id"): str,
+            Required("name"): str,
+            Optional("disassembledName"): str,
+            Required("number"): str,
+            Optional("description"): str,
+            Required("product"): _get("SCHEMA_PRODUCT"),
+            Optional("operator"): dict,
+            Optional("destination"): _get("SCHEMA_SRC_DEST"),
+            Optional("origin"): _get("SCHEMA_SRC_DEST"),
+            Optional("properties"): dict,
+        },
+        extra=ALLOW_EXTRA,
+    )
+
+
+@_lazy("SCHEMA_LEG")
+def _build_leg() -> Schema:
+    return Schema(
+        {
+            Required("transportation"): _get("SCHEMA_LINE"),
+            Required("stopSequence"): [_get("SCHEMA_LOCATION")],
+            Optional("coords"): [list],
+        },
+        extra=ALLOW_EXTRA,
+    )
+
+
+@_lazy("SCHEMA_INFO")
+def _build_info() -> Schema:
+    return Schema(
+        {
+            Required("id"): str,
+            Optional("version"): int,
+            Optional("type"): str,
+            Optional("priority"): str,
+            Optional("infoLinks"): [dict],
+            Optional("timestamps"): Schema(
+                {
+                    Optional("availability"): Schema(
+                        {
+                            Optional("from"): Datetime("%Y-%m-%dT%H:%M:%S%z"),
+                            Optional("to"): Datetime("%Y-%m-%dT%H:%M:%S%z"),
+                        },
+                        extra=ALLOW_EXTRA,
+                    ),
+                },
+                extra=ALLOW_EXTRA,
+            ),
+            Optional("affected"): Schema(
+                {Optional("lines"): [dict], Optional("stops"): [dict]},
+                extra=ALLOW_EXTRA,
+            ),
+            Optional("properties"): dict,
+        },
+        extra=ALLOW_EXTRA,
+    )
+
+
+@_lazy("SCHEMA_JOURNEY_LEG")
+def _build_journey_leg() -> Schema:
+    return Schema(
+        {
+            Required("origin"): _get("SCHEMA_LOCATION"),
+            Required("destination"): _get("SCHEMA_LOCATION"),
+            Optional("duration"): int,
+            Optional("transportation"): dict,
+            Optional("stopSequence"): list,
+        },
+        extra=ALLOW_EXTRA,
+    )
+
+
+@_lazy("SCHEMA_JOURNEY")
+def _build_journey() -> Schema:
+    return Schema(
+        {
+            Optional("rating"): int,
+            Optional("isAdditional"): Boolean,
+            Optional("interchanges"): int,
+            Required("legs"): [_get("SCHEMA_JOURNEY_LEG")],
+        },
+        extra=ALLOW_EXTRA,
+    )
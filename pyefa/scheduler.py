@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+
+from pyefa.metrics import QueueStats
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    """Request priority classes, lower values are served first."""
+
+    INTERACTIVE = 0
+    NORMAL = 1
+    BULK = 2
+
+
+_PRIORITY: ContextVar[Priority] = ContextVar("pyefa_priority", default=Priority.NORMAL)
+
+
+def current_priority() -> Priority:
+    """Return priority of requests sent from the current context."""
+    return _PRIORITY.get()
+
+
+@contextmanager
+def priority(value: Priority) -> Iterator[Priority]:
+    """Send all requests of the current context (and tasks created in it) with
+    priority `value`.
+
+    Example:
+        with priority(Priority.BULK):
+            await index.refresh(client)
+
+    Args:
+        value (Priority): priority class
+    """
+    token = _PRIORITY.set(value)
+
+    try:
+        yield value
+    finally:
+        _PRIORITY.reset(token)
+
+
+class RequestScheduler:
+    """Limit concurrent requests and hand out free slots by priority.
+
+    A free slot is always given to the waiting request of the most important
+    priority class which is below its quota, requests of the same class are
+    served first in, first out. By default bulk requests may use only part of
+    the slots, so interactive requests never wait for a whole batch of bulk
+    requests to finish.
+
+    Args:
+        max_concurrency (int, optional): max. concurrent requests. Defaults to 16.
+        quotas (dict[Priority, int] | None, optional): max. concurrent requests per
+        priority class. Defaults to 3/4 of `max_concurrency` for `Priority.BULK`
+        and `max_concurrency` for all other classes.
+    """
+
+    def __init__(
+        self, max_concurrency: int = 16, quotas: dict[Priority, int] | None = None
+    ) -> None:
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+
+        self._max_concurrency: int = max_concurrency
+        self._quotas: dict[Priority, int] = {x: max_concurrency for x in Priority}
+        self._quotas[Priority.BULK] = max(1, max_concurrency * 3 // 4)
+        self._quotas.update(quotas or {})
+        self._active: int = 0
+        self._queues: dict[Priority, deque[tuple[asyncio.Future, float]]] = {
+            x: deque() for x in Priority
+        }
+        self.stats: dict[Priority, QueueStats] = {x: QueueStats() for x in Priority}
+
+    @property
+    def active(self) -> int:
+        """Number of requests currently holding a slot."""
+        return self._active
+
+    @property
+    def queued(self) -> int:
+        """Number of requests waiting for a slot."""
+        return sum(x.queued for x in self.stats.values())
+
+    @asynccontextmanager
+    async def slot(self, value: Priority | None = None) -> AsyncIterator[None]:
+        """Hold a request slot while the context is active.
+
+        Args:
+            value (Priority | None, optional): priority class. Defaults to the
+            priority of the current context.
+        """
+        value = current_priority() if value is None else value
+
+        await self.acquire(value)
+
+        try:
+            yield
+        finally:
+            self.release(value)
+
+    async def acquire(self, value: Priority) -> None:
+        """Wait for a free slot of priority class `value`.
+
+        Args:
+            value (Priority): priority class
+        """
+        stats = self.stats[value]
+        queue = self._queues[value]
+        waiter = (asyncio.get_running_loop().create_future(), time.perf_counter())
+
+        queue.append(waiter)
+        stats.queued = len(queue)
+
+        self._dispatch()
+
+        try:
+            await waiter[0]
+        except asyncio.CancelledError:
+            if waiter[0].done() and not waiter[0].cancelled():
+                # slot was granted, but the waiting task was cancelled anyway
+                self.release(value)
+            elif waiter in queue:
+                queue.remove(waiter)
+                stats.queued = len(queue)
+
+            raise
+
+    def release(self, value: Priority) -> None:
+        """Return a slot of priority class `value` acquired with `acquire()`."""
+        self._active -= 1
+        self.stats[value].active -= 1
+        self.stats[value].completed += 1
+
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        while self._active < self._max_concurrency:
+            for value, queue in self._queues.items():
+                while queue and queue[0][0].done():
+                    queue.popleft()
+                    self.stats[value].queued = len(queue)
+
+                if queue and self.stats[value].active < self._quotas[value]:
+                    break
+            else:
+                return
+
+            future, start = queue.popleft()
+            future.set_result(None)
+
+            stats = self.stats[value]
+            stats.queued = len(queue)
+            stats.add_wait(time.perf_counter() - start)
+
+            self._active += 1
@@ -0,0 +1,292 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+from urllib.parse import parse_qsl, urlencode
+
+from pyefa.client import EfaClient
+from pyefa.exceptions import EfaConnectionError, EfaResponseInvalid
+
+if TYPE_CHECKING:
+    from aiohttp import web
+
+_LOGGER = logging.getLogger(__name__)
+
+# requests served by the proxy and seconds their responses are cached
+DEFAULT_TTLS: dict[str, float] = {
+    "XML_DM_REQUEST": 30,
+    "XML_STOPFINDER_REQUEST": 24 * 3600,
+    "XML_SYSTEMINFO_REQUEST": 3600,
+}
+
+
+@dataclass
+class ProxyStats:
+    requests: int = 0
+    hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+    upstream_errors: int = 0
+    rate_limit_wait: float = 0
+
+    @property
+    def hit_rate(self) -> float:
+        return (self.hits + self.coalesced) / self.requests if self.requests else 0
+
+
+class TokenBucket:
+    """Token bucket rate limiter.
+
+    Args:
+        rate (float): tokens added per second
+        burst (int, optional): max. number of tokens. Defaults to 1.
+    """
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        if rate <= 0:
+            raise ValueError("Rate must be greater than 0")
+
+        self._rate: float = rate
+        self._burst: int = max(1, burst)
+        self._tokens: float = self._burst
+        self._updated: float = time.monotonic()
+        self._lock: asyncio.Lock = asyncio.Lock()
+
+    async def acquire(self) -> float:
+        """Wait for a token.
+
+        Returns:
+            float: seconds waited
+        """
+        waited = 0
+
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self._burst, self._tokens + (now - self._updated) * self._rate
+                )
+                self._updated = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+
+                delay = (1 - self._tokens) / self._rate
+                waited += delay
+
+                await asyncio.sleep(delay)
+
+
+@dataclass
+class CachedResponse:
+    text: str
+    expires: float
+
+
+class ProxyServer:
+    """EFA compatible caching proxy in front of one upstream endpoint.
+
+    Serves the URL surface of the requests in `ttls` with rapidJSON output
+    (e.g. `/XML_DM_REQUEST?outputFormat=rapidJSON&...`). Responses are cached
+    per request and parameter set, concurrent requests for the same uncached
+    response are coalesced into one upstream request and upstream requests are
+    rate limited, so the upstream sees a single well behaved client.
+
+    Example:
+        server = ProxyServer("https://efa.vgn.de/vgnExt_oeffi/")
+        await server.start("127.0.0.1", 8080)
+
+    Args:
+        upstream (EfaClient | str): client or url of the upstream endpoint
+        ttls (dict[str, float] | None, optional): served request names and
+        seconds their responses are cached. Defaults to `DEFAULT_TTLS`.
+        rate (float, optional): max. upstream requests per second. Defaults to 10.
+        burst (int, optional): max. burst of upstream requests. Defaults to 20.
+        max_entries (int, optional): max. number of cached responses. Defaults to 4096.
+    """
+
+    def __init__(
+        self,
+        upstream: EfaClient | str,
+        ttls: dict[str, float] | None = None,
+        rate: float = 10,
+        burst: int = 20,
+        max_entries: int = 4096,
+    ) -> None:
+        self.client: EfaClient = (
+            EfaClient(upstream) if isinstance(upstream, str) else upstream
+        )
+        self._ttls: dict[str, float] = DEFAULT_TTLS if ttls is None else ttls
+        self._limiter: TokenBucket = TokenBucket(rate, burst)
+        self._max_entries: int = max_entries
+        self._cache: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._in_flight: dict[str, asyncio.Task] = {}
+        self._runner: web.AppRunner | None = None
+        self.stats: ProxyStats = ProxyStats()
+
+    @staticmethod
+    def cache_key(name: str, query: str) -> str:
+        """Return normalized query of request `name`, independent of parameter order.
+
+        Args:
+            name (str): request name, e.g. "XML_DM_REQUEST"
+            query (str): url query string
+
+        Returns:
+            str: cache key
+        """
+        return f"{name}?{urlencode(sorted(parse_qsl(query, keep_blank_values=True)))}"
+
+    def create_app(self) -> web.Application:
+        from aiohttp import web
+
+        app = web.Application()
+        app.router.add_get("/stats", self._handle_stats)
+        app.router.add_get("/{name}", self._handle_request)
+        app.on_startup.append(self._on_startup)
+        app.on_cleanup.append(self._on_cleanup)
+
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8080) -> int:
+        """Start serving in the background.
+
+        Args:
+            host (str, optional): interface to bind. Defaults to "127.0.0.1".
+            port (int, optional): port, 0 for a free port. Defaults to 8080.
+
+        Returns:
+            int: bound port
+        """
+        from aiohttp import web
+
+        self._runner = web.AppRunner(self.create_app())
+        await self._runner.setup()
+
+        await web.TCPSite(self._runner, host, port).start()
+
+        port = self._runner.addresses[0][1]
+
+        _LOGGER.info(f"EFA proxy for {self.client.url} listening on {host}:{port}")
+
+        return port
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def fetch(self, name: str, query: str) -> tuple[str, str]:
+        """Return response of request `name` with `query` from cache or upstream.
+
+        Args:
+            name (str): request name, e.g. "XML_DM_REQUEST"
+            query (str): url query string
+
+        Raises:
+            EfaConnectionError: Upstream request failed
+            asyncio.TimeoutError: Upstream request timed out
+
+        Returns:
+            tuple[str, str]: response body and cache status (HIT, MISS or COALESCED)
+        """
+        key = self.cache_key(name, query)
+        self.stats.requests += 1
+
+        cached = self._cache.get(key)
+
+        if cached is not None and cached.expires > time.monotonic():
+            self._cache.move_to_end(key)
+            self.stats.hits += 1
+            return cached.text, "HIT"
+
+        task = self._in_flight.get(key)
+
+        if task is not None:
+            self.stats.coalesced += 1
+            return await asyncio.shield(task), "COALESCED"
+
+        self.stats.misses += 1
+
+        task = asyncio.create_task(self._fetch_upstream(name, query, key))
+        self._in_flight[key] = task
+
+        return await asyncio.shield(task), "MISS"
+
+    async def _fetch_upstream(self, name: str, query: str, key: str) -> str:
+        try:
+            self.stats.rate_limit_wait += await self._limiter.acquire()
+
+            text = await self.client.fetch_raw(name, query)
+        except Exception:
+            self.stats.upstream_errors += 1
+            raise
+        finally:
+            # shielded task may outlive its first caller
+            self._in_flight.pop(key, None)
+
+        self._cache[key] = CachedResponse(text, time.monotonic() + self._ttls[name])
+
+        while len(self._cache) > self._max_entries:
+            self._cache.popitem(last=False)
+
+        return text
+
+    async def _handle_request(self, request: web.Request) -> web.Response:
+        from aiohttp import ClientError, web
+
+        name = request.match_info["name"]
+
+        if name not in self._ttls:
+            raise web.HTTPNotFound(text=f"Request {name} is not served by this proxy")
+
+        # responses are served as JSON, other formats are not proxied
+        if request.query.get("outputFormat", "").lower() != "rapidjson":
+            raise web.HTTPBadRequest(text="Only outputFormat=rapidJSON is served")
+
+        try:
+            text, status = await self.fetch(name, request.query_string)
+        except asyncio.TimeoutError as exc:
+            raise web.HTTPGatewayTimeout(text="Upstream request timed out") from exc
+        except (EfaConnectionError, EfaResponseInvalid, ClientError) as exc:
+            raise web.HTTPBadGateway(text=f"Upstream request failed: {exc}") from exc
+
+        response = web.Response(
+            text=text,
+            content_type="application/json",
+            headers={
+                "X-Cache": status,
+                "Cache-Control": f"max-age={int(self._ttls[name])}",
+            },
+        )
+        response.enable_compression()
+
+        return response
+
+    async def _handle_stats(self, request: web.Request) -> web.Response:
+        from aiohttp import web
+
+        return web.json_response(
+            {
+                "requests": self.stats.requests,
+                "hits": self.stats.hits,
+                "misses": self.stats.misses,
+                "coalesced": self.stats.coalesced,
+                "hit_rate": self.stats.hit_rate,
+                "upstream_errors": self.stats.upstream_errors,
+                "rate_limit_wait": self.stats.rate_limit_wait,
+                "cached": len(self._cache),
+                "upstream_wire_bytes": self.client.transfer_stats.wire_bytes,
+            }
+        )
+
+    async def _on_startup(self, app: web.Application) -> None:
+        await self.client.__aenter__()
+
+    async def _on_cleanup(self, app: web.Application) -> None:
+        await self.client.__aexit__(None, None, None)
@@ -0,0 +1,441 @@
+from __future__ import annotations
+
+import datetime
+import json
+import logging
+import mmap
+import struct
+import time
+from collections import OrderedDict
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Self
+
+from pyefa.data_classes import Stop, StopType, SystemInfo, TransportType
+
+_LOGGER = logging.getLogger(__name__)
+
+MAGIC = b"PYEFASTP"
+SNAPSHOT_VERSION = 1
+
+# magic, format version, length of JSON metadata, offsets of string table,
+# key index and records section
+_HEADER = struct.Struct("<8sHIIII")
+_U32 = struct.Struct("<I")
+_U16 = struct.Struct("<H")
+# key string, record offset, record length
+_KEY = struct.Struct("<III")
+# id, name, disassembled name, type (string table indexes), has coord,
+# transport type bitmask, coord
+_STOP = struct.Struct("<IIIIBHdd")
+
+
+def cache_key(
+    name: str, type: str = "any", filters: int = 0, top_k: int | None = None
+) -> str:
+    """Return key of a stop finder query, independent of case and surrounding spaces.
+
+    Args:
+        name (str): searched name, id or coordinates
+        type (str, optional): search type. Defaults to "any".
+        filters (int, optional): sum of `StopFilter` values. Defaults to 0.
+        top_k (int | None, optional): max. number of results. Defaults to None.
+
+    Returns:
+        str: cache key
+    """
+    key = f"{type}|{filters}|{name.strip().casefold()}"
+
+    return key if top_k is None else f"{key}|{top_k}"
+
+
+def write_snapshot(
+    path: str | Path, info: SystemInfo | None, entries: dict[str, list[Stop]]
+) -> None:
+    """Write stop finder results to a binary snapshot file.
+
+    Strings are stored once in a string table, stops as fixed size records and
+    keys sorted, so a snapshot is searched in place without decoding it.
+
+    Args:
+        path (str | Path): file path
+        info (SystemInfo | None): system info of the endpoint the stops belong to
+        entries (dict[str, list[Stop]]): stop finder results by `cache_key()`
+    """
+    strings: dict[str, int] = {}
+
+    def string(value: str) -> int:
+        index = strings.get(value)
+
+        if index is None:
+            index = strings[value] = len(strings)
+
+        return index
+
+    keys = []
+    records = bytearray()
+
+    for key in sorted(entries):
+        stops = entries[key]
+        record = bytearray(_U16.pack(len(stops)))
+
+        for stop in stops:
+            coord = list(stop.coord or [])[:2]
+            transports = 0
+
+            for transport in stop.transports:
+                transports |= 1 << transport.value
+
+            record += _STOP.pack(
+                string(stop.id),
+                string(stop.name),
+                string(stop.disassembled_name or ""),
+                string(stop.type.value),
+                len(coord) == 2,
+                transports,
+                *(coord if len(coord) == 2 else (0, 0)),
+            )
+
+        keys.append(_KEY.pack(string(key), len(records), len(record)))
+        records += record
+
+    encoded = [x.encode("utf-8") for x in strings]
+    offsets = [0]
+
+    for value in encoded:
+        offsets.append(offsets[-1] + len(value))
+
+    string_table = (
+        _U32.pack(len(encoded))
+        + struct.pack(f"<{len(offsets)}I", *offsets)
+        + b"".join(encoded)
+    )
+    key_index = _U32.pack(len(keys)) + b"".join(keys)
+
+    meta = json.dumps(
+        {
+            "data_format": info.data_format if info else None,
+            "data_build": info.data_build if info else None,
+            "version": info.version if info else None,
+            "valid_from": info.valid_from.isoformat() if info else None,
+            "valid_to": info.valid_to.isoformat() if info else None,
+        }
+    ).encode("utf-8")
+
+    strings_offset = _HEADER.size + len(meta)
+    keys_offset = strings_offset + len(string_table)
+    records_offset = keys_offset + len(key_index)
+
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+
+    with open(tmp_path, "wb") as file:
+        file.write(
+            _HEADER.pack(
+                MAGIC,
+                SNAPSHOT_VERSION,
+                len(meta),
+                strings_offset,
+                keys_offset,
+                records_offset,
+            )
+        )
+        file.write(meta)
+        file.write(string_table)
+        file.write(key_index)
+        file.write(records)
+
+    # replace atomically, readers may still have the old snapshot mapped
+    tmp_path.replace(path)
+
+    _LOGGER.info(f"Snapshot with {len(keys)} stop finder result(s) written to {path}")
+
+
+class StopSnapshot:
+    """Read-only, memory mapped stop finder snapshot written by `write_snapshot()`.
+
+    Only the header is read on open, results are decoded on lookup.
+
+    Args:
+        path (str | Path): file path
+
+    Raises:
+        ValueError: File is no snapshot or written by an incompatible version
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        with open(path, "rb") as file:
+            self._mmap: mmap.mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            self._open()
+        except Exception:
+            self._mmap.close()
+            raise
+
+    def _open(self) -> None:
+        if len(self._mmap) < _HEADER.size:
+            raise ValueError("File is too small to be a stop snapshot")
+
+        magic, version, meta_len, strings_offset, keys_offset, records_offset = (
+            _HEADER.unpack_from(self._mmap)
+        )
+
+        if magic != MAGIC or version != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported stop snapshot (version {version})")
+
+        meta = json.loads(self._mmap[_HEADER.size : _HEADER.size + meta_len])
+
+        self.info: SystemInfo | None = None
+
+        if meta["data_format"] is not None:
+            self.info = SystemInfo(
+                meta["version"],
+                meta["data_format"],
+                datetime.date.fromisoformat(meta["valid_from"]),
+                datetime.date.fromisoformat(meta["valid_to"]),
+                meta["data_build"],
+            )
+
+        (string_count,) = _U32.unpack_from(self._mmap, strings_offset)
+        self._string_offsets: int = strings_offset + _U32.size
+        self._string_data: int = self._string_offsets + (string_count + 1) * _U32.size
+
+        (self._key_count,) = _U32.unpack_from(self._mmap, keys_offset)
+        self._keys: int = keys_offset + _U32.size
+        self._records: int = records_offset
+
+    def __len__(self) -> int:
+        return self._key_count
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._mmap.close()
+
+    def get(self, key: str) -> list[Stop] | None:
+        """Return stops of `key` or None if not in snapshot.
+
+        Args:
+            key (str): key created with `cache_key()`
+
+        Returns:
+            list[Stop] | None: stops
+        """
+        low, high = 0, self._key_count
+
+        # binary search in the sorted key index
+        while low < high:
+            middle = (low + high) // 2
+            key_index, offset, _ = _KEY.unpack_from(
+                self._mmap, self._keys + middle * _KEY.size
+            )
+            middle_key = self._string(key_index)
+
+            if middle_key < key:
+                low = middle + 1
+            elif middle_key > key:
+                high = middle
+            else:
+                return self._read_record(self._records + offset)
+
+        return None
+
+    def keys(self) -> list[str]:
+        return [
+            self._string(_KEY.unpack_from(self._mmap, self._keys + i * _KEY.size)[0])
+            for i in range(self._key_count)
+        ]
+
+    def _string(self, index: int) -> str:
+        start, end = struct.unpack_from(
+            "<2I", self._mmap, self._string_offsets + index * _U32.size
+        )
+
+        return self._mmap[self._string_data + start : self._string_data + end].decode(
+            "utf-8"
+        )
+
+    def _read_record(self, offset: int) -> list[Stop]:
+        (count,) = _U16.unpack_from(self._mmap, offset)
+        offset += _U16.size
+
+        stops = []
+
+        for _ in range(count):
+            id, name, disassembled_name, type, has_coord, transports, x, y = (
+                _STOP.unpack_from(self._mmap, offset)
+            )
+            offset += _STOP.size
+
+            stops.append(
+                Stop(
+                    self._string(id),
+                    self._string(name),
+                    StopType(self._string(type)),
+                    self._string(disassembled_name),
+                    [x, y] if has_coord else [],
+                    [x for x in TransportType if transports & (1 << x.value)],
+                )
+            )
+
+        return stops
+
+
+class StopCache:
+    """LRU cache of stop finder results with warm start from snapshot files.
+
+    Results belong to the timetable data of the endpoint. `validate()` compares
+    them with the current system info and drops all entries, including a loaded
+    snapshot, when the endpoint reports a new data build. Results of endpoints
+    without data build are not trusted and dropped on every validation.
+
+    A validation expires after `revalidate_after` seconds and at the end of the
+    `valid_to` date of the timetable, so long running clients notice new data
+    builds.
+
+    Args:
+        max_entries (int, optional): max. number of results kept in memory.
+        Defaults to 10000.
+        revalidate_after (float | None, optional): seconds until a validation
+        expires, None to keep it until `valid_to`. Defaults to 3600.
+    """
+
+    def __init__(
+        self, max_entries: int = 10000, revalidate_after: float | None = 3600
+    ) -> None:
+        self._max_entries: int = max_entries
+        self._revalidate_after: float | None = revalidate_after
+        self._entries: OrderedDict[str, list[Stop]] = OrderedDict()
+        self._snapshot: StopSnapshot | None = None
+        # wall clock time the last validation expires, None if not validated
+        self._expires: float | None = None
+        self.info: SystemInfo | None = None
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> list[Stop] | None:
+        stops = self._entries.get(key)
+
+        if stops is not None:
+            self._entries.move_to_end(key)
+        elif self._snapshot is not None:
+            stops = self._snapshot.get(key)
+
+            if stops is not None:
+                self._put(key, stops)
+
+        if stops is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+
+        return list(stops)
+
+    def put(self, key: str, stops: list[Stop]) -> None:
+        self._put(key, list(stops))
+
+    @property
+    def validated(self) -> bool:
+        """True if the cache was validated and the validation did not expire."""
+        return self._expires is not None and time.time() < self._expires
+
+    def validate(self, info: SystemInfo) -> bool:
+        """Check cached results against current system info of the endpoint.
+
+        Args:
+            info (SystemInfo): current system info
+
+        Returns:
+            bool: True if cached results are still valid, False if they were dropped
+        """
+        valid = self.info is None or (
+            bool(self.info.data_build)
+            and self.info.data_format == info.data_format
+            and self.info.data_build == info.data_build
+            and self.info.valid_to == info.valid_to
+        )
+
+        if not valid:
+            _LOGGER.info(
+                f"Timetable data changed ({self.info.data_build} -> {info.data_build}), "
+                "dropping cached stops"
+            )
+            self.clear()
+
+        self.info = info
+        self._expires = self._expiry(info)
+
+        return valid
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+        if self._snapshot is not None:
+            self._snapshot.close()
+            self._snapshot = None
+
+    def save(self, path: str | Path) -> None:
+        """Write all cached results (incl. not yet used results of a loaded
+        snapshot) to a snapshot file.
+
+        Args:
+            path (str | Path): file path
+        """
+        entries = {}
+
+        if self._snapshot is not None:
+            entries = {x: self._snapshot.get(x) for x in self._snapshot}
+
+        entries.update(self._entries)
+
+        write_snapshot(path, self.info, entries)
+
+    def load(self, path: str | Path) -> None:
+        """Use snapshot file written by `save()` for warm start, results are read
+        on first use. Results have to be validated with `validate()`.
+
+        Args:
+            path (str | Path): file path
+        """
+        self.clear()
+
+        self._snapshot = StopSnapshot(path)
+        self.info = self._snapshot.info
+        self._expires = None
+
+        _LOGGER.info(
+            f"Snapshot with {len(self._snapshot)} stop finder result(s) loaded"
+        )
+
+    def _expiry(self, info: SystemInfo) -> float:
+        now = time.time()
+        expires = float("inf")
+
+        if self._revalidate_after is not None:
+            expires = now + self._revalidate_after
+
+        # end of the last day of the timetable, ignored if already over
+        end = datetime.datetime.combine(
+            info.valid_to + datetime.timedelta(days=1), datetime.time()
+        ).timestamp()
+
+        return min(expires, end) if end > now else expires
+
+    def _put(self, key: str, stops: list[Stop]) -> None:
+        self._entries[key] = stops
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
@@ -0,0 +1,473 @@
+from __future__ import annotations
+
+import logging
+from array import array
+from bisect import bisect_left
+from datetime import datetime, timedelta
+
+from pyefa.data_classes import Departure, Journey, Stop, StopSequence, StopType
+from pyefa.helpers import TZ_INFO
+
+_LOGGER = logging.getLogger(__name__)
+
+# later than any arrival
+_NEVER = 2**31
+
+
+def stop_key(id: str) -> str:
+    """Return id of the stop a platform id belongs to.
+
+    Global platform ids ("de:09564:704:8:3") are merged into their stop
+    ("de:09564:704"), so changing platforms is a transfer at the same stop.
+
+    Args:
+        id (str): stop or platform id
+
+    Returns:
+        str: stop id
+    """
+    parts = id.split(":")
+
+    return ":".join(parts[:3]) if len(parts) > 3 else id
+
+
+def _timestamp(date: datetime | None) -> int | None:
+    return None if date is None else int(date.timestamp())
+
+
+class TimetableBuilder:
+    """Collect stop sequences and departures for an offline `Timetable`.
+
+    Stop sequences (e.g. trip stop times responses) define trips and the stop
+    pattern of a line. Harvested departures of a stop are expanded to full trips
+    along a known pattern of the same line and destination, trips reported by
+    several stops are added once. Planned times are used.
+    """
+
+    def __init__(self) -> None:
+        self._stops: dict[str, Stop] = {}
+        # (line, stop pattern) -> start time -> (arrivals, departures)
+        self._trips: dict[
+            tuple[str, tuple[str, ...]], dict[int, tuple[list[int], list[int]]]
+        ] = {}
+        # (line, last stop) -> stop pattern, arrival and departure offsets
+        self._patterns: dict[
+            tuple[str, str], tuple[tuple[str, ...], list[int], list[int]]
+        ] = {}
+        self._footpaths: dict[tuple[str, str], int] = {}
+        self.unmatched: int = 0
+
+    def _add_stop(self, stop: Stop) -> str:
+        key = stop_key(stop.id)
+
+        if key not in self._stops:
+            self._stops[key] = Stop(key, stop.name, StopType.STOP)
+
+        return key
+
+    def _add_trip(
+        self,
+        line: str,
+        pattern: tuple[str, ...],
+        arrivals: list[int],
+        departures: list[int],
+    ) -> None:
+        self._trips.setdefault((line, pattern), {})[departures[0]] = (
+            arrivals,
+            departures,
+        )
+
+    def add_stop_sequence(self, sequence: StopSequence) -> None:
+        """Add trip of a stop sequence and use it as pattern of its line.
+
+        Args:
+            sequence (StopSequence): stop sequence with planned times
+        """
+        pattern, arrivals, departures = [], [], []
+
+        for stop_time in sequence.stops:
+            arrival = _timestamp(stop_time.arrival_planned)
+            departure = _timestamp(stop_time.departure_planned)
+
+            if arrival is None and departure is None:
+                continue
+
+            pattern.append(self._add_stop(stop_time.stop))
+            arrivals.append(departure if arrival is None else arrival)
+            departures.append(arrival if departure is None else departure)
+
+        if len(pattern) < 2:
+            return
+
+        pattern = tuple(pattern)
+        line = sequence.line.number
+
+        self._add_trip(line, pattern, arrivals, departures)
+
+        start = departures[0]
+        self._patterns.setdefault(
+            (line, pattern[-1]),
+            (
+                pattern,
+                [x - start for x in arrivals],
+                [x - start for x in departures],
+            ),
+        )
+
+    def add_departures(self, stop: str, departures: list[Departure]) -> int:
+        """Add trips of departures harvested at `stop`.
+
+        Departures are matched to a pattern by line name and destination, call
+        `add_stop_sequence()` for each line and direction first.
+
+        Args:
+            stop (str): stop id the departures were requested for
+            departures (list[Departure]): departures
+
+        Returns:
+            int: number of departures without known pattern
+        """
+        stop = stop_key(stop)
+        unmatched = 0
+
+        for departure in departures:
+            found = self._patterns.get(
+                (departure.line_name, stop_key(departure.destination.id))
+            )
+
+            if found is None or stop not in found[0]:
+                unmatched += 1
+                continue
+
+            pattern, arrival_offsets, departure_offsets = found
+            start = (
+                _timestamp(departure.planned_time)
+                - departure_offsets[pattern.index(stop)]
+            )
+
+            self._add_trip(
+                departure.line_name,
+                pattern,
+                [start + x for x in arrival_offsets],
+                [start + x for x in departure_offsets],
+            )
+
+        self.unmatched += unmatched
+
+        return unmatched
+
+    def add_footpath(self, a: str, b: str, duration: timedelta) -> None:
+        """Add walking connection between stops `a` and `b` (both directions),
+        unknown stops are added.
+
+        Args:
+            a (str): stop id
+            b (str): stop id
+            duration (timedelta): walking time
+        """
+        a, b = stop_key(a), stop_key(b)
+
+        for key in (a, b):
+            # stops only reached by walking
+            self._stops.setdefault(key, Stop(key, key, StopType.STOP))
+
+        seconds = int(duration.total_seconds())
+
+        self._footpaths[(a, b)] = self._footpaths[(b, a)] = seconds
+
+    def build(self) -> Timetable:
+        """Create timetable from collected data.
+
+        Returns:
+            Timetable: timetable
+        """
+        return Timetable(
+            list(self._stops.values()),
+            {k: list(v.values()) for k, v in self._trips.items()},
+            self._footpaths,
+        )
+
+
+class Timetable:
+    """Compact, array backed timetable with earliest arrival search (RAPTOR).
+
+    Trips with the same line and stop pattern form a route. Stop times are
+    stored per route and stop position, sorted by trip, as seconds relative to
+    the first departure in flat `array`s, so boarding is a binary search. Trips
+    of a route never overtake each other, overtaking trips are moved to a
+    separate route.
+
+    Use `TimetableBuilder` to create a timetable.
+
+    Args:
+        stops (list[Stop]): stops
+        trips (dict): arrival and departure timestamps of trips by line and pattern
+        footpaths (dict[tuple[str, str], int]): walking times in seconds
+    """
+
+    def __init__(
+        self,
+        stops: list[Stop],
+        trips: dict[tuple[str, tuple[str, ...]], list[tuple[list[int], list[int]]]],
+        footpaths: dict[tuple[str, str], int] | None = None,
+    ) -> None:
+        self.stops: list[Stop] = stops
+        self._stop_index: dict[str, int] = {x.id: i for i, x in enumerate(stops)}
+        self.epoch: int = min(
+            (x[1][0] for values in trips.values() for x in values), default=0
+        )
+
+        self.route_lines: list[str] = []
+        self._route_stops: array = array("i")
+        self._route_stop_start: array = array("i", [0])
+        self._route_times: array = array("i", [0])
+        self._route_trips: array = array("i")
+        self._arrivals: array = array("i")
+        self._departures: array = array("i")
+
+        for (line, pattern), values in trips.items():
+            for route in self._split_overtaking(values):
+                self._add_route(line, pattern, route)
+
+        # stop -> (route, position) pairs
+        stop_routes: list[list[int]] = [[] for _ in stops]
+
+        for route in range(len(self.route_lines)):
+            for position, stop in enumerate(self._stops_of(route)):
+                stop_routes[stop] += (route, position)
+
+        self._stop_routes: list[array] = [array("i", x) for x in stop_routes]
+
+        self._footpaths: list[list[tuple[int, int]]] = [[] for _ in stops]
+
+        for (a, b), seconds in (footpaths or {}).items():
+            if a in self._stop_index and b in self._stop_index:
+                self._footpaths[self._stop_index[a]].append(
+                    (self._stop_index[b], seconds)
+                )
+
+        _LOGGER.info(
+            f"Timetable with {len(stops)} stop(s), {len(self.route_lines)} route(s) "
+            f"and {self.trip_count} trip(s) built"
+        )
+
+    @staticmethod
+    def _split_overtaking(
+        trips: list[tuple[list[int], list[int]]],
+    ) -> list[list[tuple[list[int], list[int]]]]:
+        routes: list[list[tuple[list[int], list[int]]]] = []
+
+        for trip in sorted(trips, key=lambda x: x[1][0]):
+            for route in routes:
+                last = route[-1]
+
+                if all(x <= y for x, y in zip(last[0], trip[0])) and all(
+                    x <= y for x, y in zip(last[1], trip[1])
+                ):
+                    route.append(trip)
+                    break
+            else:
+                routes.append([trip])
+
+        return routes
+
+    def _add_route(
+        self,
+        line: str,
+        pattern: tuple[str, ...],
+        trips: list[tuple[list[int], list[int]]],
+    ) -> None:
+        self.route_lines.append(line)
+        self._route_stops.extend(self._stop_index[x] for x in pattern)
+        self._route_stop_start.append(len(self._route_stops))
+        self._route_trips.append(len(trips))
+
+        # stop times of one position are consecutive, sorted by trip
+        for position in range(len(pattern)):
+            self._arrivals.extend(x[0][position] - self.epoch for x in trips)
+            self._departures.extend(x[1][position] - self.epoch for x in trips)
+
+        self._route_times.append(len(self._arrivals))
+
+    def _stops_of(self, route: int) -> array:
+        return self._route_stops[
+            self._route_stop_start[route] : self._route_stop_start[route + 1]
+        ]
+
+    @property
+    def trip_count(self) -> int:
+        return sum(self._route_trips)
+
+    def _earliest_trip(self, route: int, position: int, time: int) -> int | None:
+        """Return first trip of `route` departing at `position` not before `time`."""
+        count = self._route_trips[route]
+        low = self._route_times[route] + position * count
+        trip = bisect_left(self._departures, time, low, low + count) - low
+
+        return trip if trip < count else None
+
+    def earliest_arrival(
+        self,
+        origin: str,
+        destination: str,
+        departure: datetime,
+        max_transfers: int = 4,
+        transfer_time: timedelta = timedelta(minutes=2),
+    ) -> Journey | None:
+        """Find journey arriving first at `destination` (RAPTOR).
+
+        Args:
+            origin (str): origin stop id
+            destination (str): destination stop id
+            departure (datetime): earliest departure
+            max_transfers (int, optional): max. number of transfers. Defaults to 4.
+            transfer_time (timedelta, optional): min. time to change at a stop.
+            Defaults to 2 minutes.
+
+        Returns:
+            Journey | None: journey or None if unknown stops or not reachable
+        """
+        source = self._stop_index.get(stop_key(origin))
+        target = self._stop_index.get(stop_key(destination))
+
+        if source is None or target is None:
+            return None
+
+        start = _timestamp(departure) - self.epoch
+        change = int(transfer_time.total_seconds())
+
+        # best arrival per stop, parents per round are (route, trip, boarding
+        # position) or (stop walked from, walking time)
+        best: dict[int, int] = {source: start}
+        parents: list[dict[int, tuple]] = [{}]
+        marked = {source}
+        arrivals, departures = self._arrivals, self._departures
+
+        for stop, seconds in self._footpaths[source]:
+            if start + seconds < best.get(stop, start + seconds + 1):
+                best[stop] = start + seconds
+                parents[0][stop] = (source, seconds)
+                marked.add(stop)
+
+        for round in range(1, max_transfers + 2):
+            # arrivals with at most round - 1 trips
+            previous = dict(best)
+            parent: dict[int, tuple] = {}
+            parents.append(parent)
+
+            # earliest marked position per route
+            queue: dict[int, int] = {}
+
+            for stop in marked:
+                routes = self._stop_routes[stop]
+
+                for i in range(0, len(routes), 2):
+                    route, position = routes[i], routes[i + 1]
+
+                    if queue.get(route, position + 1) > position:
+                        queue[route] = position
+
+            marked = set()
+
+            for route, first in queue.items():
+                stops = self._stops_of(route)
+                count = self._route_trips[route]
+                base = self._route_times[route]
+                trip = None
+                boarding = 0
+
+                for position in range(first, len(stops)):
+                    stop = stops[position]
+
+                    if trip is not None:
+                        arrival = arrivals[base + position * count + trip]
+
+                        if arrival < best.get(stop, _NEVER) and arrival < best.get(
+                            target, _NEVER
+                        ):
+                            best[stop] = arrival
+                            parent[stop] = (route, trip, boarding)
+                            marked.add(stop)
+
+                    ready = previous.get(stop)
+
+                    if ready is None:
+                        continue
+
+                    if round > 1:
+                        ready += change
+
+                    # an earlier trip than the current one is only possible if
+                    # the preceding trip departs in time
+                    if trip is None or (
+                        trip > 0
+                        and ready <= departures[base + position * count + trip - 1]
+                    ):
+                        earlier = self._earliest_trip(route, position, ready)
+
+                        if earlier is not None:
+                            trip = earlier
+                            boarding = position
+
+            for stop in list(marked):
+                for other, seconds in self._footpaths[stop]:
+                    arrival = best[stop] + seconds
+
+                    if arrival < best.get(other, arrival + 1):
+                        best[other] = arrival
+                        parent[other] = (stop, seconds)
+                        marked.add(other)
+
+            if not marked:
+                break
+
+        if target not in best:
+            return None
+
+        return self._journey(source, target, start, best[target], parents)
+
+    def _journey(
+        self,
+        source: int,
+        target: int,
+        start: int,
+        arrival: int,
+        parents: list[dict[int, tuple]],
+    ) -> Journey:
+        departure = start
+        lines = []
+        round = len(parents) - 1
+        stop = target
+
+        while stop != source:
+            round = max(i for i in range(round + 1) if stop in parents[i])
+            entry = parents[round][stop]
+
+            if len(entry) == 2:
+                # footpath, leave as late as possible for the following trip
+                stop, seconds = entry
+                departure = (departure if lines else start + seconds) - seconds
+                continue
+
+            route, trip, boarding = entry
+            stops = self._stops_of(route)
+            lines.append(self.route_lines[route])
+            departure = self._departures[
+                self._route_times[route] + boarding * self._route_trips[route] + trip
+            ]
+            stop = stops[boarding]
+            round -= 1
+
+        lines.reverse()
+
+        return Journey(
+            self.stops[source],
+            self.stops[target],
+            self._datetime(departure),
+            self._datetime(arrival),
+            interchanges=max(len(lines) - 1, 0),
+            lines=lines,
+        )
+
+    def _datetime(self, seconds: int) -> datetime:
+        return datetime.fromtimestamp(self.epoch + seconds, TZ_INFO)
@@ -0,0 +1,360 @@
+from __future__ import annotations
+
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import random
+import zlib
+from abc import abstractmethod
+from dataclasses import dataclass, field
+from functools import cache
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from pyefa.exceptions import EfaConnectionError, EfaParseError, EfaResponseInvalid
+
+if TYPE_CHECKING:
+    import aiohttp
+    import httpx
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class TransportResponse:
+    status: int
+    text: str
+    headers: dict[str, str] = field(default_factory=dict)
+    wire_size: int | None = None
+
+    @property
+    def size(self) -> int:
+        """Size of decoded response body in bytes."""
+        return len(self.text.encode("utf-8"))
+
+    @property
+    def transferred(self) -> int:
+        """Size of response body on the wire in bytes."""
+        return self.size if self.wire_size is None else self.wire_size
+
+
+@cache
+def _brotli():
+    """Return brotli module if installed, imported on first use."""
+    try:
+        import brotli
+    except ImportError:  # pragma: no cover
+        return None
+
+    return brotli
+
+
+def accepted_encodings() -> str:
+    """Return value of `Accept-Encoding` header for supported content codings.
+
+    Returns:
+        str: comma separated content codings
+    """
+    encodings = ["gzip", "deflate"]
+
+    if _brotli() is not None:
+        encodings.append("br")
+
+    return ", ".join(encodings)
+
+
+def decompress(body: bytes, encoding: str | None) -> bytes:
+    """Decompress response `body` according to `Content-Encoding` header.
+
+    Args:
+        body (bytes): response body
+        encoding (str | None): content coding
+
+    Raises:
+        EfaConnectionError: Content coding is not supported
+
+    Returns:
+        bytes: decompressed body
+    """
+    encoding = (encoding or "identity").strip().lower()
+
+    if encoding == "identity":
+        return body
+    if encoding in ("gzip", "x-gzip"):
+        return gzip.decompress(body)
+    if encoding == "deflate":
+        try:
+            return zlib.decompress(body)
+        except zlib.error:
+            return zlib.decompress(body, -zlib.MAX_WBITS)
+    if encoding == "br" and _brotli() is not None:
+        return _brotli().decompress(body)
+
+    raise EfaConnectionError(f"Unsupported content encoding {encoding}")
+
+
+@cache
+def request_errors() -> tuple[type[Exception], ...]:
+    """Return errors of failed client requests, e.g. to catch them in bulk
+    operations going on after single failures.
+
+    Covers connection errors, timeouts, undecodable or invalid responses and
+    the errors of the installed transports, but not other `ValueError`s (e.g.
+    invalid arguments).
+
+    Returns:
+        tuple[type[Exception], ...]: exception types usable in `except`
+    """
+    from aiohttp import ClientError
+
+    errors = [
+        EfaConnectionError,
+        EfaParseError,
+        EfaResponseInvalid,
+        json.JSONDecodeError,
+        UnicodeDecodeError,
+        asyncio.TimeoutError,
+        ClientError,
+    ]
+
+    try:
+        import httpx
+    except ImportError:
+        pass
+    else:
+        errors.append(httpx.HTTPError)
+
+    return tuple(errors)
+
+
+class Transport:
+    """Base class for all transports used by `EfaClient` to talk to an EFA endpoint."""
+
+    async def open(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+    @abstractmethod
+    async def get(
+        self, url: str, headers: dict[str, str] | None = None
+    ) -> TransportResponse:
+        raise NotImplementedError("Abstract method not implemented")
+
+
+class AiohttpTransport(Transport):
+    """Default transport sending real HTTP requests with aiohttp.
+
+    Compressed transfer is negotiated explicitly and responses are decompressed
+    by the transport itself, so the size on the wire is known for every response.
+    """
+
+    def __init__(self) -> None:
+        self._session: aiohttp.ClientSession | None = None
+
+    async def open(self) -> None:
+        if self._session is None:
+            import aiohttp
+
+            self._session = aiohttp.ClientSession(auto_decompress=False)
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def get(
+        self, url: str, headers: dict[str, str] | None = None
+    ) -> TransportResponse:
+        if self._session is None:
+            raise EfaConnectionError("Transport is not opened")
+
+        headers = {"Accept-Encoding": accepted_encodings(), **(headers or {})}
+
+        async with self._session.get(url, headers=headers) as response:
+            body = await response.read()
+            content = decompress(body, response.headers.get("Content-Encoding"))
+
+            return TransportResponse(
+                response.status,
+                content.decode(response.get_encoding()),
+                dict(response.headers),
+                len(body),
+            )
+
+
+class HttpxTransport(Transport):
+    """Transport sending requests with httpx over HTTP/2.
+
+    Concurrent requests to one host are multiplexed over a single connection
+    instead of one connection (and TCP/TLS handshake) per parallel request.
+    Requires the optional `httpx[http2]` dependency (`pip install pyefa[http2]`).
+
+    Args:
+        prior_knowledge (bool, optional): speak HTTP/2 without negotiation, also
+        over plain http (h2c). Defaults to False (HTTP/2 via TLS ALPN, HTTP/1.1
+        fallback).
+        max_connections (int, optional): max. open connections. Defaults to 10.
+    """
+
+    def __init__(self, prior_knowledge: bool = False, max_connections: int = 10):
+        self._prior_knowledge: bool = prior_knowledge
+        self._max_connections: int = max_connections
+        self._client: httpx.AsyncClient | None = None
+
+    async def open(self) -> None:
+        if self._client is None:
+            try:
+                import httpx
+            except ImportError as exc:
+                raise EfaConnectionError(
+                    "HTTP/2 transport requires httpx[http2], install pyefa[http2]"
+                ) from exc
+
+            self._client = httpx.AsyncClient(
+                http1=not self._prior_knowledge,
+                http2=True,
+                limits=httpx.Limits(max_connections=self._max_connections),
+            )
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def get(
+        self, url: str, headers: dict[str, str] | None = None
+    ) -> TransportResponse:
+        if self._client is None:
+            raise EfaConnectionError("Transport is not opened")
+
+        headers = {"Accept-Encoding": accepted_encodings(), **(headers or {})}
+
+        # read raw body and decompress it here, so the size on the wire is known
+        async with self._client.stream("GET", url, headers=headers) as response:
+            body = b"".join([x async for x in response.aiter_raw()])
+            content = decompress(body, response.headers.get("Content-Encoding"))
+
+            return TransportResponse(
+                response.status_code,
+                content.decode(response.charset_encoding or "utf-8"),
+                dict(response.headers),
+                len(body),
+            )
+
+
+def recording_name(url: str) -> str:
+    """Return file name a response for `url` is recorded under.
+
+    Args:
+        url (str): full query url
+
+    Returns:
+        str: file name
+    """
+    return hashlib.sha1(url.encode("utf-8")).hexdigest() + ".json"
+
+
+class RecordingTransport(Transport):
+    """Transport forwarding requests to another transport and recording all responses
+    to `directory` for later use with `ReplayTransport`."""
+
+    def __init__(self, directory: str | Path, transport: Transport | None = None):
+        self._directory: Path = Path(directory)
+        self._transport: Transport = transport or AiohttpTransport()
+
+    async def open(self) -> None:
+        self._directory.mkdir(parents=True, exist_ok=True)
+        await self._transport.open()
+
+    async def close(self) -> None:
+        await self._transport.close()
+
+    async def get(
+        self, url: str, headers: dict[str, str] | None = None
+    ) -> TransportResponse:
+        response = await self._transport.get(url, headers)
+
+        record = {
+            "url": url,
+            "status": response.status,
+            "headers": response.headers,
+            "body": response.text,
+            "wire_size": response.wire_size,
+        }
+
+        path = self._directory / recording_name(url)
+        path.write_text(json.dumps(record, ensure_ascii=False), encoding="utf-8")
+
+        _LOGGER.debug(f"Recorded response for {url} to {path}")
+
+        return response
+
+
+class ReplayTransport(Transport):
+    """Transport serving responses recorded by `RecordingTransport`.
+
+    Args:
+        directory (str | Path): directory with recorded responses
+        latency (float, optional): simulated latency per request in seconds. Defaults to 0.
+        jitter (float, optional): max. random latency added to `latency` in seconds. Defaults to 0.
+        error_rate (float, optional): share of requests failing with `error_status`. Defaults to 0.
+        error_status (int, optional): HTTP status of injected errors. Defaults to 503.
+        seed (int | None, optional): seed for latency jitter and error injection. Defaults to None.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        latency: float = 0,
+        jitter: float = 0,
+        error_rate: float = 0,
+        error_status: int = 503,
+        seed: int | None = None,
+    ):
+        if not 0 <= error_rate <= 1:
+            raise ValueError("Error rate must be between 0 and 1")
+
+        self._directory: Path = Path(directory)
+        self._latency: float = latency
+        self._jitter: float = jitter
+        self._error_rate: float = error_rate
+        self._error_status: int = error_status
+        self._random = random.Random(seed)
+        self._records: dict[str, TransportResponse] = {}
+
+    async def open(self) -> None:
+        self._records = {}
+
+        for path in self._directory.glob("*.json"):
+            record = json.loads(path.read_text(encoding="utf-8"))
+
+            self._records[recording_name(record["url"])] = TransportResponse(
+                record["status"],
+                record["body"],
+                record.get("headers", {}),
+                record.get("wire_size"),
+            )
+
+        _LOGGER.debug(f"{len(self._records)} recorded response(s) loaded")
+
+    async def get(
+        self, url: str, headers: dict[str, str] | None = None
+    ) -> TransportResponse:
+        delay = self._latency + self._random.uniform(0, self._jitter)
+
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        if self._error_rate and self._random.random() < self._error_rate:
+            return TransportResponse(self._error_status, "")
+
+        response = self._records.get(recording_name(url))
+
+        if response is None:
+            return TransportResponse(404, "")
+
+        return response
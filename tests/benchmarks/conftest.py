@@ -0,0 +1,37 @@
+import asyncio
+
+import pytest
+
+from pyefa import EfaClient
+from pyefa.transport import RecordingTransport
+from tests.benchmarks.responses import (
+    BASE_URL,
+    SYSTEM_INFO,
+    StaticTransport,
+    departures_response,
+    stop_finder_response,
+)
+
+
+async def record(directory, responses: dict[str, dict]) -> None:
+    transport = RecordingTransport(directory, StaticTransport(responses))
+
+    async with EfaClient(BASE_URL, transport=transport) as client:
+        await client.info()
+        await client.stops("Plärrer")
+        await client.departures("de:09564:704", limit=40)
+
+
+@pytest.fixture(scope="session")
+def recordings(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("recordings")
+
+    responses = {
+        "XML_SYSTEMINFO_REQUEST": SYSTEM_INFO,
+        "XML_STOPFINDER_REQUEST": stop_finder_response(30),
+        "XML_DM_REQUEST": departures_response(40),
+    }
+
+    asyncio.run(record(directory, responses))
+
+    return directory
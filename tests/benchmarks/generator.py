@@ -0,0 +1,197 @@
+"""Generator of synthetic, schema-valid rapidJSON responses.
+
+Responses are built from a `ResponseShape` (number of items, messages per
+departure, depth of nested parents, ...) and are deterministic for a given
+seed, so benchmarks of different sizes and runs parse comparable data.
+"""
+
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+VERSION = "10.6.14.22"
+START = datetime(2024, 11, 27, 12, 0, tzinfo=timezone.utc)
+
+# line number, product class, description
+LINES = [
+    ("U1", 2, "Fürth Hardhöhe - Plärrer - Langwasser Süd"),
+    ("U2", 2, "Röthenbach - Plärrer - Flughafen"),
+    ("4", 4, "Thon - Plärrer - Gibitzenhof"),
+    ("6", 4, "Westfriedhof - Plärrer - Doku-Zentrum"),
+    ("36", 5, "Plärrer - Hauptbahnhof - Doku-Zentrum"),
+    ("S1", 1, "Bamberg - Nürnberg Hbf - Hartmannshof"),
+    ("RE10", 0, "Nürnberg Hbf - Würzburg Hbf"),
+]
+
+# max. depth allowed by SCHEMA_LOCATION: location -> parent -> parent
+MAX_PARENT_DEPTH = 2
+
+
+@dataclass
+class ResponseShape:
+    """Size and shape of a generated response.
+
+    Args:
+        items (int): number of stop events (departures) or locations (stop finder)
+        infos (int): messages per stop event
+        distinct_infos (int): number of distinct messages referenced by stop events
+        parent_depth (int): depth of nested parents of locations, 0 to 2
+        realtime (float): share of stop events with estimated time
+        cancelled (float): share of cancelled stop events
+        seed (int): seed of the random generator
+    """
+
+    items: int = 40
+    infos: int = 0
+    distinct_infos: int = 10
+    parent_depth: int = MAX_PARENT_DEPTH
+    realtime: float = 0.5
+    cancelled: float = 0.02
+    seed: int = 0
+
+    def __post_init__(self) -> None:
+        if not 0 <= self.parent_depth <= MAX_PARENT_DEPTH:
+            raise ValueError(f"parent_depth must be between 0 and {MAX_PARENT_DEPTH}")
+
+        if self.infos and self.distinct_infos < 1:
+            raise ValueError("distinct_infos must be at least 1")
+
+
+def _time(date: datetime) -> str:
+    return date.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def location(index: int, type: str, parent_depth: int) -> dict:
+    """Return location `index` of `type` with `parent_depth` nested parents."""
+    stop_id = f"de:09564:{index}"
+    result = {
+        "id": stop_id if type == "stop" else f"{stop_id}:1:{index % 4 + 1}",
+        "isGlobalId": True,
+        "name": f"Nürnberg, Haltestelle {index}",
+        "disassembledName": f"Haltestelle {index}",
+        "coord": [5648720.0 + index, 1231660.0 + index],
+        "type": type,
+        "properties": {"stopId": str(3000000 + index)},
+    }
+
+    if parent_depth > 0:
+        parent = {
+            "id": stop_id if type != "stop" else f"placeID:9564000:{index % 50}",
+            "isGlobalId": True,
+            "name": f"Nürnberg Haltestelle {index}",
+            "type": "stop" if type != "stop" else "locality",
+            "properties": {"stopId": str(3000000 + index)},
+        }
+
+        if parent_depth > 1:
+            parent["parent"] = {"name": "Nürnberg", "type": "locality"}
+
+        result["parent"] = parent
+
+    return result
+
+
+def info(index: int) -> dict:
+    return {
+        "id": f"info-{index}",
+        "version": 1 + index % 3,
+        "type": "lineInfo",
+        "priority": "normal" if index % 5 else "high",
+        "infoLinks": [
+            {
+                "title": f"Bauarbeiten {index}",
+                "subtitle": f"Umleitung {index}",
+                "content": f"<p>Wegen Bauarbeiten entfallen Halte ({index}).</p>",
+                "url": f"https://efa.local/info/{index}",
+            }
+        ],
+        "timestamps": {
+            "availability": {
+                "from": _time(START - timedelta(days=1)),
+                "to": _time(START + timedelta(days=7)),
+            }
+        },
+        "affected": {
+            "lines": [{"id": f"vgn:line:{index % len(LINES)}"}],
+            "stops": [{"id": f"de:09564:{index}"}],
+        },
+    }
+
+
+def stop_event(index: int, shape: ResponseShape, rng: random.Random) -> dict:
+    number, product, description = LINES[index % len(LINES)]
+    planned = START + timedelta(seconds=20 * index)
+    origin, destination = description.split(" - ")[0], description.split(" - ")[-1]
+
+    result = {
+        "location": location(index % 8, "platform", shape.parent_depth),
+        "departureTimePlanned": _time(planned),
+        "transportation": {
+            "id": f"vgn:{index % len(LINES)}:j24",
+            "name": f"Linie {number}",
+            "disassembledName": number,
+            "number": number,
+            "description": description,
+            "product": {"id": product, "class": product, "name": "Produkt"},
+            "operator": {"code": "VAG", "id": "VA", "name": "VAG"},
+            "destination": {"id": "3001180", "name": destination, "type": "stop"},
+            "origin": {"id": "3000275", "name": origin, "type": "stop"},
+            "properties": {"tripCode": index},
+        },
+    }
+
+    if rng.random() < shape.realtime:
+        delay = timedelta(minutes=rng.randint(0, 10))
+        result["departureTimeEstimated"] = _time(planned + delay)
+        result["realtimeStatus"] = ["MONITORED"]
+
+    if rng.random() < shape.cancelled:
+        result["isCancelled"] = True
+
+    if shape.infos:
+        result["infos"] = [
+            info(rng.randrange(shape.distinct_infos)) for _ in range(shape.infos)
+        ]
+
+    return result
+
+
+def departures(shape: ResponseShape) -> dict:
+    """Return departure monitor (XML_DM_REQUEST) response."""
+    rng = random.Random(shape.seed)
+
+    return {
+        "version": VERSION,
+        "locations": [location(0, "stop", shape.parent_depth)],
+        "stopEvents": [stop_event(i, shape, rng) for i in range(shape.items)],
+    }
+
+
+def stop_finder(shape: ResponseShape) -> dict:
+    """Return stop finder (XML_STOPFINDER_REQUEST) response."""
+    rng = random.Random(shape.seed)
+    locations = []
+
+    for i in range(shape.items):
+        result = location(i, "stop", shape.parent_depth)
+        result["productClasses"] = sorted({LINES[i % len(LINES)][1], 5})
+        result["matchQuality"] = rng.randrange(1000)
+        locations.append(result)
+
+    return {"version": VERSION, "locations": locations}
+
+
+def system_info(shape: ResponseShape) -> dict:
+    """Return system info (XML_SYSTEMINFO_REQUEST) response, its size does not
+    depend on `shape`."""
+    build = START - timedelta(days=shape.seed % 30)
+
+    return {
+        "version": VERSION,
+        "ptKernel": {
+            "appVersion": "10.4.34.17 build 20.11.2024 08:54:27",
+            "dataFormat": "EFA10_04_00",
+            "dataBuild": _time(build),
+        },
+        "validity": {"from": "2024-11-01", "to": "2025-12-13"},
+    }
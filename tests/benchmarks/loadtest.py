@@ -0,0 +1,135 @@
+"""Load test of an EFA (proxy) url, e.g. of `python -m pyefa serve`.
+
+    python -m tests.benchmarks.loadtest http://127.0.0.1:8080/ \
+        "XML_SYSTEMINFO_REQUEST?outputFormat=rapidJSON" --requests 1000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import math
+import time
+from dataclasses import dataclass, field
+
+import aiohttp
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class LoadResult:
+    requests: int = 0
+    errors: int = 0
+    duration: float = 0
+    latencies: list[float] = field(default_factory=list, repr=False)
+    statuses: dict[int, int] = field(default_factory=dict)
+
+    @property
+    def throughput(self) -> float:
+        """Requests per second."""
+        return self.requests / self.duration if self.duration else 0
+
+    def percentile(self, q: float) -> float:
+        """Return `q`-th percentile of request latencies in seconds.
+
+        Args:
+            q (float): percentile between 0 and 100
+
+        Returns:
+            float: latency in seconds
+        """
+        if not self.latencies:
+            return 0
+
+        samples = sorted(self.latencies)
+        index = min(len(samples) - 1, math.ceil(q / 100 * len(samples)) - 1)
+
+        return samples[max(index, 0)]
+
+    def summary(self) -> str:
+        return (
+            f"{self.requests} requests, {self.errors} errors in {self.duration:.2f}s "
+            f"({self.throughput:.1f} req/s), latency p50 "
+            f"{self.percentile(50) * 1000:.1f}ms, p99 {self.percentile(99) * 1000:.1f}ms"
+        )
+
+
+async def run_load(
+    base_url: str, paths: list[str], requests: int = 1000, concurrency: int = 50
+) -> LoadResult:
+    """Send `requests` GET requests for `paths` (round robin) to `base_url` with
+    `concurrency` parallel consumers, e.g. to load test `python -m pyefa serve`.
+
+    Args:
+        base_url (str): server url, e.g. "http://127.0.0.1:8080/"
+        paths (list[str]): request paths incl. query, e.g.
+        "XML_DM_REQUEST?outputFormat=rapidJSON&name_dm=de:09564:704"
+        requests (int, optional): total number of requests. Defaults to 1000.
+        concurrency (int, optional): parallel consumers. Defaults to 50.
+
+    Returns:
+        LoadResult: latencies, statuses and throughput
+    """
+    if not paths:
+        raise ValueError("No request paths provided")
+
+    base_url = base_url if base_url.endswith("/") else f"{base_url}/"
+    result = LoadResult()
+    counter = iter(range(requests))
+
+    async def consumer(session: aiohttp.ClientSession) -> None:
+        for i in counter:
+            start = time.perf_counter()
+
+            try:
+                async with session.get(base_url + paths[i % len(paths)]) as response:
+                    await response.read()
+                    status = response.status
+            except aiohttp.ClientError as exc:
+                _LOGGER.debug(f"Request failed: {exc!r}")
+                status = 0
+
+            result.latencies.append(time.perf_counter() - start)
+            result.statuses[status] = result.statuses.get(status, 0) + 1
+            result.requests += 1
+
+            if status != 200:
+                result.errors += 1
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+
+    async with aiohttp.ClientSession(connector=connector) as session:
+        start = time.perf_counter()
+        await asyncio.gather(*[consumer(session) for _ in range(concurrency)])
+        result.duration = time.perf_counter() - start
+
+    return result
+
+
+def create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m tests.benchmarks.loadtest",
+        description="send load to an EFA (proxy) url",
+    )
+    parser.add_argument("url", help="base url, e.g. http://127.0.0.1:8080/")
+    parser.add_argument("paths", nargs="+", help="request paths incl. query string")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=50)
+
+    return parser
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = create_parser().parse_args(argv)
+
+    result = asyncio.run(
+        run_load(args.url, args.paths, args.requests, args.concurrency)
+    )
+
+    print(result.summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import copy
+import json
+
+from pyefa.transport import Transport, TransportResponse
+
+BASE_URL = "http://efa.local/efa/"
+
+SYSTEM_INFO = {
+    "version": "10.6.14.22",
+    "ptKernel": {
+        "appVersion": "10.4.34.17 build 20.11.2024 08:54:27",
+        "dataFormat": "EFA10_04_00",
+        "dataBuild": "2024-11-26T16:52:03Z",
+    },
+    "validity": {"from": "2024-11-01", "to": "2025-12-13"},
+}
+
+LOCATION = {
+    "id": "de:09564:704",
+    "isGlobalId": True,
+    "name": "Nürnberg, Plärrer",
+    "disassembledName": "Plärrer",
+    "coord": [5648720.0, 1231660.0],
+    "type": "stop",
+    "productClasses": [2, 4, 5],
+    "parent": {
+        "id": "placeID:9564000:1",
+        "name": "Nürnberg",
+        "type": "locality",
+    },
+    "properties": {"stopId": "3000704"},
+    "matchQuality": 950,
+}
+
+STOP_EVENT = {
+    "location": {
+        "id": "de:09564:704:8:3",
+        "isGlobalId": True,
+        "name": "Nürnberg Plärrer",
+        "disassembledName": "U Gleis 3",
+        "type": "platform",
+        "coord": [5648722.0, 1231669.0],
+        "properties": {
+            "stopId": "3000704",
+            "area": "8",
+            "platform": "3",
+            "platformName": "U Gleis 3",
+        },
+        "parent": {
+            "id": "de:09564:704",
+            "isGlobalId": True,
+            "name": "Nürnberg Plärrer",
+            "disassembledName": "Plärrer",
+            "type": "stop",
+            "parent": {"name": "Nürnberg", "type": "locality"},
+            "properties": {"stopId": "3000704"},
+        },
+    },
+    "departureTimePlanned": "2024-11-27T21:16:00Z",
+    "departureTimeEstimated": "2024-11-27T21:20:00Z",
+    "transportation": {
+        "id": "vgn:11003: :R:j24",
+        "name": "U-Bahn U3",
+        "disassembledName": "U3",
+        "number": "U3",
+        "description": "Nordwestring - Hauptbahnhof - Plärrer - Großreuth bei Schweinau",
+        "product": {"id": 6, "class": 2, "name": "U-Bahn", "iconId": 1},
+        "operator": {"code": "VAG", "id": "VA", "name": "VAG"},
+        "destination": {
+            "id": "3001180",
+            "name": "Nürnberg Großreuth b. Schweinau",
+            "type": "stop",
+        },
+        "properties": {
+            "trainNumber": "4038429",
+            "tripCode": 939,
+            "globalId": "de:vgn:402_U3:0",
+        },
+        "origin": {
+            "id": "3000275",
+            "name": "Nürnberg Nordwestring",
+            "type": "stop",
+        },
+    },
+}
+
+
+def stop_finder_response(count: int) -> dict:
+    locations = []
+
+    for i in range(count):
+        location = copy.deepcopy(LOCATION)
+        location["id"] = f"de:09564:{i}"
+        location["matchQuality"] = (i * 7919) % 1000
+        locations.append(location)
+
+    return {"version": "10.6.14.22", "locations": locations}
+
+
+def departures_response(count: int) -> dict:
+    stop_events = []
+
+    for i in range(count):
+        stop_event = copy.deepcopy(STOP_EVENT)
+        minute = i % 60
+        hour = 12 + (i // 60) % 12
+        stop_event["departureTimePlanned"] = f"2024-11-27T{hour:02}:{minute:02}:00Z"
+        stop_event.pop("departureTimeEstimated")
+        stop_events.append(stop_event)
+
+    return {
+        "version": "10.6.14.22",
+        "locations": [copy.deepcopy(LOCATION)],
+        "stopEvents": stop_events,
+    }
+
+
+class StaticTransport(Transport):
+    """Transport answering requests with fixed responses per EFA request name."""
+
+    def __init__(self, responses: dict[str, dict]):
+        self._responses = {k: json.dumps(v) for k, v in responses.items()}
+
+    async def get(
+        self, url: str, headers: dict[str, str] | None = None
+    ) -> TransportResponse:
+        name = url.split("/")[-1].split("?")[0]
+
+        return TransportResponse(200, self._responses[name])
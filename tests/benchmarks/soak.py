@@ -0,0 +1,333 @@
+"""Soak test of a long running `EfaClient`.
+
+Drives many `departures()` and `stops()` calls through one client and samples
+resident memory, traced Python memory and open file descriptors, e.g. to find
+memory creep of clients used by daemons for weeks. Growth is measured from the
+end of a warm-up phase, so caches and pools filling up initially do not count.
+
+    python -m tests.benchmarks.soak http://127.0.0.1:8080/ --calls 1000000 \
+        --max-rss-growth 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import logging
+import os
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+
+from pyefa.client import EfaClient
+
+_LOGGER = logging.getLogger(__name__)
+
+_MIB = 1024 * 1024
+
+
+def rss() -> int:
+    """Return resident set size of the current process in bytes.
+
+    Without `/proc` (e.g. macOS) the peak resident set size is returned, 0 if
+    neither is available.
+    """
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+
+    try:
+        import resource
+    except ImportError:
+        return 0
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # bytes on macOS, KiB elsewhere
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def open_fds() -> int:
+    """Return number of open file descriptors, 0 if unknown."""
+    for path in ("/proc/self/fd", "/dev/fd"):
+        try:
+            return len(os.listdir(path))
+        except OSError:
+            continue
+
+    return 0
+
+
+@dataclass
+class ResourceSample:
+    elapsed: float
+    calls: int
+    rss: int
+    traced: int
+    fds: int
+
+
+@dataclass
+class SoakResult:
+    calls: int = 0
+    errors: int = 0
+    duration: float = 0
+    samples: list[ResourceSample] = field(default_factory=list)
+    warmup: int = 0
+    top_allocators: list[str] = field(default_factory=list)
+
+    @property
+    def throughput(self) -> float:
+        """Calls per second."""
+        return self.calls / self.duration if self.duration else 0
+
+    @property
+    def baseline(self) -> ResourceSample | None:
+        """First sample after the warm-up phase."""
+        for sample in self.samples:
+            if sample.calls >= self.warmup:
+                return sample
+
+        return self.samples[-1] if self.samples else None
+
+    def growth(self, name: str) -> int:
+        """Return growth of sample value `name` ("rss", "traced" or "fds") since
+        the end of the warm-up phase.
+        """
+        baseline = self.baseline
+
+        if baseline is None:
+            return 0
+
+        return getattr(self.samples[-1], name) - getattr(baseline, name)
+
+    def violations(
+        self,
+        max_rss_growth: int | None = None,
+        max_traced_growth: int | None = None,
+        max_fd_growth: int | None = 0,
+    ) -> list[str]:
+        """Return descriptions of all growths above their limit.
+
+        Args:
+            max_rss_growth (int | None, optional): max. growth of resident memory
+            in bytes. Defaults to None (not checked).
+            max_traced_growth (int | None, optional): max. growth of traced Python
+            memory in bytes. Defaults to None (not checked).
+            max_fd_growth (int | None, optional): max. number of additionally open
+            file descriptors. Defaults to 0.
+
+        Returns:
+            list[str]: violations, empty if all growths are within their limit
+        """
+        result = []
+
+        for name, limit in (
+            ("rss", max_rss_growth),
+            ("traced", max_traced_growth),
+            ("fds", max_fd_growth),
+        ):
+            if limit is not None and self.growth(name) > limit:
+                result.append(f"{name} grew by {self.growth(name)} (limit {limit})")
+
+        return result
+
+    def summary(self) -> str:
+        return (
+            f"{self.calls} calls, {self.errors} errors in {self.duration:.2f}s "
+            f"({self.throughput:.1f} calls/s), growth after warm-up: rss "
+            f"{self.growth('rss') / _MIB:.2f} MiB, traced "
+            f"{self.growth('traced') / _MIB:.2f} MiB, fds {self.growth('fds')}"
+        )
+
+
+async def run_soak(
+    client: EfaClient,
+    calls: int = 100000,
+    concurrency: int = 10,
+    stop_ids: list[str] | None = None,
+    names: list[str] | None = None,
+    sample_every: int = 1000,
+    warmup: int = 1000,
+    trace: bool = True,
+    top: int = 10,
+) -> SoakResult:
+    """Send `calls` requests alternating between `client.departures()` and
+    `client.stops()` with `concurrency` parallel consumers and sample resource
+    usage every `sample_every` calls.
+
+    Failed calls are counted and do not stop the soak test.
+
+    Args:
+        client (EfaClient): opened client, e.g. of a local stub server
+        calls (int, optional): total number of calls. Defaults to 100000.
+        concurrency (int, optional): parallel consumers. Defaults to 10.
+        stop_ids (list[str] | None, optional): stop ids of departure calls (round
+        robin). Defaults to ["de:09564:704"].
+        names (list[str] | None, optional): names of stop finder calls (round
+        robin). Defaults to ["Plärrer"].
+        sample_every (int, optional): calls between samples. Defaults to 1000.
+        warmup (int, optional): calls before the baseline sample. Defaults to 1000.
+        trace (bool, optional): trace Python allocations with `tracemalloc` and
+        report the top allocators since the baseline. Slows calls down.
+        Defaults to True.
+        top (int, optional): number of reported allocators. Defaults to 10.
+
+    Returns:
+        SoakResult: samples, growth and top allocators
+    """
+    if sample_every < 1:
+        raise ValueError("sample_every must be at least 1")
+
+    stop_ids = stop_ids or ["de:09564:704"]
+    names = names or ["Plärrer"]
+
+    result = SoakResult(warmup=warmup)
+    counter = iter(range(calls))
+    started_tracing = trace and not tracemalloc.is_tracing()
+    baseline_snapshot: tracemalloc.Snapshot | None = None
+
+    if started_tracing:
+        tracemalloc.start()
+
+    start = time.perf_counter()
+
+    def sample() -> None:
+        nonlocal baseline_snapshot
+
+        # only memory still referenced counts
+        gc.collect()
+
+        result.samples.append(
+            ResourceSample(
+                time.perf_counter() - start,
+                result.calls,
+                rss(),
+                tracemalloc.get_traced_memory()[0] if trace else 0,
+                open_fds(),
+            )
+        )
+
+        if trace and baseline_snapshot is None and result.calls >= warmup:
+            baseline_snapshot = tracemalloc.take_snapshot()
+
+        _LOGGER.debug(f"Soak sample {result.samples[-1]}")
+
+    async def consumer() -> None:
+        for i in counter:
+            try:
+                if i % 2:
+                    await client.stops(names[i // 2 % len(names)])
+                else:
+                    await client.departures(stop_ids[i // 2 % len(stop_ids)])
+            except Exception as exc:  # noqa: BLE001
+                # every failed call is counted, the soak test goes on
+                _LOGGER.debug(f"Call failed: {exc!r}")
+                result.errors += 1
+
+            result.calls += 1
+
+            if result.calls % sample_every == 0:
+                sample()
+
+    try:
+        sample()
+        await asyncio.gather(*[consumer() for _ in range(concurrency)])
+        result.duration = time.perf_counter() - start
+
+        if result.calls % sample_every:
+            sample()
+
+        if baseline_snapshot is not None:
+            result.top_allocators = _top_allocators(baseline_snapshot, top)
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+
+    return result
+
+
+def _top_allocators(baseline: tracemalloc.Snapshot, top: int) -> list[str]:
+    excluded = [
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+    ]
+
+    snapshot = tracemalloc.take_snapshot().filter_traces(excluded)
+    stats = snapshot.compare_to(baseline.filter_traces(excluded), "lineno")
+
+    return [str(x) for x in stats[:top] if x.size_diff > 0]
+
+
+def create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m tests.benchmarks.soak",
+        description="soak test a client and check memory and fd growth",
+    )
+    parser.add_argument("-v", "--verbose", action="store_true", help="debug logging")
+    parser.add_argument("url", help="url of an EFA endpoint, e.g. a local stub server")
+    parser.add_argument("--calls", type=int, default=100000)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument(
+        "--stop", action="append", dest="stops", help="stop id (repeatable)"
+    )
+    parser.add_argument(
+        "--name", action="append", dest="names", help="stop name (repeatable)"
+    )
+    parser.add_argument("--sample-every", type=int, default=10000)
+    parser.add_argument("--warmup", type=int, default=10000)
+    parser.add_argument("--no-trace", action="store_true", help="disable tracemalloc")
+    parser.add_argument("--max-rss-growth", type=float, help="MiB, default unchecked")
+    parser.add_argument(
+        "--max-traced-growth", type=float, help="MiB, default unchecked"
+    )
+    parser.add_argument("--max-fd-growth", type=int, default=0)
+
+    return parser
+
+
+async def soak(args: argparse.Namespace) -> SoakResult:
+    async with EfaClient(args.url) as client:
+        return await run_soak(
+            client,
+            args.calls,
+            args.concurrency,
+            args.stops,
+            args.names,
+            args.sample_every,
+            args.warmup,
+            not args.no_trace,
+        )
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = create_parser().parse_args(argv)
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING)
+
+    result = asyncio.run(soak(args))
+
+    print(result.summary())
+
+    for allocator in result.top_allocators:
+        print(allocator)
+
+    violations = result.violations(
+        None if args.max_rss_growth is None else int(args.max_rss_growth * _MIB),
+        None if args.max_traced_growth is None else int(args.max_traced_growth * _MIB),
+        args.max_fd_growth,
+    )
+
+    for violation in violations:
+        print(f"FAILED: {violation}", file=sys.stderr)
+
+    if violations:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
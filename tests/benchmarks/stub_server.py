@@ -0,0 +1,172 @@
+"""Local EFA stub server speaking HTTP/1.1 and HTTP/2 (h2c with prior knowledge).
+
+Every request is answered with the same body (or the body of its request name,
+e.g. "XML_DM_REQUEST") after a fixed latency, accepted
+connections are counted to compare connection reuse of transports. HTTP/2
+support requires the `h2` package.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Self
+
+PREFACE_LINE = b"PRI * HTTP/2.0\r\n"
+
+
+class StubServer:
+    def __init__(self, body: bytes | dict[str, bytes], latency: float = 0.01) -> None:
+        self.body = body
+        self.latency = latency
+        self.connections = 0
+        self.requests = 0
+        self._server: asyncio.Server | None = None
+        self._handlers: dict[asyncio.Task, asyncio.StreamWriter] = {}
+
+    @property
+    def url(self) -> str:
+        port = self._server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}/efa/"
+
+    def _body(self, path: str) -> bytes:
+        if isinstance(self.body, bytes):
+            return self.body
+
+        return self.body[path.split("?")[0].rsplit("/", 1)[-1]]
+
+    async def __aenter__(self) -> Self:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        self._server.close()
+
+        # close kept alive connections, their handlers end with an incomplete read
+        for writer in self._handlers.values():
+            writer.close()
+
+        await asyncio.gather(*self._handlers, return_exceptions=True)
+        await self._server.wait_closed()
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self.connections += 1
+        self._handlers[asyncio.current_task()] = writer
+
+        try:
+            first_line = await reader.readuntil(b"\r\n")
+
+            if first_line == PREFACE_LINE:
+                await self._handle_h2(first_line, reader, writer)
+            else:
+                await self._handle_http1(first_line, reader, writer)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+            self._handlers.pop(asyncio.current_task(), None)
+
+    async def _handle_http1(
+        self,
+        first_line: bytes,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ) -> None:
+        head = first_line + await reader.readuntil(b"\r\n\r\n")
+
+        while head:
+            self.requests += 1
+
+            await asyncio.sleep(self.latency)
+
+            body = self._body(head.split(b" ")[1].decode())
+
+            writer.write(
+                b"HTTP/1.1 200 OK\r\n"
+                b"Content-Type: application/json; charset=utf-8\r\n"
+                b"Content-Length: %d\r\n\r\n" % len(body) + body
+            )
+            await writer.drain()
+
+            head = await reader.readuntil(b"\r\n\r\n")
+
+    async def _handle_h2(
+        self,
+        first_line: bytes,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ) -> None:
+        import h2.config
+        import h2.connection
+        import h2.events
+
+        conn = h2.connection.H2Connection(
+            h2.config.H2Configuration(client_side=False, header_encoding="utf-8")
+        )
+        conn.initiate_connection()
+
+        window_updated = asyncio.Event()
+        tasks = set()
+
+        async def respond(stream_id: int, path: str) -> None:
+            self.requests += 1
+
+            await asyncio.sleep(self.latency)
+
+            body = self._body(path)
+
+            conn.send_headers(
+                stream_id,
+                [
+                    (":status", "200"),
+                    ("content-type", "application/json; charset=utf-8"),
+                    ("content-length", str(len(body))),
+                ],
+            )
+
+            while body:
+                window = min(
+                    conn.local_flow_control_window(stream_id),
+                    conn.max_outbound_frame_size,
+                )
+
+                if window < 1:
+                    event = window_updated
+                    writer.write(conn.data_to_send())
+                    await event.wait()
+                    continue
+
+                conn.send_data(stream_id, body[:window])
+                body = body[window:]
+
+                writer.write(conn.data_to_send())
+                await writer.drain()
+
+            conn.end_stream(stream_id)
+            writer.write(conn.data_to_send())
+            await writer.drain()
+
+        data = first_line
+
+        while data:
+            for event in conn.receive_data(data):
+                if isinstance(event, h2.events.RequestReceived):
+                    path = dict(event.headers)[":path"]
+                    task = asyncio.create_task(respond(event.stream_id, path))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                elif isinstance(event, h2.events.WindowUpdated):
+                    window_updated.set()
+                    window_updated = asyncio.Event()
+                elif isinstance(event, h2.events.ConnectionTerminated):
+                    data = b""
+
+            writer.write(conn.data_to_send())
+            await writer.drain()
+
+            if data:
+                data = await reader.read(65535)
+
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,57 @@
+import asyncio
+
+import pytest
+
+from pyefa import EfaClient
+from pyefa.transport import ReplayTransport
+from tests.benchmarks.responses import BASE_URL
+
+CONCURRENCY = 50
+
+
+@pytest.fixture
+def replay(recordings):
+    loop = asyncio.new_event_loop()
+    client = EfaClient(BASE_URL, transport=ReplayTransport(recordings))
+
+    loop.run_until_complete(client.__aenter__())
+
+    yield loop, client
+
+    loop.run_until_complete(client.__aexit__(None, None, None))
+    loop.close()
+
+
+QUERIES = {
+    "info": lambda client: client.info(),
+    "stops": lambda client: client.stops("Plärrer"),
+    "departures": lambda client: client.departures("de:09564:704", limit=40),
+}
+
+
+@pytest.mark.parametrize("query", QUERIES.keys())
+def test_latency(benchmark, replay, query):
+    loop, client = replay
+
+    benchmark.group = "client-latency"
+
+    result = benchmark(lambda: loop.run_until_complete(QUERIES[query](client)))
+
+    assert result
+
+
+@pytest.mark.parametrize("query", QUERIES.keys())
+def test_throughput(benchmark, replay, query):
+    loop, client = replay
+
+    async def run():
+        return await asyncio.gather(
+            *[QUERIES[query](client) for _ in range(CONCURRENCY)]
+        )
+
+    benchmark.group = "client-throughput"
+    benchmark.extra_info["concurrency"] = CONCURRENCY
+
+    results = benchmark(lambda: loop.run_until_complete(run()))
+
+    assert len(results) == CONCURRENCY
@@ -0,0 +1,28 @@
+import pytest
+
+from pyefa.data_classes import TransportType
+from pyefa.requests.req_departures import DeparturesRequest
+from tests.benchmarks.responses import departures_response
+
+PRODUCTS = [2, 4, 5, 5]
+
+
+@pytest.mark.parametrize(
+    "transports", [None, [TransportType.SUBWAY]], ids=["unfiltered", "subway"]
+)
+@pytest.mark.parametrize("count", [40, 200])
+def test_parse_departures_filtered(benchmark, count, transports):
+    """Parse departures with and without transport filter pushed into parsing."""
+    data = departures_response(count)
+
+    for i, stop_event in enumerate(data["stopEvents"]):
+        stop_event["transportation"]["product"]["class"] = PRODUCTS[i % len(PRODUCTS)]
+
+    request = DeparturesRequest("de:09564:704", transports=transports)
+
+    benchmark.group = f"departures-filter-{count}"
+    benchmark.extra_info["departures"] = count
+
+    departures = benchmark(request.parse, data)
+
+    assert len(departures) == (count if transports is None else count // 4)
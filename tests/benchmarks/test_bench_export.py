@@ -0,0 +1,55 @@
+import dataclasses
+import json
+
+import pytest
+
+from pyefa.export import NdjsonSink
+from pyefa.requests.req_departures import DeparturesRequest
+from tests.benchmarks.responses import departures_response
+
+BOARDS = 50
+DEPARTURES = 40
+
+
+@pytest.fixture(scope="module")
+def boards():
+    departures = DeparturesRequest("de:09564:704").parse(
+        departures_response(DEPARTURES)
+    )
+
+    return [
+        (f"de:09564:{x}", departures[0].planned_time, departures) for x in range(BOARDS)
+    ]
+
+
+def encode_asdict(boards) -> bytes:
+    # previous approach: one asdict() and dumps() per departure
+    lines = [
+        json.dumps({"stop": stop_id, **dataclasses.asdict(x)}, default=str)
+        for stop_id, _, departures in boards
+        for x in departures
+    ]
+
+    return "\n".join(lines).encode("utf-8")
+
+
+def test_export_asdict(benchmark, boards):
+    benchmark.group = "export-ndjson"
+    benchmark.extra_info["departures"] = BOARDS * DEPARTURES
+
+    benchmark(encode_asdict, boards)
+
+
+def test_export_ndjson_batch(benchmark, boards, tmp_path):
+    benchmark.group = "export-ndjson"
+    benchmark.extra_info["departures"] = BOARDS * DEPARTURES
+
+    sink = NdjsonSink(tmp_path)
+    sink._open_file(tmp_path / "departures.ndjson")
+
+    try:
+        written = benchmark(sink._write, boards)
+    finally:
+        sink._close_file()
+
+    assert written > 0
@@ -0,0 +1,84 @@
+import asyncio
+import importlib.util
+import json
+import time
+
+import pytest
+
+from pyefa import EfaClient
+from pyefa.scheduler import RequestScheduler
+from pyefa.transport import AiohttpTransport, HttpxTransport
+from tests.benchmarks.responses import departures_response
+from tests.benchmarks.stub_server import StubServer
+
+CONCURRENCY = 50
+REQUESTS = 200
+
+HTTP2_INSTALLED = all(importlib.util.find_spec(x) for x in ("httpx", "h2"))
+
+TRANSPORTS = {
+    "aiohttp": AiohttpTransport,
+    "http2": lambda: HttpxTransport(prior_knowledge=True),
+}
+
+
+async def run_departures(transport_name: str) -> dict:
+    body = json.dumps(departures_response(40)).encode("utf-8")
+
+    async with StubServer(body) as server:
+        client = EfaClient(
+            server.url,
+            transport=TRANSPORTS[transport_name](),
+            conditional_requests=False,
+            scheduler=RequestScheduler(CONCURRENCY),
+        )
+
+        start = time.perf_counter()
+
+        async with client:
+            results = await asyncio.gather(
+                *[client.departures("de:09564:704") for _ in range(REQUESTS)]
+            )
+
+        duration = time.perf_counter() - start
+
+    assert all(len(x) == 40 for x in results)
+
+    return {
+        "connections": server.connections,
+        "requests": server.requests,
+        "requests_per_second": round(REQUESTS / duration, 1),
+    }
+
+
+@pytest.mark.parametrize(
+    "transport_name",
+    [
+        "aiohttp",
+        pytest.param(
+            "http2",
+            marks=pytest.mark.skipif(
+                not HTTP2_INSTALLED, reason="httpx[http2] not installed"
+            ),
+        ),
+    ],
+)
+def test_concurrent_departures(benchmark, transport_name):
+    benchmark.group = "transport-concurrency"
+    benchmark.extra_info["concurrency"] = CONCURRENCY
+
+    stats = benchmark.pedantic(
+        lambda: asyncio.run(run_departures(transport_name)), rounds=3
+    )
+
+    benchmark.extra_info.update(stats)
+
+
+@pytest.mark.skipif(not HTTP2_INSTALLED, reason="httpx[http2] not installed")
+def test_http2_multiplexes_over_one_connection():
+    http1 = asyncio.run(run_departures("aiohttp"))
+    http2 = asyncio.run(run_departures("http2"))
+
+    assert http2["requests"] == http1["requests"] == REQUESTS
+    assert http2["connections"] == 1
+    assert http1["connections"] > http2["connections"]
@@ -0,0 +1,55 @@
+import asyncio
+import gc
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from pyefa import EfaClient
+from pyefa.metrics import LoopLagMonitor
+from tests.benchmarks.responses import BASE_URL, StaticTransport, departures_response
+
+STOP_EVENTS = 1500
+
+
+@pytest.fixture(scope="module")
+def transport():
+    return StaticTransport({"XML_DM_REQUEST": departures_response(STOP_EVENTS)})
+
+
+async def measure_lag(client: EfaClient) -> LoopLagMonitor:
+    # a full collection pauses the loop in either mode, do it before measuring
+    gc.collect()
+
+    async with client, LoopLagMonitor(interval=0.001) as monitor:
+        await client.departures("de:09564:704", limit=STOP_EVENTS)
+
+    return monitor
+
+
+@pytest.mark.parametrize("offload", [False, True])
+def test_event_loop_lag(benchmark, transport, offload):
+    executor = ThreadPoolExecutor(max_workers=1) if offload else None
+
+    def run():
+        client = EfaClient(BASE_URL, transport=transport, executor=executor)
+        return asyncio.run(measure_lag(client))
+
+    benchmark.group = "event-loop-lag"
+
+    monitor = benchmark.pedantic(run, rounds=3)
+
+    benchmark.extra_info["max_lag_ms"] = round(monitor.max * 1000, 2)
+    benchmark.extra_info["p99_lag_ms"] = round(monitor.percentile(99) * 1000, 2)
+
+    if executor is not None:
+        executor.shutdown()
+
+
+def test_offload_reduces_event_loop_lag(transport):
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        inline = asyncio.run(measure_lag(EfaClient(BASE_URL, transport=transport)))
+        offloaded = asyncio.run(
+            measure_lag(EfaClient(BASE_URL, transport=transport, executor=executor))
+        )
+
+    assert offloaded.max < inline.max / 2
@@ -0,0 +1,153 @@
+"""Parse time and peak memory of response parsers across response sizes.
+
+Timings are compared with pytest-benchmark baselines:
+
+    pytest tests/benchmarks/test_bench_parse_scaling.py --benchmark-save=parse
+    pytest tests/benchmarks/test_bench_parse_scaling.py --benchmark-compare \
+        --benchmark-compare-fail=mean:15%
+
+Peak memory is deterministic and checked against `baselines/parse_memory.json`,
+run with `PYEFA_UPDATE_BASELINES=1` to update the baselines.
+"""
+
+import json
+import os
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+from pyefa.requests import DeparturesRequest, StopFinderRequest, SystemInfoRequest
+from tests.benchmarks import generator
+from tests.benchmarks.generator import ResponseShape
+
+SIZES = [10, 100, 1000, 10000, 100000]
+MEMORY_SIZES = [10, 100, 1000, 10000]
+
+MEMORY_BASELINES = Path(__file__).parent / "baselines" / "parse_memory.json"
+MEMORY_TOLERANCE = 0.2
+# allocations independent of the size, e.g. of the logging or regex caches
+MEMORY_SLACK = 16 * 1024
+
+
+def parse_departures(data: dict) -> list:
+    return DeparturesRequest("de:09564:704").parse(data)
+
+
+def parse_stop_finder(data: dict) -> list:
+    return StopFinderRequest("any", "Plärrer").parse(data)
+
+
+def parse_system_infos(data: list[dict]) -> list:
+    # size of a system info response is fixed, `size` responses are parsed
+    return [SystemInfoRequest().parse(x) for x in data]
+
+
+PARSERS = {
+    "departures": (parse_departures, generator.departures),
+    "stop-finder": (parse_stop_finder, generator.stop_finder),
+    "system-info": (
+        parse_system_infos,
+        lambda shape: [
+            generator.system_info(ResponseShape(seed=x)) for x in range(shape.items)
+        ],
+    ),
+}
+
+
+def create_response(parser: str, size: int):
+    return PARSERS[parser][1](ResponseShape(items=size, infos=1, distinct_infos=50))
+
+
+def first_item(data):
+    if isinstance(data, list):
+        return data[:1]
+
+    return {
+        **data,
+        **{x: data[x][:1] for x in ("locations", "stopEvents") if x in data},
+    }
+
+
+def peak_memory(parse, data) -> int:
+    """Return peak of memory allocated while parsing `data` in bytes."""
+    # schema compilation and other one-time allocations are not measured
+    parse(first_item(data))
+
+    tracemalloc.start()
+
+    try:
+        start = tracemalloc.get_traced_memory()[0]
+        result = parse(data)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    del result
+
+    return peak - start
+
+
+@pytest.mark.parametrize("parent_depth", [0, 1, 2])
+def test_generated_responses_are_valid(parent_depth):
+    shape = ResponseShape(items=50, infos=2, parent_depth=parent_depth)
+
+    departures = generator.departures(shape)
+
+    assert departures == generator.departures(shape)
+    assert len(parse_departures(departures)) == 50
+    assert len(parse_stop_finder(generator.stop_finder(shape))) == 50
+    assert parse_system_infos([generator.system_info(shape)])
+
+    with pytest.raises(ValueError):
+        ResponseShape(parent_depth=3)
+
+
+@pytest.mark.parametrize("size", SIZES)
+@pytest.mark.parametrize("parser", list(PARSERS))
+def test_parse_scaling(benchmark, parser, size):
+    """Parse generated responses of `size` items."""
+    parse = PARSERS[parser][0]
+    data = create_response(parser, size)
+
+    benchmark.group = f"parse-scaling-{parser}"
+    benchmark.extra_info["items"] = size
+
+    rounds = max(1, min(20, 20000 // size))
+
+    # warm-up compiles the response schema
+    result = benchmark.pedantic(
+        parse, args=(data,), rounds=rounds, warmup_rounds=int(rounds > 1)
+    )
+
+    assert len(result) == size
+
+    if benchmark.stats:
+        benchmark.extra_info["us_per_item"] = round(
+            benchmark.stats.stats.mean / size * 1e6, 3
+        )
+
+
+@pytest.mark.parametrize("size", MEMORY_SIZES)
+@pytest.mark.parametrize("parser", list(PARSERS))
+def test_parse_peak_memory(parser, size):
+    """Compare peak memory of parsing with the saved baseline."""
+    key = f"{parser}-{size}"
+    peak = peak_memory(PARSERS[parser][0], create_response(parser, size))
+
+    baselines = json.loads(MEMORY_BASELINES.read_text(encoding="utf-8"))
+
+    if os.environ.get("PYEFA_UPDATE_BASELINES"):
+        baselines[key] = peak
+        MEMORY_BASELINES.write_text(
+            json.dumps(dict(sorted(baselines.items())), indent=2) + "\n",
+            encoding="utf-8",
+        )
+        return
+
+    if key not in baselines:
+        pytest.fail(f"No baseline for {key}, run with PYEFA_UPDATE_BASELINES=1")
+
+    limit = baselines[key] * (1 + MEMORY_TOLERANCE) + MEMORY_SLACK
+
+    assert peak <= limit, f"{key}: peak memory {peak} B, baseline {baselines[key]} B"
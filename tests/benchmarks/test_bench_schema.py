@@ -0,0 +1,30 @@
+import pytest
+
+from pyefa.requests.compiler import compile_schema
+from pyefa.requests.req_departures import DeparturesRequest
+from pyefa.requests.req_stop_finder import StopFinderRequest
+from tests.benchmarks.responses import departures_response, stop_finder_response
+
+RESPONSES = {
+    "stop-finder-500": (
+        lambda: StopFinderRequest("any", "Plärrer"),
+        lambda: stop_finder_response(500),
+    ),
+    "departures-500": (
+        lambda: DeparturesRequest("de:09564:704"),
+        lambda: departures_response(500),
+    ),
+}
+
+
+@pytest.mark.parametrize("validator", ["voluptuous", "compiled"])
+@pytest.mark.parametrize("response", list(RESPONSES))
+def test_validate_response(benchmark, response, validator):
+    """Validate large responses with voluptuous and the compiled schema."""
+    create_request, create_data = RESPONSES[response]
+    schema = create_request()._get_response_schema()
+    validate = compile_schema(schema) if validator == "compiled" else schema
+
+    benchmark.group = f"schema-{response}"
+
+    benchmark(validate, create_data())
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from pyefa import EfaClient
+from pyefa.server import ProxyServer
+from pyefa.transport import TransportResponse
+from tests.benchmarks.loadtest import run_load
+from tests.benchmarks.responses import BASE_URL, StaticTransport, departures_response
+
+REQUESTS = 2000
+CONCURRENCY = 50
+STOPS = 20
+UPSTREAM_LATENCY = 0.02
+
+
+class SlowTransport(StaticTransport):
+    async def get(
+        self, url: str, headers: dict[str, str] | None = None
+    ) -> TransportResponse:
+        await asyncio.sleep(UPSTREAM_LATENCY)
+
+        return await super().get(url, headers)
+
+
+@pytest.mark.parametrize("ttl", [0, 30])
+def test_proxy_load(benchmark, ttl):
+    """Many consumers querying departures of a few stops through the proxy."""
+    paths = [
+        f"XML_DM_REQUEST?outputFormat=rapidJSON&name_dm=de:09564:{i}&limit=40"
+        for i in range(STOPS)
+    ]
+
+    async def run():
+        transport = SlowTransport({"XML_DM_REQUEST": departures_response(40)})
+        upstream = EfaClient(BASE_URL, transport=transport)
+        proxy = ProxyServer(upstream, {"XML_DM_REQUEST": ttl}, rate=1000, burst=100)
+        port = await proxy.start("127.0.0.1", 0)
+
+        try:
+            result = await run_load(
+                f"http://127.0.0.1:{port}/", paths, REQUESTS, CONCURRENCY
+            )
+        finally:
+            await proxy.stop()
+
+        return proxy, result
+
+    benchmark.group = "proxy-load"
+
+    proxy, result = benchmark.pedantic(lambda: asyncio.run(run()), rounds=3)
+
+    benchmark.extra_info["requests_per_second"] = round(result.throughput, 1)
+    benchmark.extra_info["p50_ms"] = round(result.percentile(50) * 1000, 2)
+    benchmark.extra_info["p99_ms"] = round(result.percentile(99) * 1000, 2)
+    benchmark.extra_info["upstream_requests"] = proxy.stats.misses
+
+    assert result.requests == REQUESTS
+    assert result.errors == 0
@@ -0,0 +1,49 @@
+import asyncio
+import json
+
+from pyefa import EfaClient
+from tests.benchmarks.responses import departures_response, stop_finder_response
+from tests.benchmarks.soak import run_soak
+from tests.benchmarks.stub_server import StubServer
+
+CALLS = 3000
+WARMUP = 1000
+
+# limits after warm-up, a leak of ~1 KiB per call exceeds them
+MAX_RSS_GROWTH = 2 * 1024 * 1024
+MAX_FD_GROWTH = 0
+
+
+async def soak():
+    bodies = {
+        "XML_DM_REQUEST": json.dumps(departures_response(40)).encode("utf-8"),
+        "XML_STOPFINDER_REQUEST": json.dumps(stop_finder_response(30)).encode("utf-8"),
+    }
+
+    async with (
+        StubServer(bodies, latency=0) as server,
+        EfaClient(server.url) as client,
+    ):
+        return await run_soak(
+            client,
+            CALLS,
+            stop_ids=[f"de:09564:{x}" for x in range(100)],
+            names=[f"Stop {x}" for x in range(100)],
+            sample_every=500,
+            warmup=WARMUP,
+            trace=False,
+        )
+
+
+def test_soak_memory_and_fds(benchmark):
+    benchmark.group = "soak"
+    benchmark.extra_info["calls"] = CALLS
+
+    result = benchmark.pedantic(lambda: asyncio.run(soak()), rounds=1)
+
+    benchmark.extra_info["calls_per_second"] = round(result.throughput, 1)
+    benchmark.extra_info["rss_growth"] = result.growth("rss")
+    benchmark.extra_info["fd_growth"] = result.growth("fds")
+
+    assert result.errors == 0
+    assert result.violations(MAX_RSS_GROWTH, max_fd_growth=MAX_FD_GROWTH) == []
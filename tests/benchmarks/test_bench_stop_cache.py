@@ -0,0 +1,53 @@
+import pytest
+
+from pyefa.data_classes import Stop, StopType, TransportType
+from pyefa.stop_cache import StopCache, StopSnapshot, cache_key, write_snapshot
+from tests.test_stop_cache import INFO
+
+ENTRIES = 10000
+
+
+@pytest.fixture(scope="module")
+def snapshot_path(tmp_path_factory):
+    path = tmp_path_factory.mktemp("snapshot") / "stops.snapshot"
+
+    entries = {
+        cache_key(f"query {i}"): [
+            Stop(
+                f"de:09564:{i * 10 + j}",
+                f"Nürnberg, Haltestelle {i * 10 + j}",
+                StopType.STOP,
+                f"Haltestelle {i * 10 + j}",
+                [5648720.0 + j, 1231660.0 + j],
+                [TransportType.BUS, TransportType.TRAM],
+            )
+            for j in range(5)
+        ]
+        for i in range(ENTRIES)
+    }
+
+    write_snapshot(path, INFO, entries)
+
+    return path
+
+
+def test_snapshot_open(benchmark, snapshot_path):
+    benchmark.group = "stop-snapshot"
+    benchmark.extra_info["entries"] = ENTRIES
+    benchmark.extra_info["file_bytes"] = snapshot_path.stat().st_size
+
+    def run():
+        cache = StopCache()
+        cache.load(snapshot_path)
+        cache.clear()
+
+    benchmark(run)
+
+
+def test_snapshot_lookup(benchmark, snapshot_path):
+    benchmark.group = "stop-snapshot"
+
+    with StopSnapshot(snapshot_path) as snapshot:
+        stops = benchmark(lambda: snapshot.get(cache_key(f"query {ENTRIES // 3}")))
+
+    assert len(stops) == 5
@@ -0,0 +1,19 @@
+import pytest
+
+from pyefa.requests.req_stop_finder import StopFinderRequest
+from tests.benchmarks.responses import stop_finder_response
+
+
+@pytest.mark.parametrize("top_k", [None, 5])
+@pytest.mark.parametrize("hits", [30, 100, 250, 500])
+def test_parse_stop_finder(benchmark, hits, top_k):
+    """Parse stop finder responses of `anyMaxSizeHitList` sizes."""
+    data = stop_finder_response(hits)
+    request = StopFinderRequest("any", "Plärrer", top_k)
+
+    benchmark.group = f"stop-finder-parse-{hits}"
+    benchmark.extra_info["hits"] = hits
+
+    stops = benchmark(request.parse, data)
+
+    assert len(stops) == (hits if top_k is None else top_k)
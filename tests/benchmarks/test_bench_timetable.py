@@ -0,0 +1,79 @@
+import datetime
+import random
+
+import pytest
+
+from pyefa.data_classes import Stop, StopType
+from pyefa.helpers import TZ_INFO
+from pyefa.timetable import Timetable
+
+# grid network, one line per row and column in both directions
+SIZE = 15
+HEADWAY = 600
+HOP = 120
+SERVICE = 16 * 3600
+START = int(datetime.datetime(2024, 11, 27, 5, 0, tzinfo=TZ_INFO).timestamp())
+QUERIES = 200
+
+
+def grid_timetable() -> Timetable:
+    stops = [
+        Stop(f"de:1:{x * SIZE + y}", f"Stop {x}/{y}", StopType.STOP)
+        for x in range(SIZE)
+        for y in range(SIZE)
+    ]
+
+    trips = {}
+
+    for i in range(SIZE):
+        row = tuple(f"de:1:{i * SIZE + y}" for y in range(SIZE))
+        column = tuple(f"de:1:{x * SIZE + i}" for x in range(SIZE))
+
+        for name, pattern in [(f"R{i}", row), (f"C{i}", column)]:
+            for line, stops_of_line in [(name, pattern), (f"{name}'", pattern[::-1])]:
+                trips[(line, stops_of_line)] = [
+                    (
+                        [start + j * HOP for j in range(SIZE)],
+                        [start + j * HOP + 30 for j in range(SIZE)],
+                    )
+                    for start in range(START, START + SERVICE, HEADWAY)
+                ]
+
+    return Timetable(stops, trips)
+
+
+@pytest.fixture(scope="module")
+def timetable():
+    return grid_timetable()
+
+
+def test_build_timetable(benchmark):
+    benchmark.group = "timetable"
+    benchmark.extra_info["stops"] = SIZE * SIZE
+
+    timetable = benchmark.pedantic(grid_timetable, rounds=3)
+
+    benchmark.extra_info["trips"] = timetable.trip_count
+
+
+def test_earliest_arrival_queries(benchmark, timetable):
+    """Random one-to-one queries, queries/s = QUERIES / mean."""
+    rng = random.Random(1)
+    queries = [
+        (
+            timetable.stops[rng.randrange(SIZE * SIZE)].id,
+            timetable.stops[rng.randrange(SIZE * SIZE)].id,
+            datetime.datetime(2024, 11, 27, rng.randrange(6, 18), 0, tzinfo=TZ_INFO),
+        )
+        for _ in range(QUERIES)
+    ]
+
+    benchmark.group = "timetable"
+    benchmark.extra_info["queries"] = QUERIES
+
+    def run():
+        return [timetable.earliest_arrival(*x) for x in queries]
+
+    journeys = benchmark(run)
+
+    assert all(x.arrival_planned >= x.departure_planned for x in journeys)
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import copy
+
+import pytest
+from voluptuous import ALLOW_EXTRA, Any, MultipleInvalid, Optional, Required, Schema
+
+from pyefa.exceptions import EfaResponseInvalid
+from pyefa.requests.compiler import compile_schema
+from pyefa.requests.req_departures import DeparturesRequest
+from pyefa.requests.req_stop_finder import StopFinderRequest
+from pyefa.requests.schemas import IsStopType
+from tests.benchmarks.responses import departures_response, stop_finder_response
+
+
+def departures_schema() -> Schema:
+    return DeparturesRequest("x")._get_response_schema()
+
+
+def error(validate, data) -> str | None:
+    try:
+        validate(data)
+    except MultipleInvalid as exc:
+        return str(exc)
+    except Exception as exc:  # noqa: BLE001
+        # errors of validators are not wrapped by voluptuous
+        return repr(exc)
+
+    return None
+
+
+def set_path(data: dict, path: list, value) -> dict:
+    data = copy.deepcopy(data)
+    target = data
+
+    for key in path[:-1]:
+        target = target[key]
+
+    if value is KeyError:
+        del target[path[-1]]
+    else:
+        target[path[-1]] = value
+
+    return data
+
+
+@pytest.mark.parametrize(
+    "path, value",
+    [
+        (["version"], KeyError),
+        (["version"], 1),
+        (["unknown"], 1),
+        (["stopEvents"], {}),
+        (["stopEvents", 1, "departureTimePlanned"], "27.11.2024"),
+        (["stopEvents", 1, "location", "type"], "harbour"),
+        (["stopEvents", 1, "location", "type"], ["stop"]),
+        (["stopEvents", 1, "location", "parent", "parent", "type"], "harbour"),
+        (["stopEvents", 1, "location", "parent", "parent", "type"], {}),
+        (["stopEvents", 1, "location", "properties", "extra"], 1),
+        (["stopEvents", 1, "transportation", "product", "class"], "2"),
+        (["stopEvents", 1, "transportation", "destination"], None),
+        (["stopEvents", 1, "isCancelled"], "maybe"),
+        (["stopEvents", 1, "realtimeStatus"], ["MONITORED", 1]),
+        (["locations", 0, "productClasses"], 5),
+        (["locations", 0, "extra"], {"allowed": True}),
+    ],
+)
+def test_same_result_as_voluptuous(path, value):
+    schema = departures_schema()
+    data = set_path(departures_response(3), path, value)
+
+    assert error(compile_schema(schema), data) == error(schema, data)
+
+
+@pytest.mark.parametrize(
+    "schema, data",
+    [
+        (
+            StopFinderRequest("any", "x")._get_response_schema(),
+            stop_finder_response(50),
+        ),
+        (departures_schema(), departures_response(50)),
+    ],
+)
+def test_valid_responses(schema, data):
+    assert compile_schema(schema)(data) is None
+
+
+@pytest.mark.parametrize(
+    "data", [{"a": 1}, {"a": "x", "b": 2}, {"a": "x", "c": None}, {"b": 1}, []]
+)
+def test_constructs_left_to_voluptuous(data):
+    schema = Schema(
+        {
+            Required("a"): Any(int, "x"),
+            Optional("b", default=1): int,
+            Optional("c"): [Any(None, str), int],
+        },
+        extra=ALLOW_EXTRA,
+    )
+
+    assert error(compile_schema(schema), data) == error(schema, data)
+
+
+def test_is_stop_type_rejects_unhashable():
+    with pytest.raises(ValueError):
+        IsStopType({"type": "stop"})
+
+
+def test_request_error_message_unchanged():
+    data = set_path(departures_response(1), ["stopEvents", 0, "location"], KeyError)
+
+    with pytest.raises(EfaResponseInvalid) as exc:
+        DeparturesRequest("x").parse(data)
+
+    assert str(exc.value) == (
+        f"Server response validataion failed - {error(departures_schema(), data)}"
+    )
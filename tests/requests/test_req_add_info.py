@@ -0,0 +1,80 @@
+import pytest
+
+from pyefa.exceptions import EfaParameterError, EfaResponseInvalid
+from pyefa.infos import InfoIndex
+from pyefa.requests.req_add_info import AddInfoRequest
+
+INFO = {
+    "id": "vgn_info_1",
+    "version": 2,
+    "type": "lineInfo",
+    "priority": "high",
+    "infoLinks": [
+        {
+            "urlText": "Baustelle",
+            "url": "https://example.com/info/1",
+            "content": "Ersatzverkehr zwischen Plärrer und Hauptbahnhof",
+            "subtitle": "U2 Ersatzverkehr",
+            "title": "Baustelle U2",
+        }
+    ],
+    "timestamps": {
+        "creation": "2024-11-20T10:00:00Z",
+        "availability": {"from": "2024-11-20T10:00:00Z", "to": "2024-12-01T03:00:00Z"},
+    },
+    "affected": {
+        "lines": [{"id": "vgn:11002: :H:j24", "name": "U-Bahn U2", "number": "U2"}],
+        "stops": [{"id": "de:09564:704", "name": "Plärrer", "type": "stop"}],
+    },
+}
+
+
+def response(*infos: dict) -> dict:
+    return {"version": "version", "infos": {"current": list(infos), "historic": []}}
+
+
+def test_init_name_and_macro():
+    req = AddInfoRequest()
+
+    assert req._name == "XML_ADDINFO_REQUEST"
+    assert req._macro == "addinfo"
+
+
+def test_parse_success():
+    infos = AddInfoRequest().parse(response(INFO))
+
+    assert len(infos) == 1
+    assert infos[0].id == "vgn_info_1"
+    assert infos[0].version == 2
+    assert infos[0].title == "Baustelle U2"
+    assert infos[0].valid_to.year == 2024
+    assert infos[0].lines == ["vgn:11002: :H:j24"]
+    assert infos[0].stops == ["de:09564:704"]
+
+
+def test_parse_reuses_current_infos():
+    index = InfoIndex()
+    index.update(AddInfoRequest(index).parse(response(INFO)))
+
+    same = AddInfoRequest(index).parse(response(INFO))[0]
+    changed = AddInfoRequest(index).parse(response(dict(INFO, version=3)))[0]
+
+    assert same is index.current["vgn_info_1"]
+    assert changed is not same
+    assert changed.version == 3
+
+
+@pytest.mark.parametrize(
+    "data", [None, {"version": "1"}, {"version": "1", "infos": {"current": [{}]}}]
+)
+def test_parse_failed(data):
+    with pytest.raises(EfaResponseInvalid):
+        AddInfoRequest().parse(data)
+
+
+@pytest.mark.parametrize("invalid_param", ["dummy", "name_dm"])
+def test_add_invalid_param(invalid_param):
+    req = AddInfoRequest()
+
+    with pytest.raises(EfaParameterError):
+        req.add_param(invalid_param, "valid_value")
@@ -1,7 +1,9 @@
 import pytest
 
+from pyefa.data_classes import TransportType
 from pyefa.exceptions import EfaParameterError, EfaResponseInvalid
 from pyefa.requests.req_departures import DeparturesRequest
+from tests.benchmarks.responses import departures_response
 
 
 def test_init_name_and_macro():
@@ -97,6 +99,11 @@ def test_parse_success():
     info = req.parse(data)
 
     assert len(info) == 1
+    assert not info[0].cancelled
+
+    data["stopEvents"][0]["isCancelled"] = True
+
+    assert req.parse(data)[0].cancelled
 
 
 @pytest.mark.parametrize(
@@ -124,3 +131,116 @@ def test_add_invalid_param(invalid_param):
 
     with pytest.raises(EfaParameterError):
         req.add_param(invalid_param, "valid_value")
+
+
+def test_parse_shares_infos():
+    req = DeparturesRequest("my_stop")
+
+    event = {
+        "location": {"id": "de:09564:704", "name": "Plärrer", "type": "stop"},
+        "departureTimePlanned": "2024-11-27T21:16:00Z",
+        "transportation": {
+            "id": "vgn:11003: :R:j24",
+            "name": "U-Bahn U3",
+            "disassembledName": "U3",
+            "number": "U3",
+            "description": "description",
+            "product": {"id": 6, "class": 2, "name": "U-Bahn"},
+            "origin": {"id": "3000275", "name": "Nordwestring", "type": "stop"},
+            "destination": {"id": "3001180", "name": "Großreuth", "type": "stop"},
+        },
+        "infos": [{"id": "info_1", "version": 1, "type": "lineInfo"}],
+    }
+
+    departures = req.parse({"version": "1", "locations": [], "stopEvents": [event] * 2})
+
+    assert departures[0].infos[0].id == "info_1"
+    assert departures[0].infos[0] is departures[1].infos[0]
+
+
+def test_transport_filter_excluded_on_server_side():
+    req = DeparturesRequest("my_stop", transports=[TransportType.SUBWAY])
+
+    params = str(req)
+
+    assert "excludedMeans=checkbox" in params
+    assert "exclMOT_2" not in params
+    assert all(f"exclMOT_{x.value}=1" in params for x in TransportType if x.value != 2)
+
+
+@pytest.mark.parametrize(
+    "transports, lines, expected",
+    [
+        (None, None, ["U3", "4", "36"]),
+        ([TransportType.SUBWAY, TransportType.TRAM], None, ["U3", "4"]),
+        (None, ["36", "U3"], ["U3", "36"]),
+        ([TransportType.TRAM], ["U3"], []),
+    ],
+)
+def test_parse_filters_raw_stop_events(transports, lines, expected):
+    req = DeparturesRequest("my_stop", transports=transports, lines=lines)
+    data = departures_response(3)
+
+    for stop_event, (number, product) in zip(
+        data["stopEvents"], [("U3", 2), ("4", 4), ("36", 5)]
+    ):
+        stop_event["transportation"]["number"] = number
+        stop_event["transportation"]["product"]["class"] = product
+
+    departures = req.parse(data)
+
+    assert [x.line_name for x in departures] == expected
+
+
+@pytest.mark.parametrize(
+    "stop_event",
+    [
+        {"transportation": {"number": "99"}},
+        {"transportation": None},
+        "stop event",
+    ],
+)
+def test_parse_filters_validates_all_stop_events(stop_event):
+    req = DeparturesRequest("my_stop", lines=["U3"])
+    data = departures_response(2)
+
+    data["stopEvents"].append(stop_event)
+
+    with pytest.raises(EfaResponseInvalid):
+        req.parse(data)
+
+
+def test_parse_filters_missing_stop_events():
+    req = DeparturesRequest("my_stop", transports=[TransportType.SUBWAY])
+    data = departures_response(1)
+
+    del data["stopEvents"]
+
+    with pytest.raises(EfaResponseInvalid):
+        req.parse(data)
+
+    assert "stopEvents" not in data
+
+
+def test_parse_skips_stop_event_without_destination():
+    req = DeparturesRequest("my_stop")
+    data = departures_response(2)
+
+    del data["stopEvents"][0]["transportation"]["destination"]
+
+    assert len(req.parse(data)) == 1
+
+
+def test_parse_skips_invalid_infos():
+    req = DeparturesRequest("my_stop")
+    data = departures_response(1)
+
+    data["stopEvents"][0]["infos"] = [
+        {"id": "info_1", "version": 1},
+        {"version": 1},
+        {"id": "info_2", "timestamps": {"availability": {"to": "2024-13-01"}}},
+    ]
+
+    departures = req.parse(data)
+
+    assert [x.id for x in departures[0].infos] == ["info_1"]
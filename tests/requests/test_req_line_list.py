@@ -0,0 +1,50 @@
+import pytest
+
+from pyefa.exceptions import EfaParameterError, EfaResponseInvalid
+from pyefa.requests.req_line_list import LineListRequest
+from tests.requests.test_req_serving_lines import LINE
+
+
+def test_init_name_and_macro():
+    req = LineListRequest()
+
+    assert req._name == "XML_LINELIST_REQUEST"
+    assert req._macro == "linelist"
+
+
+def test_parse_success():
+    req = LineListRequest()
+
+    line = dict(LINE)
+    line.pop("origin")
+    line.pop("description")
+
+    lines = req.parse({"version": "version", "lines": [line]})
+
+    assert len(lines) == 1
+    assert lines[0].origin is None
+    assert lines[0].description == ""
+
+
+@pytest.mark.parametrize("data", [None, {}, {"version": "1", "lines": 123}])
+def test_parse_failed(data):
+    req = LineListRequest()
+
+    with pytest.raises(EfaResponseInvalid):
+        req.parse(data)
+
+
+def test_add_valid_param():
+    req = LineListRequest()
+
+    req.add_param("lineListNetBranchCode", "vgn")
+
+    assert req._parameters.get("lineListNetBranchCode") == "vgn"
+
+
+@pytest.mark.parametrize("invalid_param", ["dummy", "name_dm"])
+def test_add_invalid_param(invalid_param):
+    req = LineListRequest()
+
+    with pytest.raises(EfaParameterError):
+        req.add_param(invalid_param, "valid_value")
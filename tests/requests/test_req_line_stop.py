@@ -0,0 +1,58 @@
+import pytest
+
+from pyefa.data_classes import StopType
+from pyefa.exceptions import EfaParameterError, EfaResponseInvalid
+from pyefa.requests.req_line_stop import LineStopRequest
+
+
+def location(id: str, name: str) -> dict:
+    return {
+        "id": id,
+        "isGlobalId": True,
+        "name": name,
+        "type": "stop",
+        "coord": [5648722.0, 1231669.0],
+        "productClasses": [2],
+    }
+
+
+def test_init_name_and_macro():
+    req = LineStopRequest("my_line")
+
+    assert req._name == "XML_LINESTOP_REQUEST"
+    assert req._macro == "linestop"
+    assert req._parameters.get("line") == "my_line"
+
+
+def test_parse_success():
+    req = LineStopRequest("my_line")
+
+    stops = req.parse(
+        {
+            "version": "version",
+            "locationSequence": [
+                location("de:09564:1180", "Großreuth"),
+                location("de:09564:704", "Plärrer"),
+            ],
+        }
+    )
+
+    assert [x.id for x in stops] == ["de:09564:1180", "de:09564:704"]
+    assert stops[1].type == StopType.STOP
+    assert stops[1].coord == [5648722.0, 1231669.0]
+
+
+@pytest.mark.parametrize("data", [None, {}, {"version": "1"}])
+def test_parse_failed(data):
+    req = LineStopRequest("my_line")
+
+    with pytest.raises(EfaResponseInvalid):
+        req.parse(data)
+
+
+@pytest.mark.parametrize("invalid_param", ["dummy", "name_sl"])
+def test_add_invalid_param(invalid_param):
+    req = LineStopRequest("my_line")
+
+    with pytest.raises(EfaParameterError):
+        req.add_param(invalid_param, "valid_value")
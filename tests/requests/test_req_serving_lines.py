@@ -0,0 +1,60 @@
+import pytest
+
+from pyefa.data_classes import TransportType
+from pyefa.exceptions import EfaParameterError, EfaResponseInvalid
+from pyefa.requests.req_serving_lines import ServingLinesRequest
+
+LINE = {
+    "id": "vgn:11003: :H:j24",
+    "name": "U-Bahn U3",
+    "disassembledName": "U3",
+    "number": "U3",
+    "description": "Großreuth bei Schweinau - Plärrer - Nordwestring",
+    "product": {"id": 6, "class": 2, "name": "U-Bahn", "iconId": 1},
+    "destination": {"id": "3000275", "name": "Nordwestring", "type": "stop"},
+    "origin": {"id": "3001180", "name": "Großreuth", "type": "stop"},
+}
+
+
+def test_init_name_and_macro():
+    req = ServingLinesRequest("my_stop")
+
+    assert req._name == "XML_SERVINGLINES_REQUEST"
+    assert req._macro == "servingLines"
+
+
+def test_init_params():
+    req = ServingLinesRequest("my_stop")
+
+    assert req._parameters.get("name_sl") == "my_stop"
+
+
+def test_parse_success():
+    req = ServingLinesRequest("my_stop")
+
+    lines = req.parse({"version": "version", "lines": [LINE, LINE]})
+
+    assert len(lines) == 2
+    assert lines[0].id == "vgn:11003: :H:j24"
+    assert lines[0].number == "U3"
+    assert lines[0].product == TransportType.SUBWAY
+    assert lines[0].destination.id == "3000275"
+    assert lines[0].destination is lines[1].destination
+
+
+@pytest.mark.parametrize(
+    "data", [{"lines": None}, {"version": "1", "lines": "value"}, {"lines": [{}]}]
+)
+def test_parse_failed(data):
+    req = ServingLinesRequest("my_stop")
+
+    with pytest.raises(EfaResponseInvalid):
+        req.parse(data)
+
+
+@pytest.mark.parametrize("invalid_param", ["dummy", "name_sf"])
+def test_add_invalid_param(invalid_param):
+    req = ServingLinesRequest("my_stop")
+
+    with pytest.raises(EfaParameterError):
+        req.add_param(invalid_param, "valid_value")
@@ -72,3 +72,21 @@ def test_add_invalid_param(invalid_param):
 
     with pytest.raises(EfaParameterError):
         req.add_param(invalid_param, "valid_value")
+
+
+@pytest.mark.parametrize("top_k", [None, 1, 3, 10])
+def test_parse_top_k(top_k):
+    req = StopFinderRequest("any", "my_name", top_k)
+
+    qualities = [500, 900, 100, 900, 700]
+    locations = [
+        {"id": f"id_{i}", "name": f"name {i}", "type": "stop", "matchQuality": x}
+        for i, x in enumerate(qualities)
+    ]
+
+    stops = req.parse({"version": "version", "locations": locations})
+
+    # stable order by match quality, like a full sort
+    expected = ["id_1", "id_3", "id_4", "id_0", "id_2"]
+
+    assert [x.id for x in stops] == expected[:top_k]
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import pytest
+
+from pyefa.exceptions import EfaParameterError, EfaResponseInvalid
+from pyefa.geometry import GeometryCache
+from pyefa.requests.req_stop_seq_coord import StopSeqCoordRequest
+from tests.requests.test_req_serving_lines import LINE
+
+
+def leg(coords: list | None = None) -> dict:
+    leg = {
+        "transportation": LINE,
+        "stopSequence": [
+            {
+                "id": "de:09564:1180",
+                "isGlobalId": True,
+                "name": "Großreuth",
+                "type": "stop",
+                "departureTimePlanned": "2024-11-27T21:10:00Z",
+            },
+            {
+                "id": "de:09564:704",
+                "isGlobalId": True,
+                "name": "Plärrer",
+                "type": "stop",
+                "arrivalTimePlanned": "2024-11-27T21:16:00Z",
+                "arrivalTimeEstimated": "2024-11-27T21:17:00Z",
+            },
+        ],
+    }
+
+    if coords is not None:
+        leg["coords"] = coords
+
+    return leg
+
+
+def test_init_name_and_macro():
+    req = StopSeqCoordRequest("my_line")
+
+    assert req._name == "XML_STOPSEQCOORD_REQUEST"
+    assert req._macro == "stopseqcoord"
+    assert req._parameters.get("line") == "my_line"
+
+
+def test_parse_success():
+    req = StopSeqCoordRequest("my_line")
+
+    sequence = req.parse(
+        {
+            "version": "version",
+            "leg": leg([[5648722.0, 1231669.0], [5648730.0, 1231600.0]]),
+        }
+    )
+
+    assert sequence.line.number == "U3"
+    assert [x.stop.id for x in sequence.stops] == ["de:09564:1180", "de:09564:704"]
+    assert sequence.stops[0].arrival_planned is None
+    assert sequence.stops[0].departure_planned.minute == 10
+    assert sequence.stops[1].arrival_estimated.minute == 17
+    assert len(sequence.path) == 2
+
+
+def test_parse_shares_path_of_route():
+    cache = GeometryCache()
+    data = {"version": "version", "leg": leg([[1.0, 2.0], [3.0, 4.0]])}
+
+    first = StopSeqCoordRequest("my_line", cache).parse(data)
+    second = StopSeqCoordRequest("my_line", cache).parse(data)
+
+    assert first.path is second.path
+
+
+def test_parse_without_coords():
+    req = StopSeqCoordRequest("my_line")
+
+    assert req.parse({"version": "version", "leg": leg()}).path is None
+
+
+@pytest.mark.parametrize("data", [None, {}, {"version": "1", "leg": {}}])
+def test_parse_failed(data):
+    req = StopSeqCoordRequest("my_line")
+
+    with pytest.raises(EfaResponseInvalid):
+        req.parse(data)
+
+
+@pytest.mark.parametrize("invalid_param", ["dummy", "name_dm"])
+def test_add_invalid_param(invalid_param):
+    req = StopSeqCoordRequest("my_line")
+
+    with pytest.raises(EfaParameterError):
+        req.add_param(invalid_param, "valid_value")
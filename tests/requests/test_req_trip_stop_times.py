@@ -0,0 +1,45 @@
+import pytest
+
+from pyefa.exceptions import EfaParameterError, EfaResponseInvalid
+from pyefa.requests.req_trip_stop_times import TripStopTimesRequest
+from tests.requests.test_req_stop_seq_coord import leg
+
+
+def test_init_name_and_macro():
+    req = TripStopTimesRequest("my_line", "my_stop", 939)
+
+    assert req._name == "XML_TRIPSTOPTIMES_REQUEST"
+    assert req._macro == "tripstoptimes"
+
+
+def test_init_params():
+    req = TripStopTimesRequest("my_line", "my_stop", 939)
+
+    assert req._parameters.get("line") == "my_line"
+    assert req._parameters.get("stopID") == "my_stop"
+    assert req._parameters.get("tripCode") == 939
+
+
+def test_parse_success():
+    req = TripStopTimesRequest("my_line", "my_stop", 939)
+
+    sequence = req.parse({"version": "version", "leg": leg()})
+
+    assert len(sequence.stops) == 2
+    assert sequence.path is None
+
+
+@pytest.mark.parametrize("data", [None, {}, {"version": "1", "leg": None}])
+def test_parse_failed(data):
+    req = TripStopTimesRequest("my_line", "my_stop", 939)
+
+    with pytest.raises(EfaResponseInvalid):
+        req.parse(data)
+
+
+@pytest.mark.parametrize("invalid_param", ["dummy", "name_sf"])
+def test_add_invalid_param(invalid_param):
+    req = TripStopTimesRequest("my_line", "my_stop", 939)
+
+    with pytest.raises(EfaParameterError):
+        req.add_param(invalid_param, "valid_value")
@@ -0,0 +1,99 @@
+import datetime
+
+import pytest
+
+from pyefa.data_classes import StopType
+from pyefa.exceptions import EfaParameterError, EfaResponseInvalid
+from pyefa.requests.req_trips import TripRequest
+
+
+def location(id: str, name: str, **times) -> dict:
+    return {"id": id, "isGlobalId": True, "name": name, "type": "stop", **times}
+
+
+def leg(origin: dict, destination: dict, number: str, product: int) -> dict:
+    return {
+        "duration": 600,
+        "origin": origin,
+        "destination": destination,
+        "transportation": {"number": number, "product": {"class": product}},
+    }
+
+
+def response(origin: str = "de:09564:704", destination: str = "de:09564:510"):
+    start = location(
+        origin,
+        "Plärrer",
+        departureTimePlanned="2024-11-27T12:00:00Z",
+        departureTimeEstimated="2024-11-27T12:02:00Z",
+    )
+    change = location("de:09564:510:1", "Hauptbahnhof", arrivalTimePlanned="x")
+    end = location(destination, "Ziel", arrivalTimePlanned="2024-11-27T12:25:00Z")
+
+    return {
+        "version": "10.6.14.22",
+        "journeys": [
+            {
+                "interchanges": 1,
+                "legs": [
+                    leg(start, change, "U2", 2),
+                    leg(change, change, "", 100),
+                    leg(change, end, "4", 4),
+                ],
+            }
+        ],
+    }
+
+
+def test_init_name_and_macro():
+    req = TripRequest("de:09564:704", "de:09564:510")
+
+    assert req._name == "XML_TRIP_REQUEST2"
+    assert req._macro == "trip"
+    assert req._parameters.get("name_origin") == "de:09564:704"
+    assert req._parameters.get("name_destination") == "de:09564:510"
+
+
+def test_invalid_param():
+    req = TripRequest("de:09564:704", "de:09564:510")
+
+    with pytest.raises(EfaParameterError):
+        req.add_param("name_dm", "x")
+
+
+def test_parse_success():
+    journeys = TripRequest("a", "b").parse(response())
+
+    assert len(journeys) == 1
+
+    journey = journeys[0]
+
+    assert journey.origin.id == "de:09564:704"
+    assert journey.origin.type == StopType.STOP
+    assert journey.destination.name == "Ziel"
+    assert journey.lines == ["U2", "4"]
+    assert journey.interchanges == 1
+    assert journey.arrival_estimated is None
+    assert journey.duration == datetime.timedelta(minutes=23)
+
+
+def test_parse_no_journeys():
+    assert TripRequest("a", "b").parse({"version": "1"}) == []
+
+
+def test_parse_skips_journey_without_legs():
+    data = response()
+    data["journeys"].insert(0, {"interchanges": 0, "legs": []})
+
+    journeys = TripRequest("a", "b").parse(data)
+
+    assert len(journeys) == 1
+    assert journeys[0].lines == ["U2", "4"]
+
+
+def test_parse_invalid_response():
+    data = response()
+    data["journeys"][0].pop("legs")
+
+    with pytest.raises(EfaResponseInvalid):
+        TripRequest("a", "b").parse(data)
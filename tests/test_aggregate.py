@@ -0,0 +1,226 @@
+import asyncio
+import copy
+import time
+
+import pytest
+
+from pyefa import EfaClient
+from pyefa.aggregate import AggregatingClient, StopIdMapping
+from pyefa.exceptions import EfaParameterError
+from pyefa.registry import EndpointRegistry
+from pyefa.transport import TransportResponse
+from tests.benchmarks.responses import (
+    BASE_URL,
+    StaticTransport,
+    departures_response,
+    stop_finder_response,
+)
+
+
+class SlowTransport(StaticTransport):
+    def __init__(self, responses: dict[str, dict], latency: float = 0, status=200):
+        super().__init__(responses)
+        self.latency = latency
+        self.status = status
+        self.urls = []
+
+    async def get(self, url: str, headers=None) -> TransportResponse:
+        self.urls.append(url)
+
+        await asyncio.sleep(self.latency)
+
+        if self.status != 200:
+            return TransportResponse(self.status, "")
+
+        return await super().get(url, headers)
+
+
+def board(first: int, count: int, destination_id: str = "3001180") -> dict:
+    """Return departures response with trips `first` to `first + count`."""
+    data = departures_response(first + count)
+    data["stopEvents"] = data["stopEvents"][first:]
+
+    for stop_event in data["stopEvents"]:
+        stop_event["transportation"]["destination"]["id"] = destination_id
+
+    return data
+
+
+def registry(**transports: SlowTransport) -> EndpointRegistry:
+    registry = EndpointRegistry()
+
+    for name, transport in transports.items():
+        prefixes = ["de:09564:"] if name == "vgn" else []
+        registry.register(name, EfaClient(BASE_URL, transport=transport), prefixes)
+
+    return registry
+
+
+def aggregate(registry: EndpointRegistry, *args, **kwargs):
+    async def run():
+        async with registry:
+            start = time.perf_counter()
+            board = await AggregatingClient(registry, deadline=0.2).departures(
+                *args, **kwargs
+            )
+
+            return board, time.perf_counter() - start
+
+    return asyncio.run(run())
+
+
+def test_merges_endpoints():
+    endpoints = registry(
+        other=SlowTransport({"XML_DM_REQUEST": board(5, 10, "de:09564:1180")}),
+        vgn=SlowTransport({"XML_DM_REQUEST": board(0, 10)}),
+    )
+
+    result, _ = aggregate(endpoints, "de:09564:704")
+
+    assert len(result.departures) == 15
+    assert result.departures == sorted(result.departures, key=lambda x: x.planned_time)
+    assert not result.partial
+    assert [(x.endpoint, x.departures) for x in result.results] == [
+        ("vgn", 10),
+        ("other", 10),
+    ]
+    # duplicates of the responsible endpoint win
+    assert result.departures[7].destination.id == "3001180"
+    assert result.departures[-1].destination.id == "de:09564:1180"
+
+
+def test_limit():
+    endpoints = registry(
+        vgn=SlowTransport({"XML_DM_REQUEST": board(0, 10)}),
+        other=SlowTransport({"XML_DM_REQUEST": board(10, 10)}),
+    )
+
+    result, _ = aggregate(endpoints, "de:09564:704", limit=12)
+
+    assert len(result.departures) == 12
+
+
+def test_partial_result_on_deadline():
+    endpoints = registry(
+        vgn=SlowTransport({"XML_DM_REQUEST": board(0, 10)}),
+        slow=SlowTransport({"XML_DM_REQUEST": board(10, 10)}, latency=5),
+    )
+
+    result, duration = aggregate(endpoints, "de:09564:704")
+
+    assert duration < 1
+    assert len(result.departures) == 10
+    assert result.partial
+    assert result.missing == ["slow"]
+    assert result.results[1].timed_out
+
+
+def test_cancel_cancels_endpoint_requests():
+    endpoints = registry(
+        vgn=SlowTransport({"XML_DM_REQUEST": board(0, 10)}, latency=5),
+        slow=SlowTransport({"XML_DM_REQUEST": board(10, 10)}, latency=5),
+    )
+
+    async def run():
+        async with endpoints:
+            aggregator = AggregatingClient(endpoints, deadline=10)
+            task = asyncio.create_task(aggregator.departures("de:09564:704"))
+
+            await asyncio.sleep(0.05)
+            task.cancel()
+
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+            return asyncio.all_tasks() - {asyncio.current_task()}
+
+    assert asyncio.run(run()) == set()
+
+
+def test_partial_result_on_error():
+    endpoints = registry(
+        vgn=SlowTransport({"XML_DM_REQUEST": board(0, 10)}),
+        broken=SlowTransport({}, status=503),
+    )
+
+    result, _ = aggregate(endpoints, "de:09564:704")
+
+    assert len(result.departures) == 10
+    assert result.missing == ["broken"]
+    assert "EfaConnectionError" in result.results[1].error
+
+
+def test_unexpected_endpoint_error_raised():
+    class BuggyTransport(SlowTransport):
+        async def get(self, url: str, headers=None) -> TransportResponse:
+            raise KeyError("bug")
+
+    endpoints = registry(
+        vgn=SlowTransport({"XML_DM_REQUEST": board(0, 10)}),
+        buggy=BuggyTransport({}),
+    )
+
+    with pytest.raises(KeyError):
+        aggregate(endpoints, "de:09564:704")
+
+
+def test_mapped_stop_ids():
+    vgn = SlowTransport({"XML_DM_REQUEST": board(0, 2)})
+    other = SlowTransport({"XML_DM_REQUEST": board(2, 2)})
+    unrelated = SlowTransport({"XML_DM_REQUEST": board(4, 2)})
+    endpoints = registry(vgn=vgn, other=other, unrelated=unrelated)
+
+    mapping = StopIdMapping()
+    mapping.add("de:09564:704", {"vgn": "de:09564:704", "other": "3000704"})
+
+    async def run():
+        async with endpoints:
+            aggregator = AggregatingClient(endpoints, mapping)
+            return await aggregator.departures("3000704")
+
+    result = asyncio.run(run())
+
+    assert len(result.departures) == 4
+    assert "name_dm=3000704" in other.urls[0]
+    assert "name_dm=de:09564:704" in vgn.urls[0]
+    assert not unrelated.urls
+
+
+def test_map_stop():
+    found = copy.deepcopy(stop_finder_response(1))
+    found["locations"][0]["id"] = "3000704"
+
+    endpoints = registry(
+        vgn=SlowTransport({}),
+        other=SlowTransport({"XML_STOPFINDER_REQUEST": found}),
+        empty=SlowTransport({"XML_STOPFINDER_REQUEST": stop_finder_response(0)}),
+    )
+
+    mapping = StopIdMapping()
+    mapping.add("de:09564:704", {"vgn": "de:09564:704"})
+
+    async def run():
+        async with endpoints:
+            aggregator = AggregatingClient(endpoints, mapping)
+            return await aggregator.map_stop("de:09564:704", "Plärrer")
+
+    assert asyncio.run(run()) == {"vgn": "de:09564:704", "other": "3000704"}
+    assert mapping.station("3000704") == "de:09564:704"
+
+
+def test_no_endpoints():
+    with pytest.raises(EfaParameterError):
+        asyncio.run(AggregatingClient(EndpointRegistry()).departures("de:09564:704"))
+
+
+def test_mapping_save_load(tmp_path):
+    mapping = StopIdMapping()
+    mapping.add("de:09564:704", {"vgn": "de:09564:704", "other": "3000704"})
+    mapping.save(tmp_path / "mapping.json")
+
+    loaded = StopIdMapping()
+    loaded.load(tmp_path / "mapping.json")
+
+    assert len(loaded) == 1
+    assert loaded.ids("3000704") == {"vgn": "de:09564:704", "other": "3000704"}
+    assert loaded.ids("unknown") == {}
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+from pyefa import EfaClient
+from pyefa.merge import StopInterner
+from pyefa.transport import Transport, TransportResponse
+from tests.benchmarks.responses import BASE_URL, StaticTransport, departures_response
+
+SYSTEM_INFO = {
+    "version": "1.2.3",
+    "ptKernel": {
+        "dataFormat": "EFA10_04_00",
+        "dataBuild": "example",
+        "appVersion": "version",
+    },
+    "validity": {"from": "2024-11-01", "to": "2025-01-01"},
+}
+
+
+class EtagTransport(Transport):
+    """Transport answering with 304 if the client already knows the response."""
+
+    def __init__(self, etag: str | None = '"v1"'):
+        self.etag = etag
+        self.requests: list[dict] = []
+
+    async def get(
+        self, url: str, headers: dict[str, str] | None = None
+    ) -> TransportResponse:
+        self.requests.append(headers or {})
+
+        if self.etag and (headers or {}).get("If-None-Match") == self.etag:
+            return TransportResponse(304, "", {"ETag": self.etag}, 0)
+
+        response_headers = {"ETag": self.etag} if self.etag else {}
+
+        return TransportResponse(200, json.dumps(SYSTEM_INFO), response_headers, 100)
+
+
+def run_info_twice(client: EfaClient):
+    async def run():
+        async with client:
+            return await client.info(), await client.info()
+
+    return asyncio.run(run())
+
+
+def test_client_no_url():
+    with pytest.raises(ValueError):
+        EfaClient("")
+
+
+def test_conditional_request_not_modified():
+    transport = EtagTransport()
+    client = EfaClient("http://efa.local", transport=transport)
+
+    first, second = run_info_twice(client)
+
+    assert first == second
+    assert transport.requests[1] == {"If-None-Match": '"v1"'}
+    assert client.transfer_stats.requests == 2
+    assert client.transfer_stats.not_modified == 1
+    assert client.transfer_stats.conditional_saved_bytes == 100
+
+
+def test_conditional_request_without_validators():
+    transport = EtagTransport(etag=None)
+    client = EfaClient("http://efa.local", transport=transport)
+
+    run_info_twice(client)
+
+    assert transport.requests == [{}, {}]
+    assert client.transfer_stats.not_modified == 0
+
+
+def test_conditional_requests_disabled():
+    transport = EtagTransport()
+    client = EfaClient(
+        "http://efa.local", transport=transport, conditional_requests=False
+    )
+
+    run_info_twice(client)
+
+    assert transport.requests == [{}, {}]
+
+
+def test_transfer_stats_compression():
+    client = EfaClient("http://efa.local", transport=EtagTransport(etag=None))
+
+    run_info_twice(client)
+
+    size = len(json.dumps(SYSTEM_INFO).encode("utf-8"))
+
+    assert client.transfer_stats.wire_bytes == 200
+    assert client.transfer_stats.decoded_bytes == 2 * size
+    assert client.transfer_stats.compression_ratio == size / 100
+    assert client.transfer_stats.bytes_saved == 2 * (size - 100)
+
+
+class CountingExecutor(ThreadPoolExecutor):
+    def __init__(self):
+        super().__init__(max_workers=1)
+        self.submitted = 0
+
+    def submit(self, *args, **kwargs):
+        self.submitted += 1
+        return super().submit(*args, **kwargs)
+
+
+@pytest.mark.parametrize("threshold, expected", [(0, 2), (10**6, 0)])
+def test_parse_offloaded_above_threshold(threshold, expected):
+    with CountingExecutor() as executor:
+        client = EfaClient(
+            "http://efa.local",
+            transport=EtagTransport(etag=None),
+            executor=executor,
+            offload_threshold=threshold,
+        )
+
+        first, second = run_info_twice(client)
+
+    assert first.version == second.version == "1.2.3"
+    assert executor.submitted == expected
+
+
+def test_parse_offloaded_to_process_pool():
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        client = EfaClient(
+            "http://efa.local",
+            transport=EtagTransport(etag=None),
+            executor=executor,
+            offload_threshold=0,
+        )
+
+        first, _ = run_info_twice(client)
+
+    assert first.data_format == "EFA10_04_00"
+
+
+def test_offloaded_departures_share_pools():
+    data = departures_response(2)
+    data["stopEvents"][0]["infos"] = [{"id": "info_1", "version": 1}]
+    data["stopEvents"][1]["infos"] = [{"id": "info_1", "version": 1}]
+
+    interner = StopInterner()
+
+    async def run(client: EfaClient):
+        async with client:
+            return [
+                await client.departures("de:09564:704", interner=interner)
+                for _ in range(2)
+            ]
+
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        client = EfaClient(
+            BASE_URL,
+            transport=StaticTransport({"XML_DM_REQUEST": data}),
+            executor=executor,
+            offload_threshold=0,
+        )
+
+        first, second = asyncio.run(run(client))
+
+    assert first[0].destination is second[0].destination
+    assert first[0].infos[0] is second[1].infos[0]
+    assert client.info_index.get("info_1") is first[0].infos[0]
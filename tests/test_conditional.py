@@ -0,0 +1,45 @@
+import pytest
+
+from pyefa.conditional import ConditionalStore
+
+
+def test_put_without_validators():
+    store = ConditionalStore()
+
+    assert not store.put("url", "{}", 2, {"Content-Type": "application/json"})
+    assert store.get("url") is None
+
+
+@pytest.mark.parametrize(
+    "headers, expected",
+    [
+        ({"ETag": '"abc"'}, {"If-None-Match": '"abc"'}),
+        (
+            {"last-modified": "Wed, 27 Nov 2024 21:16:00 GMT"},
+            {"If-Modified-Since": "Wed, 27 Nov 2024 21:16:00 GMT"},
+        ),
+    ],
+)
+def test_put_with_validators(headers, expected):
+    store = ConditionalStore()
+
+    assert store.put("url", "{}", 2, headers)
+    assert store.get("url").validators() == expected
+
+
+def test_put_drops_least_recently_used():
+    store = ConditionalStore(max_entries=2)
+
+    store.put("url1", "{}", 2, {"ETag": "1"})
+    store.put("url2", "{}", 2, {"ETag": "2"})
+    store.get("url1")
+    store.put("url3", "{}", 2, {"ETag": "3"})
+
+    assert len(store) == 2
+    assert store.get("url2") is None
+    assert store.get("url1") is not None
+
+
+def test_invalid_max_entries():
+    with pytest.raises(ValueError):
+        ConditionalStore(max_entries=0)
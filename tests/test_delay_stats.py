@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import json
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from pyefa.data_classes import Departure, Stop, StopType, TransportType
+from pyefa.delay_stats import DelayAggregator, DelayHistogram
+from pyefa.helpers import TZ_INFO
+
+START = datetime(2024, 11, 27, 12, 0, tzinfo=TZ_INFO)
+
+
+def departure(
+    line: str, minutes: int, delay: int | None = 0, cancelled: bool = False
+) -> Departure:
+    planned = START + timedelta(minutes=minutes)
+
+    return Departure(
+        line,
+        "route",
+        Stop("origin", "Origin", StopType.STOP),
+        Stop("dest", "Dest", StopType.STOP),
+        TransportType.BUS,
+        planned,
+        None if delay is None else planned + timedelta(seconds=delay),
+        [],
+        cancelled,
+    )
+
+
+def test_histogram_counts():
+    histogram = DelayHistogram()
+
+    histogram.add(60)
+    histogram.add(-30)
+    histogram.add(None)
+    histogram.add(None, cancelled=True)
+
+    assert histogram.count == 2
+    assert histogram.total == 4
+    assert histogram.mean == 15
+    assert (histogram.min, histogram.max) == (-30, 60)
+    assert histogram.cancellation_rate == 0.25
+
+
+@pytest.mark.parametrize("q", [1, 25, 50, 90, 99, 100])
+def test_histogram_percentile_precision(q):
+    rnd = random.Random(1)
+    delays = [rnd.randint(-120, 3600) for _ in range(5000)]
+
+    histogram = DelayHistogram()
+
+    for delay in delays:
+        histogram.add(delay)
+
+    expected = sorted(delays)[max(0, -(-q * len(delays) // 100) - 1)]
+
+    assert histogram.percentile(q) == pytest.approx(expected, rel=1 / 32, abs=1)
+    assert len(histogram._buckets) < 400
+
+
+def test_histogram_merge_and_serialize():
+    first = DelayHistogram()
+    second = DelayHistogram()
+    combined = DelayHistogram()
+
+    for delay in range(0, 600, 7):
+        (first if delay % 2 else second).add(delay)
+        combined.add(delay)
+
+    second.add(None, cancelled=True)
+    combined.add(None, cancelled=True)
+
+    assert DelayHistogram().merge(first).merge(second) == combined
+    assert DelayHistogram.from_dict(json.loads(json.dumps(combined.to_dict()))) == (
+        combined
+    )
+
+
+def test_aggregator_counts_each_trip_once():
+    aggregator = DelayAggregator(grace=timedelta(minutes=2))
+
+    # same trips seen in several polls with updated estimates
+    aggregator.add("stop", [departure("U1", 5, 0), departure("U1", 15, 0)], START)
+    aggregator.add("stop", [departure("U1", 5, 60), departure("U1", 15, 0)], START)
+
+    assert aggregator.pending == 2
+    assert aggregator.line("U1").total == 0
+
+    assert (
+        aggregator.add("stop", [departure("U1", 15, 120)], START + timedelta(minutes=8))
+        == 1
+    )
+    assert aggregator.line("U1").total == 1
+    assert aggregator.line("U1").mean == 60
+
+    assert aggregator.flush() == 1
+
+    stats = aggregator.stop("stop")
+    assert stats.total == 2
+    assert stats.mean == 90
+
+
+def test_aggregator_buckets_and_cancellations():
+    aggregator = DelayAggregator()
+
+    aggregator.add("a", [departure("U1", 5, 60), departure("4", 70, None, True)])
+    aggregator.add("b", [departure("U1", 10, 0), departure("4", 75, 30)])
+    aggregator.flush()
+
+    assert len(aggregator) == 4
+    assert aggregator.hours() == [START, START + timedelta(hours=1)]
+    assert aggregator.get("4", "a", START + timedelta(minutes=70)).cancelled == 1
+    assert aggregator.line("4").cancellation_rate == 0.5
+    assert aggregator.stop("b").count == 2
+    assert aggregator.total(since=START + timedelta(hours=1)).total == 2
+
+
+def test_aggregator_evicts_old_hours():
+    aggregator = DelayAggregator(max_hours=2)
+
+    aggregator.add("a", [departure("U1", x * 60) for x in range(5)])
+    aggregator.flush()
+
+    assert aggregator.hours() == [
+        START + timedelta(hours=3),
+        START + timedelta(hours=4),
+    ]
+
+
+def test_aggregator_merge_workers():
+    first = DelayAggregator()
+    second = DelayAggregator()
+
+    first.add("a", [departure("U1", 5, 60)])
+    second.add("a", [departure("U1", 10, 120)])
+    second.add("b", [departure("U1", 10, 0)])
+    first.flush()
+    second.flush()
+
+    merged = DelayAggregator.from_dict(json.loads(json.dumps(first.to_dict()))).merge(
+        second
+    )
+
+    assert merged.stop("a").mean == 90
+    assert merged.line("U1").total == 3
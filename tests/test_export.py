@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import json
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from pyefa.data_classes import Departure, Info, Stop, StopType, TransportType
+from pyefa.export import FIELDS, NdjsonSink, ParquetSink, rows
+from pyefa.helpers import TZ_INFO
+
+START = datetime(2024, 11, 27, 12, 0, tzinfo=TZ_INFO)
+
+PYARROW_INSTALLED = importlib.util.find_spec("pyarrow") is not None
+
+
+def departure(line: str, minutes: int, delay: int | None = None) -> Departure:
+    planned = START + timedelta(minutes=minutes)
+
+    return Departure(
+        line,
+        "route",
+        Stop("origin", "Origin", StopType.STOP),
+        Stop("dest", "Nürnberg Dest", StopType.STOP),
+        TransportType.BUS,
+        planned,
+        None if delay is None else planned + timedelta(minutes=delay),
+        [Info("info-1", 1, "disruption")],
+    )
+
+
+def board(size: int) -> list[Departure]:
+    return [departure(f"{x}", x, x % 3 or None) for x in range(size)]
+
+
+def read_ndjson(files) -> list[dict]:
+    return [
+        json.loads(line)
+        for path in files
+        for line in path.read_text(encoding="utf-8").splitlines()
+    ]
+
+
+class SlowSink(NdjsonSink):
+    def _write(self, boards) -> int:
+        time.sleep(0.02)
+        return super()._write(boards)
+
+
+class FailingSink(NdjsonSink):
+    def _write(self, boards) -> int:
+        raise OSError("disk full")
+
+
+def test_ndjson_sink(tmp_path):
+    async def run():
+        async with NdjsonSink(tmp_path, batch_size=10) as sink:
+            await sink.put("de:09564:704", board(6), START)
+            await sink.put("de:09564:510", board(6), START)
+            await sink.put("de:09564:510", [], START)
+
+        return sink
+
+    sink = asyncio.run(run())
+    records = read_ndjson(sink.files)
+
+    assert sink.stats.records == 12
+    assert sink.stats.batches == 1
+    assert sink.stats.bytes_written == sink.files[0].stat().st_size
+    assert [x.name for x in tmp_path.iterdir()] == [sink.files[0].name]
+    assert sink.files[0].suffix == ".ndjson"
+    assert list(records[1]) == list(FIELDS)
+    assert records[1] == {
+        "stop": "de:09564:704",
+        "polled": "2024-11-27T12:00:00+01:00",
+        "line": "1",
+        "route": "route",
+        "transport": 5,
+        "origin_id": "origin",
+        "origin_name": "Origin",
+        "destination_id": "dest",
+        "destination_name": "Nürnberg Dest",
+        "planned": "2024-11-27T12:01:00+01:00",
+        "estimated": "2024-11-27T12:02:00+01:00",
+        "delay": 60,
+        "cancelled": False,
+        "infos": ["info-1"],
+    }
+    assert records[0]["delay"] is None
+
+
+def test_sink_rotates_by_size(tmp_path):
+    async def run():
+        async with NdjsonSink(tmp_path, batch_size=5, max_bytes=1000) as sink:
+            for _ in range(10):
+                await sink.put("de:09564:704", board(5))
+
+        return sink
+
+    sink = asyncio.run(run())
+
+    assert sink.stats.files == len(sink.files) > 1
+    assert len(read_ndjson(sink.files)) == 50
+    assert not list(tmp_path.glob("*.part"))
+
+
+def test_sink_rotates_by_age(tmp_path):
+    async def run():
+        async with NdjsonSink(tmp_path, batch_size=1, max_file_age=0) as sink:
+            for _ in range(3):
+                await sink.put("de:09564:704", board(2))
+                await sink.flush()
+
+        return sink
+
+    assert len(asyncio.run(run()).files) == 3
+
+
+def test_sink_rotates_idle_file_by_age(tmp_path):
+    async def run():
+        async with NdjsonSink(tmp_path, batch_size=1, max_file_age=0.05) as sink:
+            await sink.put("de:09564:704", board(2))
+            await sink.flush()
+            await asyncio.sleep(0.2)
+
+            # completed while the sink is still open
+            return list(sink.files), list(tmp_path.glob("*.part"))
+
+    files, parts = asyncio.run(run())
+
+    assert len(files) == 1
+    assert not parts
+    assert len(read_ndjson(files)) == 2
+
+
+def test_sinks_sharing_directory(tmp_path):
+    async def run():
+        async with (
+            NdjsonSink(tmp_path, batch_size=1) as first,
+            NdjsonSink(tmp_path, batch_size=1) as second,
+        ):
+            await first.put("de:09564:704", board(1))
+            await second.put("de:09564:510", board(1))
+
+        return first.files + second.files
+
+    files = asyncio.run(run())
+
+    assert len(set(files)) == len(list(tmp_path.iterdir())) == 2
+
+
+def test_sink_flushes_partial_batches(tmp_path):
+    async def run():
+        async with NdjsonSink(tmp_path, batch_size=1000, flush_interval=0) as sink:
+            await sink.put("de:09564:704", board(2))
+            await sink.put("de:09564:704", board(2))
+            await sink.flush()
+
+            return sink.stats.batches, sink.stats.records
+
+    assert asyncio.run(run()) == (2, 4)
+
+
+def test_sink_backpressure(tmp_path):
+    async def run():
+        async with SlowSink(tmp_path, batch_size=1, max_pending=1) as sink:
+            for _ in range(10):
+                await sink.put("de:09564:704", board(1))
+
+                # never more batches than max_pending waiting for the writer
+                assert sink._queue.qsize() <= 1
+
+        return sink
+
+    sink = asyncio.run(run())
+
+    assert sink.stats.backpressure_waits > 0
+    assert sink.stats.backpressure_time > 0
+    assert sink.stats.records == 10
+
+
+def test_sink_write_error(tmp_path):
+    async def run():
+        sink = FailingSink(tmp_path, batch_size=1)
+        await sink.open()
+        await sink.put("de:09564:704", board(1))
+
+        with pytest.raises(OSError):
+            await sink.flush()
+
+        with pytest.raises(OSError):
+            await sink.put("de:09564:704", board(1))
+
+        with pytest.raises(OSError):
+            await sink.close()
+
+    asyncio.run(run())
+
+
+def test_sink_not_opened(tmp_path):
+    with pytest.raises(RuntimeError):
+        asyncio.run(NdjsonSink(tmp_path).put("de:09564:704", board(1)))
+
+
+def test_parquet_sink(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    async def run():
+        async with ParquetSink(tmp_path, batch_size=4) as sink:
+            for _ in range(3):
+                await sink.put("de:09564:704", board(4))
+
+        return sink
+
+    sink = asyncio.run(run())
+    table = pq.read_table(sink.files[0])
+
+    assert table.num_rows == 12
+    assert table.column_names == list(FIELDS)
+    assert pq.ParquetFile(sink.files[0]).num_row_groups == 3
+    assert table.column("delay").to_pylist()[:3] == [None, 60, 120]
+    # incl. the footer written on closing
+    assert sink.stats.bytes_written == sink.files[0].stat().st_size
+
+
+def test_parquet_sink_round_trip(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    boards = [
+        ("de:09564:704", START, board(5)),
+        ("de:09564:510", START + timedelta(minutes=1), board(3)),
+    ]
+
+    async def run():
+        async with ParquetSink(tmp_path, batch_size=2) as sink:
+            for stop_id, polled, departures in boards:
+                await sink.put(stop_id, departures, polled)
+
+        return sink
+
+    sink = asyncio.run(run())
+
+    assert pq.read_table(sink.files[0]).to_pylist() == [
+        dict(zip(FIELDS, x)) for x in rows(boards)
+    ]
+
+
+@pytest.mark.skipif(PYARROW_INSTALLED, reason="installed")
+def test_parquet_sink_not_installed(tmp_path):
+    with pytest.raises(ImportError):
+        asyncio.run(ParquetSink(tmp_path).open())
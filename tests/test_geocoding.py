@@ -0,0 +1,115 @@
+import asyncio
+
+import pytest
+
+from pyefa.data_classes import Stop, StopType
+from pyefa.exceptions import EfaConnectionError
+from pyefa.geocoding import BulkResolver, ResolutionStore, normalize_name
+from pyefa.scheduler import Priority, current_priority
+
+
+class FakeClient:
+    def __init__(self, latency: float = 0.01):
+        self.latency = latency
+        self.queries: list[str] = []
+        self.priorities: list[Priority] = []
+        self.active = 0
+        self.max_active = 0
+
+    async def stops(self, name, type="any", filters=None, top_k=None):
+        self.queries.append(name)
+        self.priorities.append(current_priority())
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.active -= 1
+
+        if name == "broken":
+            raise EfaConnectionError("timeout")
+
+        if name == "bug":
+            raise KeyError("stopId")
+
+        if name == "nowhere":
+            return []
+
+        return [Stop(f"id:{normalize_name(name)}", name, StopType.STOP)]
+
+
+@pytest.mark.parametrize(
+    "names",
+    [
+        ["Nürnberg Hbf", "nuernberg  hauptbahnhof ", "NÜRNBERG, HBF"],
+        ["Fürth Rathaus", "Fuerth-Rathaus"],
+        ["Müllerstraße", "muellerstr."],
+        ["Café am Platz", "cafe am pl"],
+        ["Fu\u0308rth Rathaus", "Fürth Rathaus", "fuerth rathaus"],
+    ],
+)
+def test_normalize_name(names):
+    assert len({normalize_name(x) for x in names}) == 1
+
+
+def test_normalize_name_decomposed_umlaut():
+    assert normalize_name("Nu\u0308rnberg") == "nuernberg"
+
+
+def test_normalize_name_keeps_different_stops():
+    assert normalize_name("Plärrer") != normalize_name("Plärrer Nord")
+
+
+def test_resolve_dedupes_and_limits_concurrency():
+    client = FakeClient()
+    resolver = BulkResolver(client, concurrency=3)
+    names = [f"Stop {i % 20}" for i in range(100)] + ["stop 0", "nowhere", " "]
+
+    result = asyncio.run(resolver.resolve(names))
+
+    assert len(client.queries) == 21
+    assert client.max_active == 3
+    assert set(client.priorities) == {Priority.BULK}
+    assert result["stop 0"] == result["Stop 0"] == "id:stop 0"
+    assert result["nowhere"] is None
+    assert result[" "] is None
+    assert resolver.stats.names == 103
+    assert resolver.stats.distinct == 21
+    assert resolver.stats.unresolved == 1
+    assert resolver.stats.hit_rate == 0
+    assert resolver.stats.throughput > 0
+
+
+def test_store_makes_reimport_free(tmp_path):
+    path = tmp_path / "resolutions.sqlite"
+    names = ["Plärrer", "Opernhaus", "nowhere", "broken"]
+
+    first = FakeClient()
+    asyncio.run(BulkResolver(first, ResolutionStore(path)).resolve(names))
+
+    second = FakeClient()
+    resolver = BulkResolver(second, ResolutionStore(path))
+    result = asyncio.run(resolver.resolve(["plaerrer", "OPERNHAUS", "nowhere"]))
+
+    assert second.queries == []
+    assert len(resolver.store) == 3
+    assert result == {
+        "plaerrer": "id:plaerrer",
+        "OPERNHAUS": "id:opernhaus",
+        "nowhere": None,
+    }
+    assert resolver.stats.hit_rate == 1
+
+    # failed lookups are not persisted
+    asyncio.run(resolver.resolve(["broken"]))
+
+    assert second.queries == ["broken"]
+    assert resolver.stats.errors == 1
+
+
+def test_unexpected_lookup_error_raised(tmp_path):
+    resolver = BulkResolver(FakeClient(), ResolutionStore(tmp_path / "store.sqlite"))
+
+    with pytest.raises(KeyError):
+        asyncio.run(resolver.resolve(["bug"]))
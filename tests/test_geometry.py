@@ -0,0 +1,59 @@
+import pytest
+
+from pyefa.geometry import GeometryCache, Polyline
+
+COORDS = [[5648722.0, 1231669.0], [5648730.0, 1231600.0], [5648800.0, 1231550.0]]
+
+
+def test_polyline_roundtrip():
+    polyline = Polyline(COORDS)
+
+    assert len(polyline) == 3
+    assert polyline.coords() == [tuple(x) for x in COORDS]
+    assert polyline.nbytes == 6 * 4
+
+
+def test_polyline_scale():
+    polyline = Polyline([[49.44653, 11.05563], [49.44701, 11.05502]], scale=1e5)
+
+    assert polyline.coords() == pytest.approx(
+        [(49.44653, 11.05563), (49.44701, 11.05502)]
+    )
+
+
+def test_polyline_equality():
+    assert Polyline(COORDS) == Polyline(COORDS)
+    assert hash(Polyline(COORDS)) == hash(Polyline(COORDS))
+    assert Polyline(COORDS) != Polyline(COORDS[:2])
+    assert Polyline(COORDS) != Polyline(COORDS, scale=10)
+    assert Polyline(COORDS) != COORDS
+
+
+def test_cache_shares_polyline_by_route():
+    cache = GeometryCache()
+
+    first = cache.get(("U3", ("a", "b")), COORDS)
+    second = cache.get(("U3", ("a", "b")), [])
+
+    assert first is second
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_cache_interns_equal_polylines():
+    cache = GeometryCache()
+
+    first = cache.get("route1", COORDS)
+    second = cache.get("route2", [list(x) for x in COORDS])
+
+    assert first is second
+    assert len(cache) == 2
+
+
+def test_cache_bounded():
+    cache = GeometryCache(max_routes=2)
+
+    for i in range(10):
+        cache.get(i, [[i, i]])
+
+    assert len(cache) == 2
+    assert len(cache._polylines) <= 4
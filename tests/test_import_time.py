@@ -0,0 +1,75 @@
+import os
+import re
+import subprocess
+import sys
+
+import pytest
+
+# cumulative import time of pyefa incl. EfaClient, the eager package took > 300 ms
+IMPORT_TIME_LIMIT_US = int(os.environ.get("PYEFA_IMPORT_TIME_LIMIT_US", "150000"))
+
+HEAVY_MODULES = ["aiohttp", "voluptuous", "pyefa.requests.schemas"]
+
+
+def run_python(code: str, *args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *args, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def import_time_us(code: str) -> int:
+    """Return cumulative import time of all top level pyefa imports in `code`."""
+    output = run_python(code, "-X", "importtime").stderr
+
+    pattern = re.compile(r"import time:\s+\d+ \|\s+(\d+) \| (pyefa\S*)$")
+
+    return sum(
+        int(match.group(1))
+        for match in map(pattern.match, output.splitlines())
+        if match
+    )
+
+
+@pytest.mark.parametrize(
+    "code", ["import pyefa", "from pyefa import EfaClient, Stop, StopFilter"]
+)
+def test_import_does_not_load_heavy_modules(code):
+    output = run_python(
+        f"import sys; {code}; print(','.join(x for x in {HEAVY_MODULES!r} if x in sys.modules))"
+    ).stdout
+
+    assert output.strip() == ""
+
+
+def test_schemas_built_on_first_use():
+    output = run_python(
+        "import sys; from pyefa.requests import DeparturesRequest; req = DeparturesRequest('x');"
+        "schemas = vars(sys.modules['pyefa.requests.schemas']);"
+        "print('SCHEMA_LOCATION' in schemas); req._get_response_schema();"
+        "print('SCHEMA_LOCATION' in schemas)"
+    ).stdout
+
+    assert output.split() == ["False", "True"]
+
+
+def test_unknown_attribute():
+    import pyefa
+    import pyefa.requests
+
+    with pytest.raises(AttributeError):
+        _ = pyefa.Unknown
+
+    with pytest.raises(AttributeError):
+        _ = pyefa.requests.Unknown
+
+    assert "EfaClient" in dir(pyefa)
+
+
+def test_import_time_regression():
+    # best of several runs to reduce noise of the test machine
+    best = min(import_time_us("import pyefa; import pyefa.client") for _ in range(5))
+
+    assert best < IMPORT_TIME_LIMIT_US, f"import pyefa took {best} us"
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+
+from pyefa import EfaClient
+from pyefa.exceptions import EfaResponseInvalid
+from pyefa.infos import InfoIndex
+from pyefa.requests.parsers import parse_info
+from pyefa.transport import Transport, TransportResponse
+from tests.requests.test_req_add_info import INFO, response
+
+
+def test_intern_shares_messages():
+    index = InfoIndex()
+
+    first = index.intern({"id": "a", "version": 1})
+
+    assert index.intern({"id": "a", "version": 1}) is first
+    assert index.intern({"id": "a", "version": 2}) is not first
+    assert len(index) == 0
+
+
+def test_intern_bounded():
+    index = InfoIndex(max_infos=2)
+
+    for i in range(5):
+        index.intern({"id": str(i), "version": 1})
+
+    assert index.get("0") is None
+    assert index.get("4") is not None
+
+
+@pytest.mark.parametrize(
+    "info",
+    [
+        {"version": 1},
+        {"id": "a", "timestamps": {"availability": {"from": "tomorrow"}}},
+        {"id": "a", "infoLinks": ["link"]},
+        {"id": "a", "affected": {"lines": "U2"}},
+        "info",
+    ],
+)
+def test_intern_invalid(info):
+    index = InfoIndex()
+
+    with pytest.raises(EfaResponseInvalid):
+        index.intern(info)
+
+    assert index.get("a") is None
+
+
+def test_intern_without_id_not_pooled():
+    index = InfoIndex()
+
+    first = index.intern({"id": "", "version": 1})
+
+    assert index.intern({"id": "", "version": 1}) is not first
+    assert index.get("") is None
+
+
+def test_update_changes_and_lookup():
+    index = InfoIndex()
+    info = parse_info(INFO)
+    other = parse_info(dict(INFO, id="other", affected={}))
+
+    changes = index.update([info, other])
+
+    assert changes.added == [info, other]
+    assert index.for_line("vgn:11002: :H:j24") == [info]
+    assert index.for_stop("de:09564:704") == [info]
+
+    changed = parse_info(dict(INFO, version=3, affected={"stops": [{"id": "s2"}]}))
+    changes = index.update([changed])
+
+    assert changes.changed == [changed]
+    assert changes.removed == [other]
+    assert index.for_line("vgn:11002: :H:j24") == []
+    assert index.for_stop("s2") == [changed]
+    assert "other" not in index
+
+    assert not index.update([changed])
+
+
+class InfoTransport(Transport):
+    def __init__(self):
+        self.infos = [INFO]
+
+    async def get(
+        self, url: str, headers: dict[str, str] | None = None
+    ) -> TransportResponse:
+        return TransportResponse(200, json.dumps(response(*self.infos)), {}, 100)
+
+
+def test_client_sync_infos():
+    async def run():
+        transport = InfoTransport()
+
+        async with EfaClient("http://efa.local", transport=transport) as client:
+            first = await client.sync_infos()
+            second = await client.sync_infos()
+
+            transport.infos = []
+            third = await client.sync_infos()
+
+        return client, first, second, third
+
+    client, first, second, third = asyncio.run(run())
+
+    assert [x.id for x in first.added] == ["vgn_info_1"]
+    assert not second
+    assert [x.id for x in third.removed] == ["vgn_info_1"]
+    assert len(client.info_index) == 0
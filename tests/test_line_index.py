@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+
+from pyefa.data_classes import Line, Stop, StopType, TransportType
+from pyefa.line_index import LineIndex
+
+
+def stop(id: str) -> Stop:
+    return Stop(id, id.title(), StopType.STOP)
+
+
+def line(id: str, number: str, product=TransportType.TRAM) -> Line:
+    return Line(id, f"Tram {number}", number, "", product, stop("a"), stop("c"))
+
+
+class MockClient:
+    def __init__(self):
+        self.requests = []
+
+    async def serving_lines(self, stop_id: str) -> list[Line]:
+        self.requests.append(stop_id)
+        return [line("4:h", "4"), line("4:r", "4")]
+
+    async def line_stops(self, line_id: str) -> list[Stop]:
+        self.requests.append(line_id)
+        stops = [stop("a"), stop("b"), stop("c")]
+        return stops if line_id.endswith(":h") else stops[::-1]
+
+
+@pytest.fixture
+def index() -> LineIndex:
+    index = LineIndex()
+
+    index.add_serving_lines(
+        "b", [line("4:h", "4"), line("U1", "U1", TransportType.SUBWAY)]
+    )
+    index.add_line_stops("4:h", [stop("a"), stop("b"), stop("c")])
+    index.add_line_stops("U1", [stop("b"), stop("d")])
+
+    return index
+
+
+def test_lines_at(index: LineIndex):
+    assert [x.id for x in index.lines_at("b")] == ["4:h", "U1"]
+    assert [x.id for x in index.lines_at(stop("d"))] == ["U1"]
+    assert index.lines_at("unknown") == []
+
+
+def test_stops_of(index: LineIndex):
+    assert [x.id for x in index.stops_of("4")] == ["a", "b", "c"]
+    assert [x.id for x in index.stops_of("U1")] == ["b", "d"]
+    assert index.stops_of("unknown") == []
+
+
+def test_serving_lines_keep_line_stops(index: LineIndex):
+    index.add_serving_lines("b", [line("5", "5")])
+
+    assert [x.id for x in index.lines_at("b")] == ["4:h", "5", "U1"]
+    assert [x.id for x in index.stops_of("U1")] == ["b", "d"]
+
+    # line stops replace the stops of a line at all its previous stops
+    index.add_line_stops("U1", [stop("d")])
+    index.add_serving_lines("b", [])
+
+    assert [x.id for x in index.lines_at("b")] == ["4:h"]
+
+
+def test_lines_by_product(index: LineIndex):
+    assert [x.id for x in index.lines_by_product(TransportType.SUBWAY)] == ["U1"]
+
+
+def test_lines_share_stops(index: LineIndex):
+    index.add_lines([line("5", "5")])
+
+    assert index.lines["5"].origin is index.lines["4:h"].origin
+
+
+def test_save_load(index: LineIndex, tmp_path):
+    index.save(tmp_path / "index.json")
+
+    loaded = LineIndex.load(tmp_path / "index.json")
+
+    assert loaded.lines == index.lines
+    assert [x.id for x in loaded.stops_of("4")] == ["a", "b", "c"]
+    assert [x.id for x in loaded.lines_at("b")] == ["4:h", "U1"]
+    assert loaded.stale_lines(3600) == []
+
+
+def test_load_invalid_version(tmp_path):
+    (tmp_path / "index.json").write_text('{"version": 0}')
+
+    with pytest.raises(ValueError):
+        LineIndex.load(tmp_path / "index.json")
+
+
+def test_refresh_incremental():
+    index = LineIndex()
+    client = MockClient()
+
+    requests = asyncio.run(index.refresh(client, ["b", "b"]))
+
+    assert requests == 3
+    assert client.requests == ["b", "4:h", "4:r"]
+    assert [x.id for x in index.stops_of("4")] == ["a", "b", "c"]
+
+    # nothing outdated - no further requests
+    assert asyncio.run(index.refresh(client, ["b"])) == 0
+    assert asyncio.run(index.refresh(client, max_age=-1)) == 3
@@ -0,0 +1,95 @@
+from datetime import datetime, timedelta
+
+from pyefa.data_classes import Departure, Stop, StopType, TransportType
+from pyefa.merge import DepartureMerger, StopInterner, merge_departures, trip_key
+
+START = datetime(2024, 11, 27, 12, 0)
+
+
+def departure(line: str, minutes: int, destination: str = "dest") -> Departure:
+    return Departure(
+        line,
+        "route",
+        Stop("origin", "Origin", StopType.STOP),
+        Stop(destination, destination.title(), StopType.STOP),
+        TransportType.BUS,
+        START + timedelta(minutes=minutes),
+        None,
+        [],
+    )
+
+
+def test_trip_key():
+    assert trip_key(departure("U1", 5)) == trip_key(departure("U1", 5))
+    assert trip_key(departure("U1", 5)) != trip_key(departure("U1", 6))
+    assert trip_key(departure("U1", 5)) != trip_key(departure("U1", 5, "other"))
+
+
+def test_interner_shares_instances():
+    interner = StopInterner()
+
+    stop = interner.get("id", "name", StopType.STOP)
+
+    assert interner.get("id", "name", StopType.STOP) is stop
+    assert interner.intern(Stop("id", "name", StopType.STOP)) is stop
+    assert interner.get("id", "name", StopType.PLATFORM) is not stop
+    assert len(interner) == 2
+
+
+def test_merge_departures_dedup_and_sort():
+    platform_1 = [departure("U1", 1), departure("U1", 11), departure("U1", 21)]
+    platform_2 = [departure("4", 5), departure("4", 15)]
+    parent = [departure("U1", 11), departure("4", 5), departure("U1", 31)]
+
+    board = merge_departures(platform_1, platform_2, parent)
+
+    assert [x.planned_time for x in board] == sorted(x.planned_time for x in board)
+    assert [(x.line_name, x.planned_time.minute) for x in board] == [
+        ("U1", 1),
+        ("4", 5),
+        ("U1", 11),
+        ("4", 15),
+        ("U1", 21),
+        ("U1", 31),
+    ]
+
+
+def test_merger_interns_stops():
+    merger = DepartureMerger()
+
+    merger.add([departure("U1", 1), departure("U1", 2)])
+    merger.add([departure("U1", 2), departure("U1", 3)])
+
+    board = merger.board()
+
+    assert len(merger) == 3
+    assert len(board) == 3
+    assert len(merger.interner) == 2
+    assert board[0].origin is board[2].origin
+
+
+def test_merger_board_repeated_calls():
+    merger = DepartureMerger()
+
+    assert merger.board() == []
+
+    merger.add([departure("U1", 10)])
+    merger.add([departure("U1", 5)])
+
+    assert merger.board() == merger.board()
+    assert merger.add([departure("U1", 5)]) == 0
+
+
+def test_merger_uses_provided_empty_interner():
+    interner = StopInterner()
+
+    assert DepartureMerger(interner).interner is interner
+
+
+def test_merger_custom_key():
+    merger = DepartureMerger(key=lambda x: (x.line_name, x.planned_time))
+
+    merger.add([departure("U1", 1), departure("U1", 2)])
+
+    assert merger.add([departure("U1", 1, "other"), departure("U2", 1)]) == 1
+    assert len(merger.board()) == 3
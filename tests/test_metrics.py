@@ -0,0 +1,58 @@
+import asyncio
+import time
+
+import pytest
+
+from pyefa.metrics import LoopLagMonitor, TransferStats
+
+
+def test_transfer_stats_empty():
+    stats = TransferStats()
+
+    assert stats.compression_ratio == 1.0
+    assert stats.bytes_saved == 0
+
+
+def test_transfer_stats():
+    stats = TransferStats()
+
+    stats.add_response(100, 400)
+    stats.add_not_modified(0, 100)
+
+    assert stats.requests == 2
+    assert stats.not_modified == 1
+    assert stats.compression_ratio == 4.0
+    assert stats.bytes_saved == 400
+
+
+def test_loop_lag_monitor_detects_blocking():
+    async def run():
+        async with LoopLagMonitor(interval=0.001) as monitor:
+            await asyncio.sleep(0.01)
+            # blocks the loop on purpose
+            time.sleep(0.05)  # noqa: ASYNC251
+            await asyncio.sleep(0.01)
+
+        return monitor
+
+    monitor = asyncio.run(run())
+
+    assert monitor.count > 1
+    assert monitor.max >= 0.04
+    assert monitor.percentile(100) == monitor.max
+    assert 0 < monitor.mean <= monitor.max
+
+
+def test_loop_lag_monitor_no_samples():
+    monitor = LoopLagMonitor()
+
+    assert monitor.mean == 0
+    assert monitor.percentile(99) == 0
+
+
+@pytest.mark.parametrize("q", [0, 50, 99])
+def test_loop_lag_monitor_percentile_bounds(q):
+    monitor = LoopLagMonitor()
+    monitor._samples.extend([0.1, 0.2, 0.3])
+
+    assert 0.1 <= monitor.percentile(q) <= 0.3
@@ -0,0 +1,128 @@
+import asyncio
+import datetime
+
+import pytest
+
+from pyefa.exceptions import EfaConnectionError
+from pyefa.helpers import TZ_INFO
+from pyefa.od_matrix import ODMatrixPlanner, time_bucket
+from pyefa.requests.req_trips import TripRequest
+from pyefa.scheduler import Priority, current_priority
+from tests.requests.test_req_trips import response
+
+DATE = datetime.datetime(2024, 11, 27, 12, 7, tzinfo=TZ_INFO)
+
+
+class FakeClient:
+    def __init__(self):
+        self.queries: list[tuple[str, str, str]] = []
+        self.priorities: list[Priority] = []
+        self.active = 0
+        self.max_active = 0
+
+    async def trip(self, origin, destination, date=None):
+        self.queries.append((origin, destination, date))
+        self.priorities.append(current_priority())
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+
+        try:
+            await asyncio.sleep(0.01)
+        finally:
+            self.active -= 1
+
+        if destination == "broken":
+            raise EfaConnectionError("timeout")
+
+        if destination == "bug":
+            raise KeyError("legs")
+
+        if destination == "island":
+            return []
+
+        return TripRequest(origin, destination).parse(response(origin, destination))
+
+
+def test_time_bucket():
+    assert time_bucket(DATE, datetime.timedelta(minutes=15)) == DATE.replace(minute=0)
+    assert time_bucket(
+        DATE.replace(minute=59), datetime.timedelta(minutes=30)
+    ) == DATE.replace(minute=30)
+
+
+def test_matrix_values_and_concurrency():
+    client = FakeClient()
+    planner = ODMatrixPlanner(client, concurrency=2)
+    origins = ["a", "b", "c", "a"]
+    destinations = ["a", "x", "y", "island", "broken"]
+
+    matrix = asyncio.run(planner.matrix(origins, destinations, DATE))
+
+    assert matrix.shape == (3, 5)
+    assert len(client.queries) == 14
+    assert client.max_active == 2
+    assert set(client.priorities) == {Priority.BULK}
+    assert {x[2] for x in client.queries} == {"20241127 12:00"}
+    assert matrix.duration("a", "a") == datetime.timedelta(0)
+    assert matrix.duration("b", "x") == datetime.timedelta(minutes=23)
+    assert matrix.transfer_count("b", "x") == 1
+    assert matrix.duration("c", "island") is None
+    assert matrix.transfer_count("a", "broken") is None
+    assert matrix.rows()[0] == [0, 1380, 1380, -1, -1]
+    assert planner.stats.errors == 3
+
+
+def test_matrix_unexpected_error_raised():
+    planner = ODMatrixPlanner(FakeClient())
+
+    with pytest.raises(KeyError):
+        asyncio.run(planner.matrix(["a"], ["bug"], DATE))
+
+
+def test_matrix_utc_date():
+    client = FakeClient()
+    planner = ODMatrixPlanner(client)
+    date = DATE.astimezone(datetime.timezone.utc)
+
+    matrix = asyncio.run(planner.matrix(["b"], ["x"], date))
+
+    assert [x[2] for x in client.queries] == ["20241127 12:00"]
+    assert matrix.duration("b", "x") == datetime.timedelta(minutes=23)
+
+    # same bucket as the local time, served from the cache
+    asyncio.run(planner.matrix(["b"], ["x"], DATE))
+
+    assert len(client.queries) == 1
+
+
+@pytest.mark.parametrize("symmetric, queries", [(False, 6), (True, 3)])
+def test_matrix_symmetric_pairs(symmetric, queries):
+    client = FakeClient()
+    planner = ODMatrixPlanner(client, symmetric=symmetric)
+    stops = ["a", "b", "c"]
+
+    matrix = asyncio.run(planner.matrix(stops, stops, DATE))
+
+    assert len(client.queries) == queries
+    assert matrix.duration("b", "a") == matrix.duration("a", "b")
+
+
+def test_matrix_cached_by_time_bucket():
+    client = FakeClient()
+    planner = ODMatrixPlanner(client, bucket=datetime.timedelta(minutes=15))
+
+    async def run():
+        await planner.matrix(["a"], ["x", "broken"], DATE)
+        await planner.matrix(["a"], ["x", "broken"], DATE.replace(minute=14))
+        await planner.matrix(["a"], ["x"], DATE.replace(minute=15))
+
+    asyncio.run(run())
+
+    # failed pairs are queried again
+    assert [x[1:] for x in client.queries] == [
+        ("x", "20241127 12:00"),
+        ("broken", "20241127 12:00"),
+        ("broken", "20241127 12:00"),
+        ("x", "20241127 12:15"),
+    ]
+    assert planner.stats.cache_hits == 1
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from pyefa.data_classes import Departure, Stop, StopType, TransportType
+from pyefa.helpers import TZ_INFO
+from pyefa.paging import DepartureWindows, WindowCache, format_datetime
+
+START = datetime(2024, 11, 27, 12, 0, tzinfo=TZ_INFO)
+
+
+class MockBoard:
+    """Departures every `interval` minutes, answering like XML_DM_REQUEST."""
+
+    def __init__(self, interval: int = 2, per_minute: int = 1):
+        self.interval = interval
+        self.per_minute = per_minute
+        self.requests: list[tuple[int, str]] = []
+
+    async def fetch(self, stop: str, limit: int, date: str) -> list[Departure]:
+        self.requests.append((limit, date))
+
+        start = datetime.strptime(date, "%Y%m%d %H:%M").replace(tzinfo=TZ_INFO)
+        minute = -(-int((start - START).total_seconds() // 60) // self.interval)
+
+        departures = []
+
+        while len(departures) < limit:
+            planned = START + timedelta(minutes=minute * self.interval)
+
+            for i in range(self.per_minute):
+                departures.append(
+                    Departure(
+                        str(i),
+                        "route",
+                        Stop("o", "O", StopType.STOP),
+                        Stop("d", "D", StopType.STOP),
+                        TransportType.BUS,
+                        planned,
+                        None,
+                        [],
+                    )
+                )
+            minute += 1
+
+        return departures[:limit]
+
+
+def collect(windows: DepartureWindows, count: int | None = None) -> list[Departure]:
+    async def run():
+        result = []
+
+        async for departure in windows:
+            result.append(departure)
+
+            if count is not None and len(result) == count:
+                break
+
+        return result
+
+    return asyncio.run(run())
+
+
+def test_format_datetime():
+    assert format_datetime(START) == "20241127 12:00"
+
+
+def test_windows_cover_horizon_without_duplicates():
+    board = MockBoard(interval=2)
+    windows = DepartureWindows(
+        board.fetch, "stop", START, timedelta(minutes=10), timedelta(hours=1), 3
+    )
+
+    departures = collect(windows)
+
+    times = [x.planned_time for x in departures]
+
+    assert len(times) == 30
+    assert times == sorted(set(times))
+    assert times[0] == START
+    assert times[-1] == START + timedelta(minutes=58)
+
+
+def test_windows_fetched_lazily():
+    board = MockBoard(interval=2)
+    windows = DepartureWindows(
+        board.fetch, "stop", START, timedelta(minutes=10), timedelta(hours=3), 10
+    )
+
+    departures = collect(windows, count=3)
+
+    assert len(departures) == 3
+    assert board.requests == [(10, "20241127 12:00")]
+
+
+def test_window_paging_many_departures_per_minute():
+    board = MockBoard(interval=1, per_minute=5)
+    windows = DepartureWindows(
+        board.fetch, "stop", START, timedelta(minutes=2), timedelta(minutes=2), 3
+    )
+
+    departures = collect(windows)
+
+    assert len(departures) == 10
+    assert len({(x.line_name, x.planned_time) for x in departures}) == 10
+
+
+def test_windows_served_from_cache():
+    board = MockBoard()
+    cache = WindowCache()
+
+    for _ in range(2):
+        windows = DepartureWindows(
+            board.fetch,
+            "stop",
+            START,
+            timedelta(minutes=10),
+            timedelta(minutes=20),
+            10,
+            cache,
+        )
+        collect(windows)
+
+    assert len(cache) == 2
+    assert len(board.requests) == 2
+
+
+def test_window_cache_limits():
+    cache = WindowCache(max_windows=1, ttl=0)
+
+    cache.put("stop", START, timedelta(minutes=1), [])
+    cache.put("stop", START + timedelta(minutes=1), timedelta(minutes=1), [])
+
+    assert len(cache) == 1
+    assert cache.get("stop", START, timedelta(minutes=1)) is None
+
+
+@pytest.mark.parametrize(
+    "window, limit",
+    [(timedelta(0), 10), (timedelta(minutes=-1), 10), (timedelta(minutes=1), 0)],
+)
+def test_windows_invalid_args(window, limit):
+    with pytest.raises(ValueError):
+        DepartureWindows(
+            MockBoard().fetch, "stop", START, window, timedelta(hours=1), limit
+        )
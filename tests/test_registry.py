@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import asyncio
+import datetime
+import json
+import time
+
+import pytest
+
+from pyefa import EfaClient
+from pyefa.exceptions import EfaParameterError
+from pyefa.registry import EndpointRegistry
+from pyefa.transport import Transport, TransportResponse
+from tests.benchmarks.responses import (
+    StaticTransport,
+    departures_response,
+    stop_finder_response,
+)
+
+SYSTEM_INFO = {
+    "version": "1.2.3",
+    "ptKernel": {"dataFormat": "EFA10", "dataBuild": "build", "appVersion": "v"},
+    "validity": {"from": "2024-11-01", "to": "2099-01-01"},
+}
+
+
+class MockTransport(Transport):
+    def __init__(self, status: int = 200, latency: float = 0):
+        self.status = status
+        self.latency = latency
+        self.requests = 0
+
+    async def get(
+        self, url: str, headers: dict[str, str] | None = None
+    ) -> TransportResponse:
+        self.requests += 1
+
+        await asyncio.sleep(self.latency)
+
+        if "XML_SYSTEMINFO_REQUEST" in url:
+            return TransportResponse(self.status, json.dumps(SYSTEM_INFO))
+
+        return TransportResponse(404, "")
+
+
+def client(transport: Transport) -> EfaClient:
+    return EfaClient("http://efa.local", transport=transport)
+
+
+@pytest.fixture
+def registry() -> EndpointRegistry:
+    registry = EndpointRegistry(
+        probes={"serving_lines": lambda client, stops: client.serving_lines(stops[0])}
+    )
+
+    registry.register("bavaria", client(MockTransport()), ["de:09"])
+    registry.register("vgn", client(MockTransport()), ["de:09564:", "de:09562:"])
+    registry.register("vrr", client(MockTransport(status=503)), ["de:05"])
+
+    return registry
+
+
+@pytest.mark.parametrize(
+    "stop_id, expected",
+    [("de:09564:704", "vgn"), ("de:09562:1", "vgn"), ("de:09162:1", "bavaria")],
+)
+def test_endpoint_for(registry: EndpointRegistry, stop_id, expected):
+    assert registry.endpoint_for(stop_id).name == expected
+
+
+def test_endpoint_for_unknown(registry: EndpointRegistry):
+    with pytest.raises(EfaParameterError):
+        registry.client_for("at:1:1")
+
+
+def test_register_twice(registry: EndpointRegistry):
+    with pytest.raises(ValueError):
+        registry.register("vgn", "http://efa.local")
+
+
+def test_probe(registry: EndpointRegistry):
+    async def run():
+        async with registry:
+            return await registry.probe()
+
+    assert len(asyncio.run(run())) == 3
+
+    vgn = registry.endpoints["vgn"]
+    vrr = registry.endpoints["vrr"]
+
+    assert vgn.info.version == "1.2.3"
+    assert vgn.capabilities == {"system_info"}
+    # no stops found, feature probes are skipped
+    assert vgn.unsupported == {"stop_finder"}
+    assert vgn.is_valid()
+    assert not vgn.is_valid(datetime.date(2100, 1, 1))
+    assert vrr.info is None
+    assert vrr.error
+    assert registry.with_capability("system_info") == [
+        registry.endpoints["bavaria"],
+        vgn,
+    ]
+
+
+class PartialTransport(StaticTransport):
+    """Endpoint answering only the requests of `responses`, others with 404."""
+
+    async def get(
+        self, url: str, headers: dict[str, str] | None = None
+    ) -> TransportResponse:
+        if url.split("/")[-1].split("?")[0] not in self._responses:
+            return TransportResponse(404, "<html>Not found</html>")
+
+        return await super().get(url, headers)
+
+
+def test_probe_capabilities():
+    registry = EndpointRegistry()
+    endpoint = registry.register(
+        "vgn",
+        client(
+            PartialTransport(
+                {
+                    "XML_SYSTEMINFO_REQUEST": SYSTEM_INFO,
+                    "XML_STOPFINDER_REQUEST": stop_finder_response(2),
+                    "XML_DM_REQUEST": departures_response(1),
+                }
+            )
+        ),
+    )
+
+    async def run():
+        async with registry:
+            await registry.probe()
+
+    asyncio.run(run())
+
+    assert endpoint.capabilities == {"system_info", "stop_finder", "exclMOT", "coord"}
+    assert endpoint.unsupported == {"serving_lines", "add_info", "trip"}
+    assert endpoint.error is None
+
+
+def test_probe_unexpected_error_raised():
+    registry = EndpointRegistry(probes={})
+    registry.register("vgn", client(MockTransport()))
+
+    async def failing_info():
+        raise RuntimeError("bug")
+
+    registry.endpoints["vgn"].client.info = failing_info
+
+    async def run():
+        async with registry:
+            await registry.probe()
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(run())
+
+
+def test_probe_skips_valid_endpoints(registry: EndpointRegistry):
+    async def run():
+        async with registry:
+            await registry.probe()
+            return await registry.probe()
+
+    assert [x.name for x in asyncio.run(run())] == ["vrr"]
+
+
+def test_probe_concurrently():
+    registry = EndpointRegistry(probes={})
+
+    for i in range(10):
+        registry.register(str(i), client(MockTransport(latency=0.1)))
+
+    async def run():
+        async with registry:
+            await registry.probe()
+
+    start = time.perf_counter()
+    asyncio.run(run())
+
+    assert time.perf_counter() - start < 0.5
+
+
+def test_save_load(registry: EndpointRegistry, tmp_path):
+    async def run():
+        async with registry:
+            await registry.probe()
+
+    asyncio.run(run())
+    registry.save(tmp_path / "endpoints.json")
+
+    loaded = EndpointRegistry()
+    loaded.register("vgn", "http://efa.local")
+    loaded.register("vrr", "http://efa.local")
+    loaded.load(tmp_path / "endpoints.json")
+
+    assert loaded.endpoints["vgn"].info == registry.endpoints["vgn"].info
+    assert loaded.endpoints["vgn"].capabilities == {"system_info"}
+    assert loaded.endpoints["vgn"].unsupported == {"stop_finder"}
+    assert loaded.endpoints["vrr"].info is None
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+
+from pyefa import EfaClient
+from pyefa.scheduler import Priority, RequestScheduler, current_priority, priority
+from pyefa.transport import Transport, TransportResponse
+from tests.test_client import SYSTEM_INFO
+
+
+class GatedTransport(Transport):
+    """Transport holding every request until `gate` is set."""
+
+    def __init__(self):
+        self.gate = asyncio.Event()
+        self.order: list[Priority] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def get(
+        self, url: str, headers: dict[str, str] | None = None
+    ) -> TransportResponse:
+        self.order.append(current_priority())
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+        await self.gate.wait()
+
+        self.in_flight -= 1
+
+        return TransportResponse(200, json.dumps(SYSTEM_INFO), {}, 100)
+
+
+def test_priority_context():
+    assert current_priority() == Priority.NORMAL
+
+    with priority(Priority.BULK):
+        assert current_priority() == Priority.BULK
+
+    assert current_priority() == Priority.NORMAL
+
+
+def test_scheduler_invalid_concurrency():
+    with pytest.raises(ValueError):
+        RequestScheduler(0)
+
+
+def test_scheduler_serves_higher_priority_first():
+    async def run():
+        scheduler = RequestScheduler(1)
+        order = []
+
+        async def job(value: Priority, name: str):
+            async with scheduler.slot(value):
+                order.append(name)
+                await asyncio.sleep(0)
+
+        await scheduler.acquire(Priority.NORMAL)
+
+        tasks = [
+            asyncio.create_task(job(Priority.BULK, "bulk 1")),
+            asyncio.create_task(job(Priority.BULK, "bulk 2")),
+            asyncio.create_task(job(Priority.NORMAL, "normal")),
+            asyncio.create_task(job(Priority.INTERACTIVE, "interactive")),
+        ]
+        await asyncio.sleep(0)
+
+        assert scheduler.queued == 4
+
+        scheduler.release(Priority.NORMAL)
+        await asyncio.gather(*tasks)
+
+        return scheduler, order
+
+    scheduler, order = asyncio.run(run())
+
+    assert order == ["interactive", "normal", "bulk 1", "bulk 2"]
+    assert scheduler.active == 0
+    assert scheduler.queued == 0
+    assert scheduler.stats[Priority.BULK].completed == 2
+    assert scheduler.stats[Priority.BULK].max_wait_time > 0
+
+
+def test_scheduler_cancelled_waiter():
+    async def run():
+        scheduler = RequestScheduler(1)
+
+        await scheduler.acquire(Priority.BULK)
+
+        task = asyncio.create_task(scheduler.acquire(Priority.INTERACTIVE))
+        await asyncio.sleep(0)
+
+        assert scheduler.stats[Priority.INTERACTIVE].queued == 1
+
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+        scheduler.release(Priority.BULK)
+
+        return scheduler
+
+    scheduler = asyncio.run(run())
+
+    assert scheduler.active == 0
+    assert scheduler.queued == 0
+
+
+def test_client_bulk_leaves_slots_for_interactive():
+    async def run():
+        transport = GatedTransport()
+        scheduler = RequestScheduler(4, {Priority.BULK: 2})
+        client = EfaClient("http://efa.local", transport=transport, scheduler=scheduler)
+
+        async def bulk():
+            with priority(Priority.BULK):
+                return await client.info()
+
+        async def interactive():
+            with priority(Priority.INTERACTIVE):
+                return await client.info()
+
+        async with client:
+            bulk_tasks = [asyncio.create_task(bulk()) for _ in range(6)]
+            await asyncio.sleep(0)
+
+            interactive_tasks = [asyncio.create_task(interactive()) for _ in range(2)]
+            await asyncio.sleep(0)
+
+            # bulk requests use their quota only, interactive ones are not queued
+            assert transport.in_flight == 4
+            assert scheduler.stats[Priority.BULK].queued == 4
+            assert scheduler.stats[Priority.INTERACTIVE].queued == 0
+
+            transport.gate.set()
+            await asyncio.gather(*bulk_tasks, *interactive_tasks)
+
+        return transport, scheduler
+
+    transport, scheduler = asyncio.run(run())
+
+    assert transport.max_in_flight == 4
+    assert transport.order.count(Priority.INTERACTIVE) == 2
+    assert scheduler.stats[Priority.BULK].completed == 6
+    assert scheduler.stats[Priority.INTERACTIVE].max_wait_time < 0.1
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+
+import aiohttp
+import pytest
+
+from pyefa import EfaClient
+from pyefa.__main__ import create_parser
+from pyefa.exceptions import EfaResponseInvalid
+from pyefa.server import ProxyServer, TokenBucket
+from pyefa.transport import Transport, TransportResponse
+from tests.benchmarks.loadtest import run_load
+from tests.test_client import SYSTEM_INFO
+
+INFO_PATH = "XML_SYSTEMINFO_REQUEST?outputFormat=rapidJSON&coordOutputFormat=WGS84"
+
+
+class UpstreamTransport(Transport):
+    def __init__(
+        self,
+        status: int = 200,
+        latency: float = 0.05,
+        error: Exception | None = None,
+    ):
+        self.status = status
+        self.latency = latency
+        self.error = error
+        self.urls: list[str] = []
+
+    async def get(
+        self, url: str, headers: dict[str, str] | None = None
+    ) -> TransportResponse:
+        self.urls.append(url)
+
+        await asyncio.sleep(self.latency)
+
+        if self.error is not None:
+            raise self.error
+
+        return TransportResponse(self.status, json.dumps(SYSTEM_INFO))
+
+
+async def with_proxy(transport: Transport, run, **kwargs):
+    proxy = ProxyServer(
+        EfaClient("http://efa.local/efa/", transport=transport), **kwargs
+    )
+    port = await proxy.start("127.0.0.1", 0)
+
+    try:
+        async with aiohttp.ClientSession() as session:
+            return proxy, await run(session, f"http://127.0.0.1:{port}/")
+    finally:
+        await proxy.stop()
+
+
+async def get(session: aiohttp.ClientSession, url: str) -> tuple[int, str, str]:
+    async with session.get(url) as response:
+        return response.status, response.headers.get("X-Cache"), await response.text()
+
+
+def test_cache_key_ignores_parameter_order():
+    assert ProxyServer.cache_key("XML_DM_REQUEST", "a=1&b=2") == ProxyServer.cache_key(
+        "XML_DM_REQUEST", "b=2&a=1"
+    )
+
+
+def test_proxy_caches_responses():
+    transport = UpstreamTransport()
+
+    async def run(session, url):
+        first = await get(session, url + INFO_PATH)
+        second = await get(session, url + INFO_PATH)
+
+        # client of the proxy gets the same data as from upstream
+        async with EfaClient(url) as client:
+            info = await client.info()
+
+        return first, second, info
+
+    proxy, (first, second, info) = asyncio.run(with_proxy(transport, run))
+
+    assert first[:2] == (200, "MISS")
+    assert second[:2] == (200, "HIT")
+    assert json.loads(second[2]) == SYSTEM_INFO
+    assert info.version == "1.2.3"
+    assert len(transport.urls) == 2
+    assert transport.urls[0] == "http://efa.local/efa/" + INFO_PATH
+    assert proxy.stats.hits == 1
+
+
+def test_proxy_coalesces_concurrent_requests():
+    transport = UpstreamTransport(latency=0.1)
+
+    async def run(session, url):
+        return await asyncio.gather(*[get(session, url + INFO_PATH) for _ in range(10)])
+
+    _, responses = asyncio.run(with_proxy(transport, run))
+
+    assert len(transport.urls) == 1
+    assert all(x[0] == 200 for x in responses)
+    assert sorted(x[1] for x in responses) == ["COALESCED"] * 9 + ["MISS"]
+
+
+@pytest.mark.parametrize(
+    "path, upstream_status, expected_status",
+    [
+        ("XML_TRIP_REQUEST2?x=1", 200, 404),
+        ("XML_SYSTEMINFO_REQUEST?outputFormat=XML", 200, 400),
+        ("XML_SYSTEMINFO_REQUEST", 200, 400),
+        (INFO_PATH, 503, 502),
+    ],
+)
+def test_proxy_errors(path, upstream_status, expected_status):
+    transport = UpstreamTransport(upstream_status, latency=0)
+
+    async def run(session, url):
+        return await get(session, url + path)
+
+    proxy, response = asyncio.run(with_proxy(transport, run))
+
+    assert response[0] == expected_status
+    assert not proxy._cache
+
+
+@pytest.mark.parametrize(
+    "error, expected_status",
+    [
+        (aiohttp.ClientConnectionError("connection reset"), 502),
+        (aiohttp.ServerTimeoutError("read timeout"), 504),
+        (asyncio.TimeoutError(), 504),
+        (EfaResponseInvalid("invalid"), 502),
+    ],
+)
+def test_proxy_upstream_errors(error, expected_status):
+    transport = UpstreamTransport(latency=0, error=error)
+
+    async def run(session, url):
+        return await get(session, url + INFO_PATH)
+
+    proxy, response = asyncio.run(with_proxy(transport, run))
+
+    assert response[0] == expected_status
+    assert proxy.stats.upstream_errors == 1
+
+
+def test_token_bucket_limits_rate():
+    async def run():
+        bucket = TokenBucket(rate=50, burst=2)
+        start = time.monotonic()
+
+        waited = [await bucket.acquire() for _ in range(6)]
+
+        return time.monotonic() - start, waited
+
+    duration, waited = asyncio.run(run())
+
+    assert waited[:2] == [0, 0]
+    assert duration >= 4 / 50 * 0.9
+
+
+def test_token_bucket_invalid_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(0)
+
+
+def test_load_harness_against_proxy():
+    transport = UpstreamTransport(latency=0.01)
+
+    async def run(session, url):
+        return await run_load(url, [INFO_PATH, "unknown"], requests=40, concurrency=8)
+
+    _, result = asyncio.run(with_proxy(transport, run))
+
+    assert result.requests == 40
+    assert result.statuses == {200: 20, 404: 20}
+    assert result.errors == 20
+    assert result.percentile(50) > 0
+    assert len(transport.urls) == 1
+
+
+def test_cli_serve_arguments():
+    args = create_parser().parse_args(
+        ["serve", "http://efa.local/", "--port", "9000", "--ttl", "XML_DM_REQUEST=5"]
+    )
+
+    assert args.port == 9000
+    assert dict(args.ttl) == {"XML_DM_REQUEST": 5}
@@ -0,0 +1,77 @@
+import asyncio
+
+from pyefa import EfaClient
+from tests.benchmarks.responses import (
+    BASE_URL,
+    StaticTransport,
+    departures_response,
+    stop_finder_response,
+)
+from tests.benchmarks.soak import ResourceSample, SoakResult, open_fds, rss, run_soak
+
+
+class LeakingClient:
+    def __init__(self) -> None:
+        self.kept = []
+
+    async def departures(self, stop_id: str) -> list:
+        self.kept.append(bytearray(10000))
+        return []
+
+    async def stops(self, name: str) -> list:
+        raise ValueError("no stops")
+
+
+def sample(calls: int, rss: int, traced: int = 0, fds: int = 10) -> ResourceSample:
+    return ResourceSample(calls / 100, calls, rss, traced, fds)
+
+
+def test_process_resources():
+    assert rss() > 0
+    assert open_fds() > 0
+
+
+def test_growth_since_warmup():
+    result = SoakResult(warmup=100)
+    result.samples = [sample(0, 100), sample(100, 500), sample(200, 700, fds=12)]
+
+    assert result.baseline.calls == 100
+    assert result.growth("rss") == 200
+    assert result.growth("fds") == 2
+    assert result.violations(max_rss_growth=300) == ["fds grew by 2 (limit 0)"]
+    assert result.violations(max_rss_growth=100, max_fd_growth=None) == [
+        "rss grew by 200 (limit 100)"
+    ]
+
+
+def test_soak_client():
+    transport = StaticTransport(
+        {
+            "XML_DM_REQUEST": departures_response(5),
+            "XML_STOPFINDER_REQUEST": stop_finder_response(5),
+        }
+    )
+
+    async def run():
+        async with EfaClient(BASE_URL, transport=transport) as client:
+            return await run_soak(client, 200, sample_every=50, warmup=50)
+
+    result = asyncio.run(run())
+
+    assert result.calls == 200
+    assert result.errors == 0
+    assert [x.calls for x in result.samples] == [0, 50, 100, 150, 200]
+    assert result.violations(max_traced_growth=256 * 1024) == []
+
+
+def test_soak_detects_leak():
+    client = LeakingClient()
+
+    result = asyncio.run(
+        run_soak(client, 400, concurrency=2, sample_every=100, warmup=100)
+    )
+
+    assert result.errors == 200
+    assert result.growth("traced") >= 150 * 10000
+    assert result.violations(max_traced_growth=1024 * 1024)
+    assert "test_soak.py" in result.top_allocators[0]
@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import asyncio
+import copy
+import datetime
+import json
+
+import pytest
+
+from pyefa import EfaClient
+from pyefa.data_classes import Stop, StopType, SystemInfo, TransportType
+from pyefa.stop_cache import StopCache, StopSnapshot, cache_key, write_snapshot
+from pyefa.transport import Transport, TransportResponse
+from tests.benchmarks.responses import SYSTEM_INFO, stop_finder_response
+
+INFO = SystemInfo(
+    "1", "EFA10_04_00", datetime.date(2024, 11, 1), datetime.date(2025, 1, 1), "b1"
+)
+
+STOPS = [
+    Stop(
+        "de:09564:704",
+        "Nürnberg, Plärrer",
+        StopType.STOP,
+        "Plärrer",
+        [5648720.0, 1231660.0],
+        [TransportType.SUBWAY, TransportType.BUS],
+    ),
+    Stop("poi:1", "Opernhaus", StopType.POI),
+]
+
+
+def test_cache_key_normalized():
+    assert cache_key(" Plärrer ") == cache_key("plärrer")
+    assert cache_key("Plärrer") != cache_key("Plärrer", filters=2)
+
+
+def test_snapshot_round_trip(tmp_path):
+    path = tmp_path / "stops.snapshot"
+    entries = {cache_key(f"stop {i}"): STOPS[: i % 3] for i in range(50)}
+
+    write_snapshot(path, INFO, entries)
+
+    with StopSnapshot(path) as snapshot:
+        assert len(snapshot) == 50
+        assert snapshot.info == INFO
+        assert sorted(snapshot.keys()) == sorted(snapshot) == sorted(entries)
+        assert all(snapshot.get(k) == v for k, v in entries.items())
+        assert snapshot.get(cache_key("unknown")) is None
+
+
+@pytest.mark.parametrize("content", [b"", b"PYEFASTP\x63\x00" + bytes(20), b"x" * 64])
+def test_snapshot_invalid_file(tmp_path, content):
+    path = tmp_path / "stops.snapshot"
+    path.write_bytes(content)
+
+    with pytest.raises(ValueError):
+        StopSnapshot(path)
+
+
+def test_cache_warm_start_and_invalidation(tmp_path):
+    path = tmp_path / "stops.snapshot"
+    cache = StopCache()
+
+    cache.put(cache_key("Plärrer"), STOPS)
+    cache.validate(INFO)
+    cache.save(path)
+
+    restored = StopCache()
+    restored.load(path)
+
+    assert not restored.validated
+    assert restored.get(cache_key("plärrer")) == STOPS
+    assert restored.validate(INFO)
+    assert restored.get(cache_key("Plärrer")) == STOPS
+
+    assert not restored.validate(
+        SystemInfo(INFO.version, INFO.data_format, INFO.valid_from, INFO.valid_to, "b2")
+    )
+    assert restored.get(cache_key("Plärrer")) is None
+    assert restored.hits == 2
+    assert restored.misses == 1
+
+
+def test_validation_expires(monkeypatch):
+    now = datetime.datetime(2024, 12, 31, 12, 0).timestamp()
+    monkeypatch.setattr("pyefa.stop_cache.time.time", lambda: now)
+
+    cache = StopCache(revalidate_after=600)
+    cache.validate(INFO)
+
+    assert cache.validated
+
+    now += 601
+
+    assert not cache.validated
+
+    # validation expires at the end of the valid_to date as well
+    cache = StopCache(revalidate_after=None)
+    cache.validate(INFO)
+
+    assert cache.validated
+
+    now = datetime.datetime(2025, 1, 2, 0, 0, 1).timestamp()
+
+    assert not cache.validated
+
+
+def test_snapshot_without_data_build_not_trusted():
+    cache = StopCache()
+    info = SystemInfo(INFO.version, INFO.data_format, INFO.valid_from, INFO.valid_to)
+
+    cache.validate(info)
+    cache.put(cache_key("Plärrer"), STOPS)
+
+    assert not cache.validate(info)
+    assert cache.get(cache_key("Plärrer")) is None
+
+
+class StopFinderTransport(Transport):
+    def __init__(self, data_build: str, info_status: int = 200):
+        self.info = copy.deepcopy(SYSTEM_INFO)
+        self.info["ptKernel"]["dataBuild"] = data_build
+        self.info_status = info_status
+        self.names: list[str] = []
+
+    async def get(
+        self, url: str, headers: dict[str, str] | None = None
+    ) -> TransportResponse:
+        name = url.split("/")[-1].split("?")[0]
+        self.names.append(name)
+
+        await asyncio.sleep(0.01)
+
+        if name == "XML_SYSTEMINFO_REQUEST":
+            return TransportResponse(self.info_status, json.dumps(self.info))
+
+        return TransportResponse(200, json.dumps(stop_finder_response(5)))
+
+
+@pytest.mark.parametrize("data_build, stop_finder_requests", [("b1", 1), ("b2", 2)])
+def test_client_restores_snapshot(tmp_path, data_build, stop_finder_requests):
+    path = tmp_path / "stops.snapshot"
+
+    async def run(transport: Transport, cache: StopCache) -> list[Stop]:
+        client = EfaClient("http://efa.local", transport=transport, stop_cache=cache)
+
+        async with client:
+            return await client.stops("Plärrer")
+
+    first = StopFinderTransport("b1")
+    cache = StopCache()
+    stops = asyncio.run(run(first, cache))
+    cache.save(path)
+
+    restored = StopCache()
+    restored.load(path)
+
+    second = StopFinderTransport(data_build)
+    restored_stops = asyncio.run(run(second, restored))
+
+    assert restored_stops == stops
+    assert len(stops) == 5
+    assert (first.names + second.names).count(
+        "XML_STOPFINDER_REQUEST"
+    ) == stop_finder_requests
+
+
+def test_client_validates_once_for_concurrent_lookups():
+    transport = StopFinderTransport("b1")
+
+    async def run() -> list[list[Stop]]:
+        cache = StopCache()
+        cache.put(cache_key("Plärrer"), STOPS)
+
+        async with EfaClient(
+            "http://efa.local", transport=transport, stop_cache=cache
+        ) as client:
+            return await asyncio.gather(*[client.stops("Plärrer") for _ in range(5)])
+
+    results = asyncio.run(run())
+
+    assert transport.names == ["XML_SYSTEMINFO_REQUEST"]
+    assert results == [STOPS] * 5
+
+
+def test_client_serves_cache_if_validation_fails(caplog):
+    transport = StopFinderTransport("b1", info_status=503)
+    cache = StopCache()
+    cache.put(cache_key("Plärrer"), STOPS)
+
+    async def run() -> list[Stop]:
+        async with EfaClient(
+            "http://efa.local", transport=transport, stop_cache=cache
+        ) as client:
+            return await client.stops("Plärrer")
+
+    assert asyncio.run(run()) == STOPS
+    assert not cache.validated
+    assert "Validation of stop cache failed" in caplog.text
+
+    # validation is retried by the next call
+    transport.info_status = 200
+
+    assert asyncio.run(run()) == STOPS
+    assert cache.validated
+    assert transport.names.count("XML_SYSTEMINFO_REQUEST") == 2
@@ -0,0 +1,142 @@
+import datetime
+
+import pytest
+
+from pyefa.data_classes import (
+    Departure,
+    Line,
+    Stop,
+    StopSequence,
+    StopTime,
+    StopType,
+    TransportType,
+)
+from pyefa.helpers import TZ_INFO
+from pyefa.timetable import TimetableBuilder, stop_key
+
+NOON = datetime.datetime(2024, 11, 27, 12, 0, tzinfo=TZ_INFO)
+
+
+def at(minutes: int) -> datetime.datetime:
+    return NOON + datetime.timedelta(minutes=minutes)
+
+
+def stop(id: str) -> Stop:
+    return Stop(id, f"Stop {id}", StopType.PLATFORM)
+
+
+def sequence(number: str, times: list[tuple[str, int]]) -> StopSequence:
+    line = Line(number, number, number, "", TransportType.SUBWAY)
+
+    return StopSequence(
+        line,
+        [StopTime(stop(id), at(minute), None, at(minute)) for id, minute in times],
+    )
+
+
+def departure(number: str, destination: str, minute: int) -> Departure:
+    return Departure(
+        number,
+        "",
+        stop("x"),
+        stop(destination),
+        TransportType.SUBWAY,
+        at(minute),
+        None,
+        [],
+    )
+
+
+@pytest.fixture
+def builder() -> TimetableBuilder:
+    builder = TimetableBuilder()
+
+    # platforms are merged into their stops
+    builder.add_stop_sequence(sequence("U1", [("a:1:A:1:1", 0), ("B", 5), ("C", 10)]))
+    builder.add_stop_sequence(sequence("4", [("C", 12), ("D", 22)]))
+    builder.add_stop_sequence(sequence("4", [("C", 30), ("D", 40)]))
+    builder.add_footpath("B", "E", datetime.timedelta(minutes=3))
+
+    return builder
+
+
+def test_stop_key():
+    assert stop_key("de:09564:704:8:3") == "de:09564:704"
+    assert stop_key("de:09564:704") == "de:09564:704"
+    assert stop_key("3000704") == "3000704"
+
+
+def test_departures_expanded_along_pattern(builder):
+    unmatched = builder.add_departures(
+        "B",
+        [departure("U1", "C", 15), departure("U1", "C", 25), departure("7", "C", 5)],
+    )
+    # same trip reported by another stop
+    builder.add_departures("C", [departure("U1", "C", 20)])
+
+    timetable = builder.build()
+
+    assert unmatched == 1
+    assert builder.unmatched == 1
+    assert timetable.trip_count == 5
+    assert len(timetable.stops) == 5
+
+
+@pytest.mark.parametrize(
+    "origin, destination, minute, transfer, expected",
+    [
+        ("a:1:A", "D", 0, 2, (0, 22, ["U1", "4"])),
+        ("a:1:A", "D", 0, 5, (0, 40, ["U1", "4"])),
+        ("a:1:A:1:1", "C", 0, 2, (0, 10, ["U1"])),
+        ("a:1:A", "E", 0, 2, (0, 8, ["U1"])),
+        ("B", "E", 1, 2, (1, 4, [])),
+        ("C", "C", 3, 2, (3, 3, [])),
+    ],
+)
+def test_earliest_arrival(builder, origin, destination, minute, transfer, expected):
+    timetable = builder.build()
+
+    journey = timetable.earliest_arrival(
+        origin,
+        destination,
+        at(minute),
+        transfer_time=datetime.timedelta(minutes=transfer),
+    )
+
+    assert (journey.departure_planned, journey.arrival_planned, journey.lines) == (
+        at(expected[0]),
+        at(expected[1]),
+        expected[2],
+    )
+    assert journey.interchanges == max(len(expected[2]) - 1, 0)
+    assert journey.destination.id == stop_key(destination)
+
+
+def test_departure_waits_for_next_trip(builder):
+    builder.add_departures("a:1:A", [departure("U1", "C", 20)])
+
+    journey = builder.build().earliest_arrival("a:1:A", "C", at(1))
+
+    assert journey.departure_planned == at(20)
+    assert journey.arrival_planned == at(30)
+
+
+def test_overtaking_trip_is_used(builder):
+    builder.add_departures("a:1:A", [departure("U1", "C", 10)])
+    # express trip overtaking the regular trip
+    builder.add_stop_sequence(sequence("U1", [("a:1:A", 2), ("B", 4), ("C", 6)]))
+
+    timetable = builder.build()
+
+    assert timetable.earliest_arrival("a:1:A", "C", at(1)).arrival_planned == at(6)
+    assert timetable.earliest_arrival("a:1:A", "C", at(3)).arrival_planned == at(20)
+
+
+@pytest.mark.parametrize(
+    "origin, destination, max_transfers",
+    [("D", "a:1:A", 4), ("a:1:A", "D", 0), ("unknown", "D", 4)],
+)
+def test_not_reachable(builder, origin, destination, max_transfers):
+    timetable = builder.build()
+
+    assert timetable.earliest_arrival(origin, destination, at(0), max_transfers) is None
@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import asyncio
+import gzip
+import importlib.util
+import json
+import zlib
+
+import pytest
+from aiohttp import web
+
+from pyefa import EfaClient
+from pyefa.exceptions import (
+    EfaConnectionError,
+    EfaParameterError,
+    EfaResponseInvalid,
+)
+from pyefa.transport import (
+    AiohttpTransport,
+    HttpxTransport,
+    RecordingTransport,
+    ReplayTransport,
+    Transport,
+    TransportResponse,
+    accepted_encodings,
+    decompress,
+    recording_name,
+    request_errors,
+)
+
+URL = "http://efa.local/XML_SYSTEMINFO_REQUEST?commonMacro=system"
+
+
+class MockTransport(Transport):
+    async def get(
+        self, url: str, headers: dict[str, str] | None = None
+    ) -> TransportResponse:
+        return TransportResponse(200, '{"key": "value"}', {"ETag": "abc"})
+
+
+def test_recording_name_stable():
+    assert recording_name(URL) == recording_name(URL)
+    assert recording_name(URL) != recording_name(URL + "&x=1")
+
+
+def test_record_and_replay(tmp_path):
+    async def run():
+        recorder = RecordingTransport(tmp_path, MockTransport())
+
+        await recorder.open()
+        recorded = await recorder.get(URL)
+        await recorder.close()
+
+        replay = ReplayTransport(tmp_path)
+
+        await replay.open()
+
+        return recorded, await replay.get(URL), await replay.get(URL + "&x=1")
+
+    recorded, replayed, missing = asyncio.run(run())
+
+    assert (tmp_path / recording_name(URL)).exists()
+    assert replayed == recorded
+    assert missing.status == 404
+
+
+@pytest.mark.parametrize("error_rate, expected_status", [(0, 200), (1, 503)])
+def test_replay_error_injection(tmp_path, error_rate, expected_status):
+    async def run():
+        await RecordingTransport(tmp_path, MockTransport()).get(URL)
+
+        replay = ReplayTransport(tmp_path, error_rate=error_rate, seed=1)
+        await replay.open()
+
+        return await replay.get(URL)
+
+    assert asyncio.run(run()).status == expected_status
+
+
+@pytest.mark.parametrize("error_rate", [-0.1, 1.5])
+def test_replay_invalid_error_rate(tmp_path, error_rate):
+    with pytest.raises(ValueError):
+        ReplayTransport(tmp_path, error_rate=error_rate)
+
+
+def test_client_with_failing_transport(tmp_path):
+    async def run():
+        async with EfaClient(
+            "http://efa.local", transport=ReplayTransport(tmp_path, error_rate=1)
+        ) as client:
+            await client.info()
+
+    with pytest.raises(EfaConnectionError):
+        asyncio.run(run())
+
+
+@pytest.mark.parametrize(
+    "error, expected",
+    [
+        (EfaConnectionError("timeout"), True),
+        (EfaResponseInvalid("schema"), True),
+        (json.JSONDecodeError("invalid", "<html>", 0), True),
+        (asyncio.TimeoutError(), True),
+        (EfaParameterError("invalid stop id"), False),
+        (ValueError("not enough values to unpack"), False),
+    ],
+)
+def test_request_errors(error, expected):
+    assert isinstance(error, request_errors()) is expected
+
+
+@pytest.mark.parametrize(
+    "encoding, compress",
+    [
+        (None, lambda x: x),
+        ("identity", lambda x: x),
+        ("gzip", gzip.compress),
+        ("deflate", zlib.compress),
+        ("deflate", lambda x: zlib.compress(x, wbits=-zlib.MAX_WBITS)),
+    ],
+)
+def test_decompress(encoding, compress):
+    body = b'{"key": "value"}'
+
+    assert decompress(compress(body), encoding) == body
+
+
+def test_decompress_unsupported():
+    with pytest.raises(EfaConnectionError):
+        decompress(b"", "compress")
+
+
+def test_accepted_encodings():
+    assert accepted_encodings().startswith("gzip, deflate")
+
+
+async def compressed_server(body: bytes) -> tuple[web.AppRunner, str]:
+    async def handler(request: web.Request) -> web.Response:
+        assert "gzip" in request.headers["Accept-Encoding"]
+
+        return web.Response(
+            body=gzip.compress(body),
+            headers={"Content-Encoding": "gzip"},
+            content_type="application/json",
+        )
+
+    app = web.Application()
+    app.router.add_get("/", handler)
+
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", 0).start()
+
+    port = runner.addresses[0][1]
+
+    return runner, f"http://127.0.0.1:{port}/"
+
+
+@pytest.mark.parametrize(
+    "transport_class",
+    [
+        AiohttpTransport,
+        pytest.param(
+            HttpxTransport,
+            marks=pytest.mark.skipif(
+                importlib.util.find_spec("httpx") is None, reason="httpx not installed"
+            ),
+        ),
+    ],
+)
+def test_transport_compressed_transfer(transport_class):
+    body = json.dumps({"key": "value" * 100}).encode("utf-8")
+
+    async def run():
+        runner, url = await compressed_server(body)
+        transport = transport_class()
+
+        try:
+            await transport.open()
+            return await transport.get(url)
+        finally:
+            await transport.close()
+            await runner.cleanup()
+
+    response = asyncio.run(run())
+
+    assert response.status == 200
+    assert response.text == body.decode("utf-8")
+    assert response.transferred < response.size
+
+
+@pytest.mark.skipif(importlib.util.find_spec("httpx") is not None, reason="installed")
+def test_httpx_transport_not_installed():
+    with pytest.raises(EfaConnectionError):
+        asyncio.run(HttpxTransport().open())
+
+
+def test_client_http2_transport():
+    assert isinstance(
+        EfaClient("http://efa.local", http2=True)._transport, HttpxTransport
+    )